@@ -0,0 +1,59 @@
+"""home timeline entries
+
+Revision ID: a3e1c7d94b20
+Revises: 9fadcf7aef12
+Create Date: 2026-10-19 09:12:41.204118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3e1c7d94b20'
+down_revision: Union[str, Sequence[str], None] = '9fadcf7aef12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Denormalized member counter used to pick fan-out-on-write vs fan-out-on-read
+    op.add_column('groups', sa.Column('member_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        """
+        UPDATE groups g
+        SET member_count = m.cnt
+        FROM (SELECT group_id, count(*) AS cnt FROM group_membership GROUP BY group_id) m
+        WHERE m.group_id = g.id
+        """
+    )
+
+    # Existing group posts are materialized by `python -m db.repository.backfill --only timelines`
+    op.create_table(
+        'timeline_entries',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('post_id', sa.Integer(), nullable=False),
+        sa.Column('group_id', sa.Integer(), nullable=False),
+        sa.Column('date_created', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'post_id')
+    )
+    op.create_index(
+        'ix_timeline_entries_user_created_post_desc', 'timeline_entries',
+        ['user_id', 'date_created', 'post_id'], unique=False,
+        postgresql_using='btree', postgresql_ops={'date_created': 'DESC', 'post_id': 'DESC'}
+    )
+    op.create_index('ix_timeline_entries_group_id', 'timeline_entries', ['group_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_timeline_entries_group_id', table_name='timeline_entries')
+    op.drop_index('ix_timeline_entries_user_created_post_desc', table_name='timeline_entries')
+    op.drop_table('timeline_entries')
+    op.drop_column('groups', 'member_count')
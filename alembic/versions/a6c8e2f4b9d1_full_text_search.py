@@ -0,0 +1,49 @@
+"""full text search
+
+Revision ID: a6c8e2f4b9d1
+Revises: f9b3d5a7c2e4
+Create Date: 2026-10-19 17:08:12.551093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c8e2f4b9d1'
+down_revision: Union[str, Sequence[str], None] = 'f9b3d5a7c2e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = "to_tsvector('english', coalesce(content, ''))"
+TABLES = ('posts', 'comments', 'messages')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Adding a stored generated column rewrites each table once
+    for table in TABLES:
+        op.add_column(
+            table,
+            sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True), nullable=True)
+        )
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(
+                f'ix_{table}_search_vector', table, ['search_vector'], unique=False,
+                postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.drop_index(f'ix_{table}_search_vector', table_name=table, postgresql_concurrently=True, if_exists=True)
+    for table in TABLES:
+        op.drop_column(table, 'search_vector')
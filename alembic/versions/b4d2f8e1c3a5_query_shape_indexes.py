@@ -0,0 +1,93 @@
+"""query shape indexes
+
+Revision ID: b4d2f8e1c3a5
+Revises: a3e1c7d94b20
+Create Date: 2026-10-19 11:03:27.518402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d2f8e1c3a5'
+down_revision: Union[str, Sequence[str], None] = 'a3e1c7d94b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        # Group feed: WHERE group_id = ? AND deleted_at IS NULL ORDER BY date_created DESC, id DESC
+        op.create_index(
+            'ix_posts_group_created_id_visible', 'posts',
+            ['group_id', 'date_created', 'id'], unique=False,
+            postgresql_using='btree', postgresql_ops={'date_created': 'DESC', 'id': 'DESC'},
+            postgresql_where=sa.text('deleted_at IS NULL'),
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        # Comment listing: WHERE post_id = ? AND parent_comment_id ... AND deleted_at IS NULL
+        # ORDER BY date_created DESC, id DESC. Supersedes ix_comments_post_parent_created.
+        op.create_index(
+            'ix_comments_post_parent_created_id_visible', 'comments',
+            ['post_id', 'parent_comment_id', 'date_created', 'id'], unique=False,
+            postgresql_using='btree', postgresql_ops={'date_created': 'DESC', 'id': 'DESC'},
+            postgresql_where=sa.text('deleted_at IS NULL'),
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.drop_index(
+            'ix_comments_post_parent_created', table_name='comments',
+            postgresql_concurrently=True, if_exists=True
+        )
+        # Viewer reaction lookups per post / per comment
+        op.create_index(
+            'ix_reactions_post_user', 'reactions', ['post_id', 'user_id'], unique=False,
+            postgresql_where=sa.text('post_id IS NOT NULL'),
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_reactions_comment_user', 'reactions', ['comment_id', 'user_id'], unique=False,
+            postgresql_where=sa.text('comment_id IS NOT NULL'),
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        # Room membership checks
+        op.create_index(
+            'ix_chat_room_members_user_room', 'chat_room_members', ['user_id', 'chat_room_id'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        # Booking lists by mentor / mentee, ordered or filtered by date
+        op.create_index(
+            'ix_mentor_bookings_mentor_date', 'mentor_bookings', ['mentor_id', 'booking_date'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_mentor_bookings_mentee_date', 'mentor_bookings', ['mentee_id', 'booking_date'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        # Mentor / mentee directory and admin user filters
+        op.create_index(
+            'ix_users_type_active_approved', 'users', ['user_type', 'is_active', 'is_approved'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_type_active_approved', table_name='users', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_mentor_bookings_mentee_date', table_name='mentor_bookings', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_mentor_bookings_mentor_date', table_name='mentor_bookings', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_chat_room_members_user_room', table_name='chat_room_members', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_reactions_comment_user', table_name='reactions', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_reactions_post_user', table_name='reactions', postgresql_concurrently=True, if_exists=True)
+        op.create_index(
+            'ix_comments_post_parent_created', 'comments',
+            ['post_id', 'parent_comment_id', 'date_created'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.drop_index('ix_comments_post_parent_created_id_visible', table_name='comments', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_posts_group_created_id_visible', table_name='posts', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,38 @@
+"""user search trigram index
+
+Revision ID: b7d9f1a3c5e8
+Revises: a6c8e2f4b9d1
+Create Date: 2026-10-19 17:46:30.118274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d9f1a3c5e8'
+down_revision: Union[str, Sequence[str], None] = 'a6c8e2f4b9d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        # Must match services.user_index.user_search_text
+        op.create_index(
+            'ix_users_search_text_trgm', 'users',
+            [sa.text("(coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(email, '')) gin_trgm_ops")],
+            unique=False, postgresql_using='gin',
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_search_text_trgm', table_name='users', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,59 @@
+"""direct chat rooms
+
+Revision ID: c3e7a1f5d9b4
+Revises: b7d9f1a3c5e8
+Create Date: 2026-10-19 18:21:05.392611
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e7a1f5d9b4'
+down_revision: Union[str, Sequence[str], None] = 'b7d9f1a3c5e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'direct_chat_rooms',
+        sa.Column('chat_room_id', sa.Integer(), nullable=False),
+        sa.Column('user_low_id', sa.Integer(), nullable=False),
+        sa.Column('user_high_id', sa.Integer(), nullable=False),
+        sa.Column('date_created', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.CheckConstraint('user_low_id <= user_high_id', name='ck_direct_chat_rooms_ordered_pair'),
+        sa.ForeignKeyConstraint(['chat_room_id'], ['chat_rooms.id'], ondelete='CASCADE', deferrable=True, initially='DEFERRED'),
+        sa.ForeignKeyConstraint(['user_high_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_low_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('chat_room_id')
+    )
+    op.create_index('ux_direct_chat_rooms_pair', 'direct_chat_rooms', ['user_low_id', 'user_high_id'], unique=True)
+    op.create_index('ix_direct_chat_rooms_user_high_id', 'direct_chat_rooms', ['user_high_id'], unique=False)
+    # Existing direct rooms, keyed by their members. Where a past race
+    # created several rooms for one pair, the oldest room becomes the pair's
+    # room; the others stay readable through their memberships.
+    op.execute(
+        """
+        INSERT INTO direct_chat_rooms (chat_room_id, user_low_id, user_high_id)
+        SELECT r.id, min(m.user_id), max(m.user_id)
+        FROM chat_rooms r
+        JOIN chat_room_members m ON m.chat_room_id = r.id
+        WHERE r.chat_type = 'direct'
+        GROUP BY r.id
+        HAVING count(DISTINCT m.user_id) BETWEEN 1 AND 2
+        ORDER BY r.id
+        ON CONFLICT DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_direct_chat_rooms_user_high_id', table_name='direct_chat_rooms')
+    op.drop_index('ux_direct_chat_rooms_pair', table_name='direct_chat_rooms')
+    op.drop_table('direct_chat_rooms')
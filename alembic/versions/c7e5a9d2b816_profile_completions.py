@@ -0,0 +1,43 @@
+"""profile completions
+
+Revision ID: c7e5a9d2b816
+Revises: b4d2f8e1c3a5
+Create Date: 2026-10-19 12:21:09.873305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e5a9d2b816'
+down_revision: Union[str, Sequence[str], None] = 'b4d2f8e1c3a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows are filled by `python -m db.repository.backfill` and kept current on write
+    op.create_table(
+        'profile_completions',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('user_type', sa.String(), nullable=False),
+        sa.Column('profile_percentage', sa.Float(), nullable=False),
+        sa.Column('annual_target_percentage', sa.Float(), nullable=False),
+        sa.Column('overall_percentage', sa.Float(), nullable=False),
+        sa.Column('profile_details', sa.JSON(), nullable=False),
+        sa.Column('annual_targets_summary', sa.JSON(), nullable=False),
+        sa.Column('last_modified', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index(op.f('ix_profile_completions_overall_percentage'), 'profile_completions', ['overall_percentage'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_profile_completions_overall_percentage'), table_name='profile_completions')
+    op.drop_table('profile_completions')
@@ -0,0 +1,42 @@
+"""mentor availability windows
+
+Revision ID: d2f6b8c4e1a7
+Revises: c7e5a9d2b816
+Create Date: 2026-10-19 14:02:37.415920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f6b8c4e1a7'
+down_revision: Union[str, Sequence[str], None] = 'c7e5a9d2b816'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows are filled by `python -m db.repository.backfill --only availability`
+    # and kept current whenever a user's availability is written
+    op.create_table(
+        'mentor_availability_windows',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('minutes', postgresql.INT4RANGE(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_mentor_availability_windows_user_id'), 'mentor_availability_windows', ['user_id'], unique=False)
+    op.create_index('ix_mentor_availability_windows_minutes', 'mentor_availability_windows', ['minutes'], unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_mentor_availability_windows_minutes', table_name='mentor_availability_windows', postgresql_using='gist')
+    op.drop_index(op.f('ix_mentor_availability_windows_user_id'), table_name='mentor_availability_windows')
+    op.drop_table('mentor_availability_windows')
@@ -0,0 +1,33 @@
+"""messages room id index
+
+Revision ID: d8f2b6a4e1c7
+Revises: c3e7a1f5d9b4
+Create Date: 2026-10-19 18:54:12.607318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8f2b6a4e1c7'
+down_revision: Union[str, Sequence[str], None] = 'c3e7a1f5d9b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset replay of a room's messages after a reconnect (chat_room_id, id > n)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_messages_room_id', 'messages', ['chat_room_id', 'id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_messages_room_id', table_name='messages', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,52 @@
+"""booking overlap exclusion and version
+
+Revision ID: e5a1c9f3d7b2
+Revises: d2f6b8c4e1a7
+Create Date: 2026-10-19 15:10:44.207113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a1c9f3d7b2'
+down_revision: Union[str, Sequence[str], None] = 'd2f6b8c4e1a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    op.add_column('mentor_bookings', sa.Column('booking_end', sa.TIMESTAMP(timezone=True), nullable=True))
+    op.add_column('mentor_bookings', sa.Column('version', sa.Integer(), server_default=sa.text('1'), nullable=False))
+    # Package duration is minutes stored as text; fall back to 60 like the app does
+    op.execute("""
+        UPDATE mentor_bookings b
+        SET booking_end = b.booking_date + make_interval(mins => CASE
+            WHEN p.duration ~ '^[0-9]+$' AND p.duration::int > 0 THEN p.duration::int
+            ELSE 60
+        END)
+        FROM mentor_packages p
+        WHERE p.id = b.mentor_package_id
+    """)
+    op.alter_column('mentor_bookings', 'booking_end', nullable=False)
+
+    # Fails if overlapping active bookings already exist; resolve them first
+    op.execute("""
+        ALTER TABLE mentor_bookings
+        ADD CONSTRAINT ex_mentor_bookings_no_overlap
+        EXCLUDE USING gist (mentor_id WITH =, tstzrange(booking_date, booking_end, '[)') WITH &&)
+        WHERE (status IN ('pending', 'accepted', 'confirmed'))
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ex_mentor_bookings_no_overlap', 'mentor_bookings', type_='exclude')
+    op.drop_column('mentor_bookings', 'version')
+    op.drop_column('mentor_bookings', 'booking_end')
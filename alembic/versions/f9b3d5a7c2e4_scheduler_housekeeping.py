@@ -0,0 +1,60 @@
+"""scheduler housekeeping
+
+Revision ID: f9b3d5a7c2e4
+Revises: e5a1c9f3d7b2
+Create Date: 2026-10-19 16:24:51.630482
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f9b3d5a7c2e4'
+down_revision: Union[str, Sequence[str], None] = 'e5a1c9f3d7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('mentor_bookings', sa.Column('reminder_24h_sent_at', sa.TIMESTAMP(timezone=True), nullable=True))
+    op.add_column('mentor_bookings', sa.Column('reminder_1h_sent_at', sa.TIMESTAMP(timezone=True), nullable=True))
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        # complete_past_bookings / reminder scans
+        op.create_index(
+            'ix_mentor_bookings_open_end', 'mentor_bookings', ['booking_end'], unique=False,
+            postgresql_where=sa.text("status IN ('accepted', 'confirmed')"),
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_mentor_bookings_open_start', 'mentor_bookings', ['booking_date'], unique=False,
+            postgresql_where=sa.text("status IN ('accepted', 'confirmed')"),
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        # mark_overdue_targets
+        op.create_index(
+            'ix_annual_targets_open_completed_by', 'annual_targets', ['completed_by'], unique=False,
+            postgresql_where=sa.text("status IN ('not_started', 'in_progress')"),
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        # purge_expired_verifications
+        op.create_index(
+            op.f('ix_email_verifications_expires_at'), 'email_verifications', ['expires_at'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_email_verifications_expires_at'), table_name='email_verifications', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_annual_targets_open_completed_by', table_name='annual_targets', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_mentor_bookings_open_start', table_name='mentor_bookings', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_mentor_bookings_open_end', table_name='mentor_bookings', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('mentor_bookings', 'reminder_1h_sent_at')
+    op.drop_column('mentor_bookings', 'reminder_24h_sent_at')
@@ -1,7 +1,7 @@
 """
 Login and authentication related Pydantic models.
 """
-from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, TypeAdapter
 # from datetime import date
 from typing import Optional
 from api.api_models.onboarding import (
@@ -89,6 +89,11 @@ class UserResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+# Prebuilt serializers (see utils.responses.serialized_response)
+USER_ADAPTER = TypeAdapter(UserResponse)
+USER_LIST_ADAPTER = TypeAdapter(list[UserResponse])
+
+
 class AdminResponse(BaseModel):
     admin_id: str
     model_config = ConfigDict(from_attributes=True)
@@ -44,7 +44,9 @@ class MentorBookingResponse(MentorBookingBase):
     id: int
     date_created: datetime
     last_modified: datetime
+    booking_end: datetime
     status: str
+    version: int
 
     class Config:
         from_attributes = True
@@ -85,3 +87,21 @@ class MentorScheduleResponse(BaseModel):
     mentor_id: int
     bookings: list[MentorBookingDetailedResponse]
     total_bookings: int
+
+
+class AvailabilitySlot(BaseModel):
+    """
+    A free interval in a mentor's calendar
+    """
+    start: datetime
+    end: datetime
+
+
+class MentorSlotsResponse(BaseModel):
+    """
+    Free slots of a mentor over a requested range
+    """
+    mentor_id: int
+    range_start: datetime
+    range_end: datetime
+    slots: list[AvailabilitySlot]
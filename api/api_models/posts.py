@@ -2,7 +2,7 @@
 Pydantic models for posts and related entities.
 """
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 from api.api_models.login import UserResponse
@@ -36,6 +36,8 @@ class CommentBriefOut(BaseModel):
     last_modified: datetime
     replies_count: int
     reactions_count: int
+    reactions_breakdown: Dict[str, int] = {}  # {type: count}
+    user_reactions: List[str] = []  # Every type the current user reacted with
 
     class Config:
         from_attributes = True
@@ -51,6 +53,19 @@ class CommentsPage(BaseModel):
     next_cursor: Optional[str]
 
 
+class CommentThreadNode(CommentBriefOut):
+    replies: List["CommentThreadNode"] = []
+    # Continue this node's replies via /comments?parent_comment_id=<id>&cursor=...
+    replies_next_cursor: Optional[str] = None
+
+
+class CommentThreadPage(BaseModel):
+    items: List[CommentThreadNode]
+    next_cursor: Optional[str]
+    # True when the node cap cut the tree short; follow replies_next_cursor / replies_count
+    truncated: bool = False
+
+
 class PostCreate(BaseModel):
     content: str = Field(min_length=1, max_length=50_000)
     group_id: Optional[int] = None
@@ -65,13 +80,15 @@ class PostBriefOut(BaseModel):
     last_modified: datetime
     comments_count: int
     reactions_count: int
+    reactions_breakdown: Dict[str, int] = {}  # {type: count}
+    user_reactions: List[str] = []  # Every type the current user reacted with
 
     class Config:
         from_attributes = True
 
 
 class PostListResponse(PostBriefOut):
-    user_reaction: str | None = None  # Reaction type if the current user reacted
+    user_reaction: str | None = None  # First of user_reactions, kept for older clients
 
 
 class PostOut(PostBriefOut):
@@ -80,7 +97,7 @@ class PostOut(PostBriefOut):
 
 
 class PostOutReaction(PostOut):
-    user_reaction: Optional[str] = None
+    user_reaction: Optional[str] = None  # First of user_reactions, kept for older clients
 
 
 class PostsPage(BaseModel):
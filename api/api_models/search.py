@@ -0,0 +1,24 @@
+"""
+API models for full-text search
+"""
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class SearchResult(BaseModel):
+    kind: str  # post / comment / message
+    id: int
+    rank: float
+    # Matching fragment with terms wrapped in <b>...</b>
+    headline: str
+    author_id: Optional[int] = None
+    date_created: datetime
+    post_id: Optional[int] = None  # posts and comments
+    group_id: Optional[int] = None  # group posts
+    chat_room_id: Optional[int] = None  # messages
+
+
+class SearchPage(BaseModel):
+    items: List[SearchResult]
+    next_cursor: Optional[str]
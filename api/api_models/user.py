@@ -5,7 +5,7 @@ import json
 from datetime import datetime
 from typing import Optional, Any
 from fastapi import HTTPException, status
-from pydantic import BaseModel, Field, ConfigDict, field_validator, EmailStr
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter, field_validator, EmailStr
 from core.exceptions import exceptions
 from utils.enums import UserTypeEnum
 from api.api_models.onboarding import (
@@ -178,6 +178,10 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+# Prebuilt serializer for member listings (see utils.responses.serialized_response)
+USER_LIST_ADAPTER = TypeAdapter(list[UserResponse])
+
+
 class UserUpdate(BaseModel):
     first_name: Optional[str] = Field(None)
     last_name: Optional[str] = Field(None)
@@ -225,5 +229,17 @@ class AllUserResponse(UserBase):
     date_created: datetime
 
 
+class UserSuggestion(BaseModel):
+    """Autocomplete entry; deliberately excludes email and other profile details"""
+    id: int
+    first_name: str
+    last_name: Optional[str] = None
+    profile_pic: Optional[str] = None
+    user_type: str
+    current_role: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class ErrorResponse(BaseModel):
     detail: str
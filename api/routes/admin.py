@@ -1,20 +1,29 @@
 """
 Admin routes for user and event management
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
+from typing import FrozenSet, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from db.database import get_db
 from db.models.user import User
 from api.api_models.user import AllUserResponse, AdminCreateRequest
 from api.api_models.events import EventCreate, EventUpdate, EventResponse
-from api.api_models.login import UserResponse
-from services.user import UserService
+from api.api_models.login import USER_LIST_ADAPTER, UserResponse
+from services.user import UserService, build_user_profiles, profile_load_options
 from services.events import EventService
+from services.exports import stream_export
+from services.availability import sync_availability_windows
+from services.user_index import user_index
+from services.user_fields import list_include, profile_fieldset
+from services.cache import cache
+from api.routes.chat import manager as chat_manager
 from utils.permissions import is_admin
+from utils.responses import serialized_response
 from utils.oauth2 import get_current_user, get_password_hash
-from utils.enums import UserTypeEnum
+from utils.enums import ExportFormatEnum, ExportKindEnum, SortOrderEnum, UserTypeEnum
 from core.exceptions import exceptions
 
 
@@ -23,7 +32,7 @@ admin_router = APIRouter(prefix="/admin", tags=["Admin"])
 
 # User Management Routes
 @admin_router.post("/users/create-admin", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def create_admin_user(
+def create_admin_user(
     admin_data: AdminCreateRequest,
     db: Session = Depends(get_db),
     # current_user: User = Depends(is_admin)
@@ -63,8 +72,13 @@ async def create_admin_user(
         )
 
         db.add(new_admin)
+        db.flush()
+        if new_admin.availability:
+            sync_availability_windows(db, new_admin)
         db.commit()
         db.refresh(new_admin)
+        user_index.upsert(new_admin)
+        cache.invalidate_tags("recent_members")
 
         return new_admin
 
@@ -80,27 +94,38 @@ async def create_admin_user(
 
 
 @admin_router.get("/users", response_model=List[UserResponse])
-async def get_all_users(
+def get_all_users(
     skip: int = 0,
     limit: int = 10,
+    min_completion: Optional[float] = Query(default=None, ge=0, le=100),
+    max_completion: Optional[float] = Query(default=None, ge=0, le=100),
+    completion_order: Optional[SortOrderEnum] = None,
+    fieldset: Optional[FrozenSet[str]] = Depends(profile_fieldset),
     db: Session = Depends(get_db),
     current_user: User = Depends(is_admin)
 ):
-    """Get all users (admin only) - returns same format as login response"""
+    """
+    Get all users (admin only) - returns same format as login response.
+    Optionally filter / sort by stored overall profile completion percentage.
+    Use ?fields= / ?expand= to return (and load) only part of each profile.
+    """
     user_service = UserService(db)
-    users = user_service.get_all_users(skip=skip, limit=limit)
+    users = user_service.get_all_users(
+        skip=skip,
+        limit=limit,
+        min_completion=min_completion,
+        max_completion=max_completion,
+        completion_order=completion_order,
+        fieldset=fieldset,
+    )
     
     # Convert each user to the login response format (UserResponse with full profile)
-    user_profiles = []
-    for user in users:
-        user_profile = user_service.get_user_profile(user.id)
-        user_profiles.append(user_profile)
-    
-    return user_profiles
+    user_profiles = build_user_profiles(users, fieldset)
+    return serialized_response(USER_LIST_ADAPTER, user_profiles, include=list_include(fieldset))
 
 
 @admin_router.patch("/users/{user_id}/user-type")
-async def change_user_type(
+def change_user_type(
     user_id: int,
     new_user_type: UserTypeEnum,
     db: Session = Depends(get_db),
@@ -117,7 +142,7 @@ async def change_user_type(
 
 
 @admin_router.delete("/users/{user_id}")
-async def delete_user(
+def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(is_admin)
@@ -130,7 +155,7 @@ async def delete_user(
 
 # Event Management Routes
 @admin_router.post("/events", response_model=EventResponse, status_code=status.HTTP_201_CREATED)
-async def create_event(
+def create_event(
     event_data: EventCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(is_admin)
@@ -142,7 +167,7 @@ async def create_event(
 
 
 @admin_router.get("/events", response_model=List[EventResponse])
-async def get_all_events(
+def get_all_events(
     skip: int = 0,
     limit: int = 10,
     active_only: bool = False,
@@ -156,7 +181,7 @@ async def get_all_events(
 
 
 @admin_router.get("/events/{event_id}", response_model=EventResponse)
-async def get_event(
+def get_event(
     event_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(is_admin)
@@ -168,7 +193,7 @@ async def get_event(
 
 
 @admin_router.put("/events/{event_id}", response_model=EventResponse)
-async def update_event(
+def update_event(
     event_id: int,
     event_data: EventUpdate,
     db: Session = Depends(get_db),
@@ -181,7 +206,7 @@ async def update_event(
 
 
 @admin_router.delete("/events/{event_id}")
-async def delete_event(
+def delete_event(
     event_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(is_admin)
@@ -193,7 +218,7 @@ async def delete_event(
 
 
 @admin_router.patch("/events/{event_id}/deactivate")
-async def deactivate_event(
+def deactivate_event(
     event_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(is_admin)
@@ -206,7 +231,7 @@ async def deactivate_event(
 
 # Mentor Management Routes
 @admin_router.patch("/mentors/{user_id}/approve")
-async def approve_mentor(
+def approve_mentor(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(is_admin)
@@ -240,21 +265,71 @@ async def approve_mentor(
 
 
 @admin_router.get("/mentors/pending", response_model=List[UserResponse])
-async def get_pending_mentors(
+def get_pending_mentors(
     skip: int = 0,
     limit: int = 10,
     db: Session = Depends(get_db),
     current_user: User = Depends(is_admin)
 ):
     """Get all mentors pending approval (admin only)"""
-    user_service = UserService(db)
-    
     # Get mentors who are not yet approved
-    pending_mentors = db.query(User).filter(
+    pending_mentors = db.query(User).options(*profile_load_options()).filter(
         User.user_type == UserTypeEnum.mentor,
         User.is_approved.is_(False)
     ).offset(skip).limit(limit).all()
     
     # Convert to UserResponse format
-    mentor_profiles = [user_service.get_user_profile(mentor.id) for mentor in pending_mentors]
-    return mentor_profiles
+    mentor_profiles = build_user_profiles(pending_mentors)
+    return serialized_response(USER_LIST_ADAPTER, mentor_profiles)
+
+
+# Reporting Exports
+EXPORT_MEDIA_TYPES = {
+    ExportFormatEnum.ndjson: "application/x-ndjson",
+    ExportFormatEnum.csv: "text/csv",
+}
+
+
+@admin_router.get("/exports/{kind}")
+def export_report(
+    kind: ExportKindEnum,
+    format: ExportFormatEnum = ExportFormatEnum.ndjson,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    current_user: User = Depends(is_admin)
+):
+    """
+    Stream a report as NDJSON or CSV (admin only).
+    Users, posts and annual targets are filtered on creation date, bookings on
+    booking date; both bounds are inclusive.
+    """
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=exceptions.INVALID_DATE_RANGE
+        )
+    filename = f"{kind.value}-{date.today().isoformat()}.{format.value}"
+    return StreamingResponse(
+        stream_export(kind, format, date_from, date_to),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@admin_router.get("/chat/stats")
+def chat_connection_stats(
+    current_user: User = Depends(is_admin)
+) -> dict:
+    """
+    Gauges for this worker's chat connection registry: live sockets, rooms
+    with at least one socket, memberships and approximate bytes held
+    """
+    return chat_manager.stats()
+
+
+@admin_router.get("/cache/stats")
+def cache_stats(
+    current_user: User = Depends(is_admin)
+) -> dict:
+    """Hit/miss counters and local-tier size of this worker's read cache"""
+    return cache.stats()
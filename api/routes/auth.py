@@ -3,11 +3,13 @@ Authentication and Authorization APIs
 """
 import logging
 import secrets
+from functools import partial
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, FrozenSet, Optional
 
+from anyio import from_thread
 from fastapi.security import OAuth2PasswordRequestForm
-from fastapi import APIRouter, File, UploadFile, status, Depends, HTTPException, Response
+from fastapi import APIRouter, File, UploadFile, status, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import RedirectResponse
 
 from sqlalchemy.orm import Session
@@ -17,7 +19,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from api.api_models.user import (
     UserSignup, UserUpdate, AllUserResponse,
     ForgotPasswordRequest, ResetPasswordRequest, ResendVerificationRequest,
-    UserTypeUpdateRequest
+    UserTypeUpdateRequest, UserSuggestion
 )
 from db.database import get_db
 from db.models.user import User
@@ -27,9 +29,14 @@ from db.models.onboarding import (
 )
 from core.exceptions import exceptions
 from core.config import settings
-from services.user import UserService
+from services.user import UserService, build_user_profile, profile_load_options
+from services.user_fields import profile_fieldset
+from services.availability import sync_availability_windows
+from services.profile_completion import ProfileCompletionService
+from services.user_index import autocomplete_users, user_index
+from services.cache import cache
 from api.api_models.login import (
-    Token, UserNewRoleValue, UserResponse, JobSearchStatusModel,
+    Token, USER_ADAPTER, UserNewRoleValue, UserResponse, JobSearchStatusModel,
     RoleOfInterestModel, IndustryModel, SkillsModel, CareerGoalsModel)
 from utils.oauth2 import (
     get_access_token, get_current_user, get_refresh_token, create_reset_token,
@@ -40,13 +47,15 @@ from utils.mail_service import (
     send_email_verification, send_welcome_email
 )
 from utils.enums import UserTypeEnum
+from utils.etag import check_not_modified
+from utils.responses import serialized_response
 
 logger = logging.getLogger(__name__)
 auth_router = APIRouter(tags=["Auth"], prefix="/users")
 
 
 @auth_router.post("/register", status_code=status.HTTP_201_CREATED)
-async def signup(
+def signup(
     user: UserSignup,
     db: Session = Depends(get_db)
 ) -> Any:
@@ -88,6 +97,9 @@ async def signup(
 
         new_user = User(**user_dict)
         db.add(new_user)
+        db.flush()
+        if new_user.availability:
+            sync_availability_windows(db, new_user)
         db.commit()
         db.refresh(new_user)
 
@@ -103,7 +115,7 @@ async def signup(
 
         # Send verification email (non-blocking)
         try:
-            await send_email_verification(new_user.email, new_user.first_name, verification_token)
+            from_thread.run(send_email_verification, new_user.email, new_user.first_name, verification_token)
             email_message = "Account created successfully. Please check your email to verify your account."
         except Exception as e:
             logger.error(f"Failed to send verification email: {e}")
@@ -233,7 +245,7 @@ async def signup(
 
 
 @auth_router.get("/verify-email")
-async def verify_email(
+def verify_email(
     token: str,
     db: Session = Depends(get_db)
 ):
@@ -280,11 +292,14 @@ async def verify_email(
             user.is_active = True
 
         db.commit()
+        if user:
+            user_index.upsert(user)
+            cache.invalidate_tags(f"user:{user.id}", "recent_members")
 
         # Send welcome email (non-blocking)
         if user:
             try:
-                await send_welcome_email(user.email, user.first_name)
+                from_thread.run(send_welcome_email, user.email, user.first_name)
             except Exception as e:
                 logger.error(f"Failed to send welcome email: {e}")
 
@@ -312,7 +327,7 @@ async def verify_email(
 
 
 @auth_router.post("/resend-verification", status_code=status.HTTP_200_OK)
-async def resend_verification(
+def resend_verification(
     request: ResendVerificationRequest,
     db: Session = Depends(get_db)
 ) -> Any:
@@ -343,7 +358,7 @@ async def resend_verification(
 
         # Send verification email (non-blocking)
         try:
-            await send_email_verification(user.email, user.first_name, verification_token)
+            from_thread.run(send_email_verification, user.email, user.first_name, verification_token)
             return {"message": "Verification email sent successfully"}
         except Exception as e:
             logger.error(f"Failed to send verification email: {e}")
@@ -357,7 +372,7 @@ async def resend_verification(
 
 
 @auth_router.patch("/update-user-type", status_code=status.HTTP_200_OK, response_model=UserResponse)
-async def update_user_type(
+def update_user_type(
     request: UserTypeUpdateRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -380,8 +395,11 @@ async def update_user_type(
 
         # Update user type
         user.user_type = UserTypeEnum(request.user_type)
+        # Completion is scored per user type
+        ProfileCompletionService.refresh_user_completion(db, user)
         db.commit()
         db.refresh(user)
+        cache.invalidate_tags(f"user:{user.id}", "recent_members")
 
         return user
     except HTTPException as e:
@@ -448,7 +466,7 @@ async def update_profile_pic(user_id: int, profile_pic: UploadFile = File(...),
 
 
 @auth_router.patch("/update-cover-photo/{user_id}", response_model=UserResponse)
-async def update_cover_photo(
+def update_cover_photo(
     user_id: int,
     cover_photo: UploadFile = File(...),
     db: Session = Depends(get_db),
@@ -492,7 +510,7 @@ async def update_cover_photo(
 @auth_router.get(
     "/all",
     response_model=list[AllUserResponse])
-async def list_users(db: AsyncSession = Depends(get_db), admin=Depends(get_current_user)) -> Any:
+def list_users(db: AsyncSession = Depends(get_db), admin=Depends(get_current_user)) -> Any:
     """Return all users for the super admin"""
     try:
 
@@ -506,7 +524,7 @@ async def list_users(db: AsyncSession = Depends(get_db), admin=Depends(get_curre
 
 
 @auth_router.post('/forgot-password')
-async def forgot_password(request: ForgotPasswordRequest, db: Session = Depends(get_db)):
+def forgot_password(request: ForgotPasswordRequest, db: Session = Depends(get_db)):
     """
     Send a reset password email to the user.
 
@@ -525,13 +543,13 @@ async def forgot_password(request: ForgotPasswordRequest, db: Session = Depends(
 
     reset_token = create_reset_token(email)
 
-    result = await send_password_reset_email(
-        email, reset_token, user.first_name, email_template=None)
+    result = from_thread.run(
+        partial(send_password_reset_email, email, reset_token, user.first_name, email_template=None))
     return result
 
 
 @auth_router.post('/reset-password')
-async def reset_password(request: ResetPasswordRequest, db: Session = Depends(get_db)) -> dict:
+def reset_password(request: ResetPasswordRequest, db: Session = Depends(get_db)) -> dict:
     """
     Reset the user's password with a valid reset token.
 
@@ -555,7 +573,7 @@ async def reset_password(request: ResetPasswordRequest, db: Session = Depends(ge
 
         db.commit()
         db.refresh(user)
-        await send_password_reset_confirmation(email, user.first_name)
+        from_thread.run(send_password_reset_confirmation, email, user.first_name)
 
         return {"message": "Password reset successful"}
     except HTTPException as e:
@@ -567,33 +585,73 @@ async def reset_password(request: ResetPasswordRequest, db: Session = Depends(ge
         )
 
 
+@auth_router.get("/autocomplete", response_model=list[UserSuggestion])
+def autocomplete(
+    q: str = Query(..., min_length=1, max_length=100, description="Name or email prefix, e.g. 'jo' or 'john sm'"),
+    limit: int = Query(10, ge=1, le=25),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    As-you-type user lookup for @mentions and starting direct chats.
+    Matches active users by first name, last name, full name or email prefix;
+    the current user is excluded.
+    """
+    return autocomplete_users(db, q, limit=limit, exclude_id=current_user.id)
+
+
 @auth_router.get("/me", response_model=UserResponse)
-def read_users_me(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)) -> Any:
-    """Get currently logged in user"""
-    db_user = db.query(User).filter(User.id == current_user.id).first()
+def read_users_me(
+    request: Request,
+    response: Response,
+    fieldset: Optional[FrozenSet[str]] = Depends(profile_fieldset),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """Get currently logged in user. Use ?fields= / ?expand= to return (and load) only part of the profile."""
+    not_modified = check_not_modified(
+        request, response, current_user.id, current_user.last_modified,
+        ",".join(sorted(fieldset)) if fieldset else "",
+    )
+    if not_modified:
+        return not_modified
+    db_user = db.query(User).options(*profile_load_options(fieldset)).filter(User.id == current_user.id).first()
     if not db_user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=exceptions.UNAUTHORIZED_USER
         )
-    return db_user
+    return serialized_response(
+        USER_ADAPTER, build_user_profile(db_user, fieldset=fieldset),
+        include=set(fieldset) if fieldset else None, headers=response.headers,
+    )
 
 
 @auth_router.get("/{user_id}", response_model=UserResponse)
 def get_user_profile(
     user_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ) -> Any:
     """Get user's profile"""
-    user_service = UserService(db)
-    user_profile = user_service.get_user_profile(user_id)
-    if not user_profile:
+    last_modified = db.execute(select(User.last_modified).where(User.id == user_id)).scalar_one_or_none()
+    if last_modified is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=exceptions.USER_NOT_FOUND
         )
-    return user_profile
+    not_modified = check_not_modified(request, response, user_id, last_modified)
+    if not_modified:
+        return not_modified
+
+    # Keyed on last_modified as well, so a write that skips invalidation can't serve a stale profile
+    return cache.get_or_set(
+        f"user_profile:{user_id}:{last_modified.timestamp()}",
+        lambda: UserService(db).get_user_profile(user_id).model_dump(mode="json"),
+        tags=[f"user:{user_id}"],
+    )
 
 
 @auth_router.post("/new-role-values", status_code=status.HTTP_200_OK)
@@ -685,6 +743,7 @@ def add_industry(
         db_items = db.query(Industry).filter(Industry.id.in_(industries.industries)).all()
         db_user.industry = db_items
     db.add(db_user)
+    ProfileCompletionService.refresh_user_completion(db, db_user)
     db.commit()
     db.refresh(db_user)
     return db_user
@@ -707,6 +766,7 @@ def add_skills(
         db_items = db.query(Skills).filter(Skills.id.in_(skills.skills)).all()
         db_user.skills = db_items
     db.add(db_user)
+    ProfileCompletionService.refresh_user_completion(db, db_user)
     db.commit()
     db.refresh(db_user)
     return db_user
@@ -731,13 +791,14 @@ def add_career_goals(
         ).all()
         db_user.career_goals = db_items
     db.add(db_user)
+    ProfileCompletionService.refresh_user_completion(db, db_user)
     db.commit()
     db.refresh(db_user)
     return db_user
 
 
 @auth_router.post("/test-email", status_code=status.HTTP_200_OK)
-async def test_email_connection(email: str):
+def test_email_connection(email: str):
     """Test email sending functionality with detailed diagnostics"""
     import ssl
     import smtplib
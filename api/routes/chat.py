@@ -1,198 +1,406 @@
 """
 The main chat endpoint
 """
+import asyncio
 import json
+import logging
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect, status
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Integer, and_, column, exists, func, or_, select, true, update, values
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+from jose import JWTError
 
-from db.database import async_get_db
+from db.database import AsyncSessionLocal
 from core.config import settings
 from db.models.user import User
 from db.models.chat import ChatRoom, ChatRoomMember, Message, MessageDelivery
 from services.chat_manager import ConnectionManager
+from services.chat_transport import ChatConnection, FrameDecodeError, negotiate
+from services.direct_rooms import get_or_create_direct_room
+from services.ephemeral import PRESENCE_STATUSES, TYPING_ACTIONS, ephemeral_throttle
 from services.pubsub_manager import RedisPubSubManager
 from utils.oauth2 import get_current_user_from_request
-from utils.utils import _validate_room_membership, generate_room_name
+from utils.utils import _validate_room_membership
 
 
 chat_router = APIRouter(
     prefix="/chat",
     tags=["Chat"]
 )
+logger = logging.getLogger(__name__)
+
 manager = ConnectionManager()
 pubsub_manager = RedisPubSubManager(redis_url=settings.REDIS_URL)
 
 
+async def _authenticate(token: str) -> Optional[User]:
+    """
+    Resolve the socket's user once, at connect time, with a short-lived
+    session. The returned instance is detached; only its loaded column
+    attributes are used afterwards.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            user = await get_current_user_from_request(token, db)
+        except (HTTPException, JWTError):
+            return None
+        return user or None
+
+
+def _message_payload(mm: Message) -> dict:
+    return {
+        "id": mm.id,
+        "chat_room_id": mm.chat_room_id,
+        "sender_id": mm.sender_id,
+        "content": mm.content,
+        "date_created": mm.date_created.isoformat(),
+        "edited": mm.edited,
+        "deleted": mm.deleted
+    }
+
+
+async def _replay_missed(db: AsyncSession, websocket: ChatConnection, since_by_room: Dict[int, Any]) -> None:
+    """
+    For each room with an integer since_message_id, send the newer messages
+    as one "replay" frame; all rooms are read in a single query, a capped
+    keyset read per room. The socket is already registered for live
+    delivery, so nothing sent meanwhile is lost; a message can arrive both
+    live and in the replay, and clients merge by id. More than
+    CHAT_REPLAY_MAX_MESSAGES missed in a room is reported as a gap for the
+    client to refetch history instead.
+    """
+    since_by_room = {
+        room_id: since for room_id, since in since_by_room.items() if isinstance(since, int)
+    }
+    if not since_by_room:
+        return
+    cap = settings.CHAT_REPLAY_MAX_MESSAGES
+    # One capped keyset read per room on ix_messages_room_id: at most cap + 1
+    # rows per room however far behind the client is
+    since_rows = values(
+        column("room_id", Integer), column("since", Integer), name="since_rows"
+    ).data(list(since_by_room.items()))
+    room_message = aliased(Message)
+    missed = (
+        select(room_message.id)
+        .where(
+            room_message.chat_room_id == since_rows.c.room_id,
+            room_message.id > since_rows.c.since,
+            room_message.deleted.is_(False),
+        )
+        .order_by(room_message.id)
+        .limit(cap + 1)
+        .lateral("missed")
+    )
+    result = await db.execute(
+        select(Message)
+        .select_from(since_rows)
+        .join(missed, true())
+        .join(Message, Message.id == missed.c.id)
+        .order_by(Message.chat_room_id, Message.id)
+    )
+    by_room: Dict[int, List[Message]] = {}
+    for mm in result.scalars().all():
+        by_room.setdefault(mm.chat_room_id, []).append(mm)
+    await db.close()
+    for room_id, since in since_by_room.items():
+        messages = by_room.get(room_id, [])
+        gap = len(messages) > cap
+        await websocket.send_json({
+            "action": "replay",
+            "room_id": room_id,
+            "since_message_id": since,
+            "messages": [] if gap else [_message_payload(mm) for mm in messages],
+            "gap": gap,
+        })
+
+
+async def _join_room(db: AsyncSession, user: User, websocket: ChatConnection, data: dict) -> None:
+    room_id = data.get("room_id")
+    if not room_id:
+        # Check if there is recipient_id for direct chat
+        recipient_id = data.get("recipient_id")
+        if not isinstance(recipient_id, int):
+            await websocket.send_json({"error": "Invalid room or recipient"})
+            return
+        try:
+            room_id = await get_or_create_direct_room(db, user.id, recipient_id)
+        except IntegrityError:
+            await db.rollback()
+            await websocket.send_json({"error": "Invalid room or recipient"})
+            return
+        # Both users are members of their direct room
+        await manager.add_user_to_room(user.id, room_id, websocket)
+        await websocket.send_json({"action": "joined_room", "room_id": room_id})
+        await _replay_missed(db, websocket, {room_id: data.get("since_message_id")})
+        return
+    room = await db.get(ChatRoom, room_id)
+    if not room:
+        await websocket.send_json({"error": "Room does not exist"})
+        return
+    is_member = await _validate_room_membership(db, user.id, room_id)
+    if not is_member and not room.is_public:
+        await websocket.send_json({"error": "Not a member of the room"})
+        return
+    await manager.add_user_to_room(user.id, room_id, websocket)
+    await websocket.send_json({"action": "joined_room", "room_id": room_id})
+    await _replay_missed(db, websocket, {room_id: data.get("since_message_id")})
+
+
+async def _join_rooms(db: AsyncSession, user: User, websocket: ChatConnection, data: dict) -> None:
+    """
+    Join many rooms at once: either the given "room_ids" or, with
+    "all": true, every room the user is a member of. Access and room details
+    come from one query and the rooms are registered under one lock.
+    "since_message_ids" ({room_id: message_id}) replays what was missed.
+    """
+    is_member = exists().where(
+        ChatRoomMember.chat_room_id == ChatRoom.id,
+        ChatRoomMember.user_id == user.id,
+    )
+    stmt = select(ChatRoom.id, ChatRoom.name, ChatRoom.chat_type, ChatRoom.is_public)
+    requested: List[int] = []
+    if data.get("all"):
+        stmt = stmt.where(is_member).order_by(ChatRoom.id)
+    else:
+        room_ids = data.get("room_ids")
+        if not isinstance(room_ids, list) or not all(isinstance(room_id, int) for room_id in room_ids):
+            await websocket.send_json({"error": "room_ids must be a list of room ids"})
+            return
+        requested = list(dict.fromkeys(room_ids))
+        if len(requested) > settings.CHAT_JOIN_ROOMS_MAX:
+            await websocket.send_json({"error": f"Cannot join more than {settings.CHAT_JOIN_ROOMS_MAX} rooms at once"})
+            return
+        stmt = stmt.where(ChatRoom.id.in_(requested), or_(ChatRoom.is_public, is_member))
+    rows = (await db.execute(stmt.limit(settings.CHAT_JOIN_ROOMS_MAX))).all()
+
+    room_ids = [row.id for row in rows]
+    await manager.add_user_to_rooms(user.id, room_ids, websocket)
+    joined = set(room_ids)
+    await websocket.send_json({
+        "action": "joined_rooms",
+        "rooms": [
+            {"id": row.id, "name": row.name, "chat_type": row.chat_type, "is_public": row.is_public}
+            for row in rows
+        ],
+        "rejected": [room_id for room_id in requested if room_id not in joined],
+    })
+
+    since = data.get("since_message_ids") or {}
+    if isinstance(since, dict):
+        # JSON object keys arrive as strings
+        await _replay_missed(db, websocket, {
+            room_id: since.get(str(room_id)) for room_id in room_ids
+        })
+
+
+async def _leave_room(db: AsyncSession, user: User, websocket: ChatConnection, data: dict) -> None:
+    room_id = data.get("room_id")
+    if not room_id:
+        await websocket.send_json({"error": "Invalid room"})
+        return
+    await manager.remove_user_from_room(user.id, room_id)
+    await websocket.send_json({"action": "left_room", "room_id": room_id})
+
+
+async def _send_message(db: AsyncSession, user: User, websocket: ChatConnection, data: dict) -> None:
+    room_id = data.get("room_id")
+    content = data.get("content", "").strip()
+    if not content:
+        await websocket.send_json({"error": "Message content cannot be empty"})
+        return
+    ok = await _validate_room_membership(db, user.id, room_id)
+    room = await db.get(ChatRoom, room_id)
+    if not room or (not ok and not room.is_public):
+        await websocket.send_json({"error": "Not a member or not allowed"})
+        return
+
+    mm = Message(
+        chat_room_id=room_id,
+        sender_id=user.id,
+        content=content
+    )
+    db.add(mm)
+    await db.flush()
+
+    qq = select(
+        ChatRoomMember.user_id
+    ).where(
+        ChatRoomMember.chat_room_id == room_id
+    )
+    result = await db.execute(qq)
+    member_ids = [row[0] for row in result.all()]
+
+    deliveries = []
+    t_now = datetime.now(timezone.utc)
+    for uid in member_ids:
+        deliveries.append(
+            MessageDelivery(message_id=mm.id, user_id=uid, delivered_at=t_now, read_at=None)
+        )
+    db.add_all(deliveries)
+    await db.commit()
+    await db.refresh(mm)
+
+    event = {
+        "action": "message",
+        "message": _message_payload(mm)
+    }
+    # Release the connection before fanning out to sockets and redis
+    await db.close()
+
+    await manager.broadcast_to_room(event, room_id)
+
+    await pubsub_manager.publish_room(room_id, event)
+
+
+async def _ephemeral(user: User, websocket: ChatConnection, data: dict) -> None:
+    """
+    typing / stop_typing / presence: checked against the rooms joined on this
+    socket, coalesced, and fanned out without touching the database.
+    """
+    action = data.get("action")
+    room_id = data.get("room_id")
+    if not manager.is_in_room(user.id, room_id):
+        await websocket.send_json({"error": "Join the room first"})
+        return
+    if action == "presence":
+        channel, state = "presence", data.get("status", "online")
+        if state not in PRESENCE_STATUSES:
+            await websocket.send_json({"error": "Invalid presence status"})
+            return
+        event = {"action": "presence", "room_id": room_id, "user_id": user.id, "status": state}
+    else:
+        channel, state = "typing", TYPING_ACTIONS[action]
+        event = {"action": action, "room_id": room_id, "user_id": user.id}
+    if not ephemeral_throttle.should_emit(user.id, room_id, channel, state):
+        return
+    await manager.broadcast_to_room(event, room_id)
+    await pubsub_manager.publish_room(room_id, event)
+
+
+async def _mark_read(db: AsyncSession, user: User, websocket: ChatConnection, data: dict) -> None:
+    """Persisted read receipt; a message already read is not re-announced"""
+    msg_id = data.get("message_id")
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        update(MessageDelivery)
+        .where(
+            MessageDelivery.message_id == Message.id,
+            MessageDelivery.message_id == msg_id,
+            MessageDelivery.user_id == user.id,
+            MessageDelivery.read_at.is_(None),
+        )
+        .values(read_at=now)
+        .returning(Message.chat_room_id)
+    )
+    chat_room_id = result.scalar_one_or_none()
+    await db.commit()
+    await db.close()
+    if chat_room_id is None:
+        return
+    event = {
+        "action": "read",
+        "message_id": msg_id,
+        "user_id": user.id,
+        "read_at": now.isoformat()
+    }
+
+    await manager.broadcast_to_room(event, chat_room_id)
+    await pubsub_manager.publish_room(chat_room_id, event)
+
+
+ACTION_HANDLERS = {
+    "join_room": _join_room,
+    "join_rooms": _join_rooms,
+    "leave_room": _leave_room,
+    "send_message": _send_message,
+    "mark_read": _mark_read,
+}
+EPHEMERAL_ACTIONS = {"typing", "stop_typing", "presence"}
+
+
+async def _close_quietly(connection: ChatConnection, code: int) -> None:
+    try:
+        await connection.close(code=code)
+    except Exception:
+        pass
+
+
+async def _dispatch(user: User, websocket: ChatConnection, data: Any) -> None:
+    if not data or not isinstance(data, dict):
+        await websocket.send_json({"error": "Invalid action"})
+        return
+    # data should be :
+    # {"action": "join_room"/"leave_room"/"send_message"/"mark_read", "room_id": int, "content": str}
+    # join_room may carry "since_message_id" to replay messages missed while disconnected;
+    # {"action": "join_rooms", "room_ids": [int] or "all": true, "since_message_ids": {room_id: int}}
+    # or an ephemeral {"action": "typing"/"stop_typing"/"presence", "room_id": int}, or {"action": "ping"}
+    if data.get("action") == "ping":
+        # Keep-alive for clients behind proxies that don't pass protocol pings
+        await websocket.send_json({"action": "pong"})
+        return
+    if data.get("action") in EPHEMERAL_ACTIONS:
+        await _ephemeral(user, websocket, data)
+        return
+    handler = ACTION_HANDLERS.get(data.get("action"))
+    if not handler:
+        await websocket.send_json({"error": "Unknown action"})
+        return
+    async with AsyncSessionLocal() as db:
+        await handler(db, user, websocket, data)
+
+
 @chat_router.websocket("/ws")
 async def websocket_endpoint(
     websocket: WebSocket,
     token: str = Query(...),
-    db: AsyncSession = Depends(async_get_db),
 ):
     """
     WebSocket endpoint for real-time chat communication.
-    Requires a valid token and room_id as query parameters.
+    Requires a valid token as a query parameter.
+
+    The socket holds no database connection while idle: the user is
+    authenticated once on connect and every action runs in its own
+    short-lived session. Typing and presence events never open one.
+
+    Clients may offer the "kocha.msgpack.v1" or "kocha.json.v1"
+    subprotocol for batched frames (see services.chat_transport).
+
+    Dead peers are detected by the server's protocol-level pings, so
+    listen-only clients stay connected. CHAT_IDLE_TIMEOUT_SECONDS, if set,
+    additionally closes sockets that send nothing for that long. However the
+    socket ends, the user is removed from the connection registry.
     """
-    await websocket.accept()
-
-    # try:
-    while True:
-        user: User = await get_current_user_from_request(token, db)
-        data = await websocket.receive_json()
-
-        if not data:
-            await websocket.send_json({"error": "Invalid action"})
-            continue
-        # data should be :
-        # {"action": "join_room"/"leave_room"/"message", "room_id": int, "content": str}
-        action = data.get("action")
-        if action == "join_room":
-            room_id = data.get("room_id")
-            # print(f"User {user.id} joining room {room_id}")
-            if not room_id:
-                # Check if there is recipient_id for direct chat
-                recipient_id = data.get("recipient_id")
-                if recipient_id:
-                    recipient = await db.get(User, recipient_id)
-                    if not recipient:
-                        await websocket.send_json({"error": "Invalid room or recipient"})
-                        continue
-                    room_name = generate_room_name(user.email, recipient.email)
-                    room_id_qq = select(ChatRoom.id).where(ChatRoom.name == room_name)
-                    room_result = await db.execute(room_id_qq)
-                    room_id = room_result.scalar_one_or_none()
-                    print(room_id)
-                    if not room_id:
-                        # create the room
-                        new_room = ChatRoom(
-                            name=room_name,
-                            is_public=False,
-                            chat_type="direct",
-                            created_by=user.id
-                        )
-                        db.add(new_room)
-                        await db.flush()
-                        new_member1 = ChatRoomMember(
-                            chat_room_id=new_room.id,
-                            user_id=user.id,
-                            is_admin=False
-                        )
-                        db.add(new_member1)
-                        new_member2 = ChatRoomMember(
-                            chat_room_id=new_room.id,
-                            user_id=recipient.id,
-                            is_admin=False
-                        )
-                        db.add(new_member2)
-                        await db.commit()
-                        room_id = new_room.id
-                # await websocket.send_json({"error": "Invalid room or membership"})
-                # continue
-            room = await db.get(ChatRoom, room_id)
-            if not room:
-                await websocket.send_json({"error": "Room does not exist"})
-                continue
-            is_member = await _validate_room_membership(db, user.id, room_id)
-            if not is_member and not room.is_public:
-                await websocket.send_json({"error": "Not a member of the room"})
-                continue
-            await manager.add_user_to_room(user.id, room_id, websocket)
-            await websocket.send_json({"action": "joined_room", "room_id": room_id})
+    connection = ChatConnection(websocket, negotiate(websocket.scope.get("subprotocols", [])))
+    await connection.accept()
 
-        elif action == "leave_room":
-            room_id = data.get("room_id")
-            if not room_id:
-                await websocket.send_json({"error": "Invalid room"})
-                continue
-            await manager.remove_user_from_room(user.id, room_id)
-            await websocket.send_json({"action": "left_room", "room_id": room_id})
-
-        elif action == "send_message":
-            room_id = data.get("room_id")
-            content = data.get("content", "").strip()
-            if not content:
-                await websocket.send_json({"error": "Message content cannot be empty"})
-                continue
-            ok = await _validate_room_membership(db, user.id, room_id)
-            room = await db.get(ChatRoom, room_id)
-            if not room or (not ok and not room.is_public):
-                await websocket.send_json({"error": "Not a member or not allowed"})
-                continue
+    user = await _authenticate(token)
+    if not user:
+        await connection.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
 
-            mm = Message(
-                chat_room_id=room_id,
-                sender_id=user.id,
-                content=content
-            )
-            db.add(mm)
-            await db.flush()
-
-            qq = select(
-                ChatRoomMember.user_id
-            ).where(
-                ChatRoomMember.chat_room_id == room_id
-            )
-            result = await db.execute(qq)
-            member_ids = [row[0] for row in result.all()]
-
-            deliveries = []
-            t_now = datetime.now(timezone.utc)
-            for uid in member_ids:
-                deliveries.append(
-                    MessageDelivery(message_id=mm.id, user_id=uid, delivered_at=t_now, read_at=None)
-                )
-            db.add_all(deliveries)
-            await db.commit()
-            await db.refresh(mm)
-
-            event = {
-                "action": "message",
-                "message": {
-                    "id": mm.id,
-                    "chat_room_id": mm.chat_room_id,
-                    "sender_id": mm.sender_id,
-                    "content": mm.content,
-                    "date_created": mm.date_created.isoformat(),
-                    "edited": mm.edited,
-                    "deleted": mm.deleted
-                }
-            }
-
-            await manager.broadcast_to_room(event, room_id)
-
-            await pubsub_manager.publish_room(room_id, event)
-
-        elif action == "typing":
-            msg_id = data.get("message_id")
-            now = datetime.now(timezone.utc)
-            nq = select(MessageDelivery).where(
-                MessageDelivery.message_id == msg_id,
-                MessageDelivery.user_id == user.id
-            )
-            nr = await db.execute(nq)
-            md = nr.scalar_one_or_none()
-            if md:
-                md.read_at = now
-                await db.commit()
-                event = {
-                    "action": "typing",
-                    "message_id": msg_id,
-                    "user_id": user.id,
-                    "read_at": now.isoformat()
-                }
-
-                await manager.broadcast_to_room(event, md.message.chat_room_id)
-                await pubsub_manager.publish_room(md.message.chat_room_id, event)
-        else:
-            await websocket.send_json({"error": "Unknown action"})
-    # except WebSocketDisconnect:
-    #     await manager.disconnect(user.id)
-    # except Exception as outer_exc:
-    #     print(f"Error: WebSocket disconnected: {outer_exc.__str__()}")
-    #     await manager.disconnect(user.id)
-    #     try:
-    #         await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
-    #     except Exception:
-    #         pass
+    # 0 leaves idle sockets open (the default)
+    idle_timeout = settings.CHAT_IDLE_TIMEOUT_SECONDS or None
+    try:
+        while True:
+            try:
+                actions = await asyncio.wait_for(connection.receive(), timeout=idle_timeout)
+            except FrameDecodeError:
+                await connection.send_json({"error": "Invalid frame"})
+                continue
+            manager.touch(user.id)
+            for data in actions:
+                await _dispatch(user, connection, data)
+    except WebSocketDisconnect:
+        pass
+    except asyncio.TimeoutError:
+        await _close_quietly(connection, status.WS_1001_GOING_AWAY)
+    except Exception as e:
+        logger.error(f"Chat socket of user {user.id} failed: {str(e)}")
+        await _close_quietly(connection, status.WS_1011_INTERNAL_ERROR)
+    finally:
+        await manager.disconnect(user.id, connection)
+        ephemeral_throttle.forget_user(user.id)
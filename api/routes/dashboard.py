@@ -7,7 +7,7 @@ from pydantic import BaseModel
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, func, or_
 
 from db.database import get_db
 from db.models.user import User
@@ -15,6 +15,7 @@ from db.models.mentors import MentorBooking, MentorPackage
 from utils.oauth2 import get_current_user
 from utils.enums import MentorBookingStatusEnum, UserTypeEnum
 from api.api_models.login import UserResponse
+from services.cache import cached
 
 
 dashboard_router = APIRouter(tags=["Dashboard"], prefix="/dashboard")
@@ -75,6 +76,29 @@ class DashboardResponse(BaseModel):
     needs_user_type_selection: bool
 
 
+@cached("recent_members:{user_type}:{skip}:{limit}", ttl=60, tags=["recent_members"])
+def _recent_members(db: Session, user_type: Optional[UserTypeEnum], skip: int, limit: int) -> list[dict]:
+    """
+    Most recently joined active members, shared by every viewer; callers
+    drop themselves from the list, so ask for one extra.
+    """
+    query = db.query(User).filter(User.is_active == True)
+    if user_type is not None:
+        query = query.filter(User.user_type == user_type)
+    return [
+        RecentMember(
+            id=member.id,
+            name=f"{member.first_name} {member.last_name or ''}".strip(),
+            profile_pic=member.profile_pic,
+            current_role=member.current_role,
+            user_type=member.user_type.value,
+            location=member.location,
+            joined_at=member.date_created
+        ).model_dump(mode="json")
+        for member in query.order_by(User.date_created.desc()).offset(skip).limit(limit).all()
+    ]
+
+
 @dashboard_router.get("/", response_model=DashboardResponse)
 def get_dashboard(
     db: Session = Depends(get_db),
@@ -91,27 +115,32 @@ def get_dashboard(
 
         now = datetime.now(timezone.utc)
 
-        # Get session counts
-        session_counts = SessionCounts()
-
-        # Get bookings where user is either mentor or mentee
-        user_bookings = db.query(MentorBooking).filter(
+        # Get session counts in one aggregate over the user's bookings
+        active = [MentorBookingStatusEnum.accepted, MentorBookingStatusEnum.confirmed]
+        scheduled, pending_approval, past_sessions = db.query(
+            func.count(MentorBooking.id).filter(
+                MentorBooking.status.in_(active), MentorBooking.booking_date > now
+            ),
+            func.count(MentorBooking.id).filter(
+                MentorBooking.status == MentorBookingStatusEnum.pending
+            ),
+            func.count(MentorBooking.id).filter(
+                or_(
+                    MentorBooking.status == MentorBookingStatusEnum.completed,
+                    and_(MentorBooking.status.in_(active), MentorBooking.booking_date <= now)
+                )
+            ),
+        ).filter(
             or_(
                 MentorBooking.mentor_id == user.id,
                 MentorBooking.mentee_id == user.id
             )
-        ).all()
-
-        for booking in user_bookings:
-            if booking.status == MentorBookingStatusEnum.pending:
-                session_counts.pending_approval += 1
-            elif booking.status in [MentorBookingStatusEnum.accepted, MentorBookingStatusEnum.confirmed]:
-                if booking.booking_date > now:
-                    session_counts.scheduled += 1
-                else:
-                    session_counts.past_sessions += 1
-            elif booking.status == MentorBookingStatusEnum.completed:
-                session_counts.past_sessions += 1
+        ).one()
+        session_counts = SessionCounts(
+            scheduled=scheduled,
+            pending_approval=pending_approval,
+            past_sessions=past_sessions
+        )
 
         # Get upcoming sessions (next 5)
         upcoming_bookings = db.query(MentorBooking).filter(
@@ -178,22 +207,9 @@ def get_dashboard(
                 ))
 
         # Get recent members (people who recently joined)
-        recent_users = db.query(User).filter(
-            User.is_active == True,
-            User.id != user.id
-        ).order_by(User.date_created.desc()).limit(5).all()
-
-        recent_members = []
-        for member in recent_users:
-            recent_members.append(RecentMember(
-                id=member.id,
-                name=f"{member.first_name} {member.last_name or ''}".strip(),
-                profile_pic=member.profile_pic,
-                current_role=member.current_role,
-                user_type=member.user_type.value,
-                location=member.location,
-                joined_at=member.date_created
-            ))
+        recent_members = [
+            member for member in _recent_members(db, None, 0, 6) if member["id"] != user.id
+        ][:5]
 
         # Check if user needs to select user type
         needs_user_type_selection = user.user_type == UserTypeEnum.regular
@@ -325,36 +341,14 @@ def get_recent_members(
 ) -> Any:
     """Get recently joined members with optional filtering by user type"""
     try:
-        query = db.query(User).filter(
-            User.is_active == True,
-            User.id != current_user.id
-        )
-
         # Filter by user type if specified
-        if user_type:
-            if user_type == "mentor":
-                query = query.filter(User.user_type == UserTypeEnum.mentor)
-            elif user_type == "mentee":
-                query = query.filter(User.user_type == UserTypeEnum.mentee)
-            elif user_type == "regular":
-                query = query.filter(User.user_type == UserTypeEnum.regular)
-
-        # Order by most recent and apply pagination
-        recent_users = query.order_by(User.date_created.desc()).offset(skip).limit(limit).all()
-
-        recent_members = []
-        for member in recent_users:
-            recent_members.append(RecentMember(
-                id=member.id,
-                name=f"{member.first_name} {member.last_name or ''}".strip(),
-                profile_pic=member.profile_pic,
-                current_role=member.current_role,
-                user_type=member.user_type.value,
-                location=member.location,
-                joined_at=member.date_created
-            ))
+        type_filter = None
+        if user_type in ("mentor", "mentee", "regular"):
+            type_filter = UserTypeEnum(user_type)
 
-        return recent_members
+        # Most recent first, paginated; the viewer is left out
+        members = _recent_members(db, type_filter, skip, limit + 1)
+        return [member for member in members if member["id"] != current_user.id][:limit]
 
     except Exception as e:
         raise HTTPException(
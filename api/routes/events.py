@@ -2,7 +2,7 @@
 Events routes for regular users
 """
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 
 from db.database import get_db
@@ -10,13 +10,14 @@ from db.models.user import User
 from api.api_models.events import EventResponse
 from services.events import EventService
 from utils.oauth2 import get_current_user
+from utils.etag import CACHE_PRIVATE_SHORT, check_not_modified
 
 
 events_router = APIRouter(prefix="/events", tags=["Events"])
 
 
 @events_router.get("/upcoming", response_model=List[EventResponse])
-async def get_upcoming_events(
+def get_upcoming_events(
     skip: int = 0,
     limit: int = 10,
     db: Session = Depends(get_db),
@@ -24,17 +25,24 @@ async def get_upcoming_events(
 ):
     """Get upcoming events (authenticated users)"""
     event_service = EventService(db)
-    events = event_service.get_upcoming_events(skip=skip, limit=limit)
+    events = event_service.get_upcoming_events_cached(skip=skip, limit=limit)
     return events
 
 
 @events_router.get("/{event_id}", response_model=EventResponse)
-async def get_event_detail(
+def get_event_detail(
     event_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get event details (authenticated users)"""
     event_service = EventService(db)
     event = event_service.get_event_by_id(event_id)
+    not_modified = check_not_modified(
+        request, response, event.id, event.last_modified, cache_control=CACHE_PRIVATE_SHORT
+    )
+    if not_modified:
+        return not_modified
     return event
@@ -4,10 +4,10 @@ All feed related routes are defined here.
 from typing import List, Optional
 from datetime import datetime, timezone
 
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy.orm import Session, aliased, selectinload
+from sqlalchemy import Integer, cast, select, func, literal_column, true
 from sqlalchemy.dialects.postgresql import insert as pg_insert
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
 
 from db.models.user import User
 from db.models.posts import Post
@@ -16,14 +16,17 @@ from db.models.comments import Comment
 from db.models.reactions import Reaction
 from api.api_models.posts import (
     PostCreate, PostBriefOut, PostOut, PostsPage,
-    CommentCreate, CommentOut, CommentsPage,
+    CommentCreate, CommentOut, CommentsPage, CommentThreadNode, CommentThreadPage,
     ReactionIn, ReactionOut, PostListResponse,
     PostOutReaction
 )
 
 from db.database import get_db
+from core.config import settings
 from core.exceptions import exceptions
-from utils.oauth2 import get_current_user
+from utils.oauth2 import get_current_user, get_optional_current_user
+from services.timeline import TimelineService, fan_out_post
+from utils.etag import check_not_modified
 from utils.utils import (
     subq_comment_reaction_count,
     subq_post_comment_count,
@@ -32,7 +35,9 @@ from utils.utils import (
     _encode_cursor,
     _decode_cursor,
     _visible_posts_where,
-    _visible_comments_where
+    _visible_comments_where,
+    group_summary,
+    reaction_summary
 )
 
 feed_router = APIRouter(prefix="/feed", tags=["Feed"])
@@ -42,6 +47,7 @@ feed_router = APIRouter(prefix="/feed", tags=["Feed"])
 @feed_router.post("/posts", response_model=PostBriefOut, status_code=status.HTTP_201_CREATED)
 def create_post(
         payload: PostCreate,
+        background_tasks: BackgroundTasks,
         db: Session = Depends(get_db),
         user: User = Depends(get_current_user),
 ):
@@ -64,6 +70,10 @@ def create_post(
     db.commit()
     db.refresh(post)
 
+    # Materialize group posts into member timelines after the response is sent
+    if post.group_id is not None:
+        background_tasks.add_task(fan_out_post, post.id)
+
     # Attach counts (zeros)
     return PostBriefOut(
         id=post.id,
@@ -95,6 +105,7 @@ def delete_post(
             detail=exceptions.NOT_ALLOWED
         )
     post.deleted_at = datetime.now(timezone.utc)
+    TimelineService(db).remove_post(post.id)
     db.commit()
     return
 
@@ -118,12 +129,13 @@ def list_posts(
         .join(subq_post_reaction_count, subq_post_reaction_count.c.post_id == Post.id, isouter=True)
         .where(_visible_posts_where())
     )
+    group = None
     if group_id is not None:
         # validate group exists and is public or accessible (simple rule)
-        g = db.get(Group, group_id)
-        if not g:
+        group = group_summary(db, group_id)
+        if not group:
             raise HTTPException(404, "Group not found")
-        if not g.is_public:
+        if not group["is_public"]:
             raise HTTPException(403, "Group is private")
     stmt = stmt.where(Post.group_id == group_id)
 
@@ -140,24 +152,27 @@ def list_posts(
     items = []
     next_cursor = None
 
-    for row in rows[:limit]:
+    page = rows[:limit]
+    author_ids = {row[0].user_id for row in page}
+    authors = {u.id: u for u in db.query(User).filter(User.id.in_(author_ids)).all()} if author_ids else {}
+    breakdowns, viewer_types = reaction_summary(db, Reaction.post_id, [row[0].id for row in page], user.id)
+    for row in page:
         post: Post = row[0]
-        post_user = db.query(User).filter(User.id == post.user_id).first()
-        user_reaction = db.query(Reaction).filter(
-            Reaction.post_id == post.id,
-            Reaction.user_id == user.id
-        ).first()
+        user_reactions = viewer_types[post.id]
         items.append(
             PostListResponse(
                 id=post.id,
-                user=post_user,
-                group=post.group,
+                user=authors.get(post.user_id),
+                # Every post on the page belongs to the filtered group
+                group=group,
                 content=post.content,
                 date_created=post.date_created,
                 last_modified=post.last_modified,
                 comments_count=row.comments_count,
                 reactions_count=row.reactions_count,
-                user_reaction=user_reaction.type if user_reaction else None
+                reactions_breakdown=breakdowns[post.id],
+                user_reactions=user_reactions,
+                user_reaction=user_reactions[0] if user_reactions else None
             )
         )
 
@@ -168,14 +183,65 @@ def list_posts(
     return PostsPage(items=items, next_cursor=next_cursor)
 
 
+# Personalized home timeline: community posts + posts from the user's groups
+@feed_router.get("/home", response_model=PostsPage)
+def home_feed(
+    db: Session = Depends(get_db),
+    limit: int = Query(20, ge=1, le=100),
+    user: User = Depends(get_current_user),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from previous page"),
+):
+    items, next_cursor = TimelineService(db).home_feed(user, limit=limit, cursor=cursor)
+    return PostsPage(items=items, next_cursor=next_cursor)
+
+
+def _post_detail_version(db: Session, post_id: int):
+    """
+    Cheap version tuple for the post detail response: the post and author
+    timestamps plus counts and high-water marks of its comments and reactions.
+    Returns None if the post doesn't exist or is deleted.
+    """
+    comment_stats = (
+        select(func.count(Comment.id), func.max(Comment.last_modified))
+        .where(Comment.post_id == post_id)
+        .subquery()
+    )
+    reaction_stats = (
+        select(func.count(Reaction.id), func.max(Reaction.id))
+        .outerjoin(Comment, Comment.id == Reaction.comment_id)
+        .where((Reaction.post_id == post_id) | (Comment.post_id == post_id))
+        .subquery()
+    )
+    return db.execute(
+        select(Post.last_modified, User.last_modified, comment_stats, reaction_stats)
+        .join(User, User.id == Post.user_id)
+        .where(Post.id == post_id, _visible_posts_where())
+    ).first()
+
+
 # Get post detail + first page of top-level comments
 @feed_router.get("/posts/{post_id}", response_model=PostOutReaction)
 def get_post_detail(
     post_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     comments_limit: int = Query(10, ge=1, le=100),
     comments_cursor: Optional[str] = Query(None),
+    viewer: Optional[User] = Depends(get_optional_current_user),
 ):
+    version = _post_detail_version(db, post_id)
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=exceptions.POST_NOT_FOUND
+        )
+    # user_reactions depend on who is asking
+    viewer_id = viewer.id if viewer else None
+    not_modified = check_not_modified(request, response, post_id, viewer_id, *version)
+    if not_modified:
+        return not_modified
+
     # Fetch post + counts
     stmt = (
         select(
@@ -206,12 +272,11 @@ def get_post_detail(
         limit=comments_limit,
         cursor=comments_cursor,
         db=db,
+        viewer=viewer,
     )
     user = db.query(User).filter(User.id == post.user_id).first()
-    user_reaction = db.query(Reaction).filter(
-        Reaction.post_id == post.id,
-        Reaction.user_id == user.id
-    ).first()
+    breakdowns, viewer_types = reaction_summary(db, Reaction.post_id, [post.id], viewer_id)
+    user_reactions = viewer_types[post.id]
 
     return PostOutReaction(
         id=post.id,
@@ -222,8 +287,10 @@ def get_post_detail(
         last_modified=post.last_modified,
         comments_count=row.comments_count,
         reactions_count=row.reactions_count,
+        reactions_breakdown=breakdowns[post.id],
+        user_reactions=user_reactions,
         top_level_comments=comments_page,
-        user_reaction=user_reaction.type if user_reaction else None,
+        user_reaction=user_reactions[0] if user_reactions else None,
     )
 
 
@@ -304,6 +371,7 @@ def list_comments(
     limit: int = Query(20, ge=1, le=100),
     cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db),
+    viewer: Optional[User] = Depends(get_optional_current_user),
 ):
     # Validate post exists
     post = db.get(Post, post_id)
@@ -352,18 +420,25 @@ def list_comments(
     items: List[CommentOut] = []
     next_cursor = None
 
-    for row in rows[:limit]:
+    page = rows[:limit]
+    author_ids = {row[0].user_id for row in page}
+    authors = {u.id: u for u in db.query(User).filter(User.id.in_(author_ids)).all()} if author_ids else {}
+    breakdowns, viewer_types = reaction_summary(
+        db, Reaction.comment_id, [row[0].id for row in page], viewer.id if viewer else None
+    )
+    for row in page:
         c: Comment = row[0]
-        comment_user = db.query(User).filter(User.id == c.user_id).first()
         items.append(
             CommentOut(
                 id=c.id,
-                user=comment_user,
+                user=authors.get(c.user_id),
                 content=c.content,
                 date_created=c.date_created,
                 last_modified=c.last_modified,
                 replies_count=row.replies_count,
                 reactions_count=row.reactions_count,
+                reactions_breakdown=breakdowns[c.id],
+                user_reactions=viewer_types[c.id],
             )
         )
 
@@ -374,9 +449,198 @@ def list_comments(
     return CommentsPage(items=items, next_cursor=next_cursor)
 
 
+def _comment_thread_stmt(post_id: int, root_comment_id: Optional[int], depth: int, limit_per_level: int, cursor: Optional[str]):
+    """
+    One recursive CTE for a comment subtree: the first level (top-level
+    comments, or replies to `root_comment_id`) is keyset-paginated, and every
+    node below it gets its newest `limit_per_level` replies via a LATERAL
+    subquery, down to `depth` levels. The first level fetches one extra row
+    to detect a next page; that row is not expanded.
+    """
+    first_level = select(Comment.id, Comment.parent_comment_id, Comment.date_created).where(
+        Comment.post_id == post_id,
+        _visible_comments_where(),
+        (
+            Comment.parent_comment_id.is_(None)
+            if root_comment_id is None
+            else Comment.parent_comment_id == root_comment_id
+        ),
+    )
+    if cursor:
+        ts, last_id = _decode_cursor(cursor)
+        first_level = first_level.where(
+            (Comment.date_created < ts) | ((Comment.date_created == ts) & (Comment.id < last_id))
+        )
+    first_level = first_level.order_by(
+        Comment.date_created.desc(), Comment.id.desc()
+    ).limit(limit_per_level + 1).subquery()
+
+    thread = select(
+        first_level.c.id,
+        literal_column("1").label("depth"),
+        cast(
+            func.row_number().over(
+                order_by=(first_level.c.date_created.desc(), first_level.c.id.desc())
+            ),
+            Integer,
+        ).label("rn"),
+    ).cte("comment_thread", recursive=True)
+
+    children = (
+        select(Comment.id)
+        .where(Comment.parent_comment_id == thread.c.id, _visible_comments_where())
+        .order_by(Comment.date_created.desc(), Comment.id.desc())
+        .limit(limit_per_level)
+        .lateral("children")
+    )
+    thread = thread.union_all(
+        select(children.c.id, thread.c.depth + 1, literal_column("1"))
+        .select_from(thread.join(children, true()))
+        .where(thread.c.depth < depth, thread.c.rn <= limit_per_level)
+    )
+    # Recursive CTEs are evaluated level by level, so the cap keeps the upper levels
+    capped = select(thread).limit(settings.THREAD_MAX_NODES + 1).subquery()
+
+    reply = aliased(Comment)
+    replies_count = select(func.count(reply.id)).where(
+        reply.parent_comment_id == Comment.id, reply.deleted_at.is_(None)
+    ).scalar_subquery()
+    reactions_count = select(func.count(Reaction.id)).where(
+        Reaction.comment_id == Comment.id
+    ).scalar_subquery()
+    # Upper levels first, so cutting the result at the cap never drops a parent
+    # before its replies or a first-level comment (or the next-page row)
+    return select(
+        Comment,
+        capped.c.depth,
+        capped.c.rn,
+        replies_count.label("replies_count"),
+        reactions_count.label("reactions_count"),
+    ).join(capped, capped.c.id == Comment.id).order_by(
+        capped.c.depth, capped.c.rn, Comment.date_created.desc(), Comment.id.desc()
+    )
+
+
+def _thread_depth_within_cap(depth: int, limit_per_level: int) -> int:
+    """
+    The deepest level, up to `depth`, at which a full tree (limit_per_level
+    replies per node, plus the first level's next-page row) fits within
+    THREAD_MAX_NODES. Always at least 1.
+    """
+    nodes = 1
+    for level in range(1, depth + 1):
+        nodes += limit_per_level ** level
+        if nodes > settings.THREAD_MAX_NODES:
+            return max(level - 1, 1)
+    return depth
+
+
+# Nested comment subtree in one query
+@feed_router.get("/posts/{post_id}/thread", response_model=CommentThreadPage)
+def get_comment_thread(
+    post_id: int,
+    root_comment_id: Optional[int] = Query(None, description="Null for the whole post; otherwise the subtree under this comment"),
+    depth: int = Query(3, ge=1, le=10, description="Levels of replies to include"),
+    limit_per_level: int = Query(10, ge=1, le=50, description="Newest comments per parent"),
+    cursor: Optional[str] = Query(None, description="Cursor for the first level, from a previous next_cursor"),
+    db: Session = Depends(get_db),
+    viewer: Optional[User] = Depends(get_optional_current_user),
+):
+    """
+    Return a nested comment thread. Each level is ordered newest first; a
+    node whose replies didn't all fit carries `replies_next_cursor`, which
+    continues them through the /comments endpoint.
+    """
+    post = db.get(Post, post_id)
+    if not post or post.deleted_at is not None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=exceptions.POST_NOT_FOUND
+        )
+    if root_comment_id is not None:
+        root = db.get(Comment, root_comment_id)
+        if not root or root.deleted_at is not None or root.post_id != post_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=exceptions.INVALID_PARENT_COMMENT
+            )
+
+    # Levels that can't be returned in full are left to replies_count / the
+    # /comments endpoint instead of being filled partially
+    max_depth = _thread_depth_within_cap(depth, limit_per_level)
+    rows = db.execute(
+        _comment_thread_stmt(post_id, root_comment_id, max_depth, limit_per_level, cursor)
+    ).all()
+    truncated = max_depth < depth or len(rows) > settings.THREAD_MAX_NODES
+    rows = rows[:settings.THREAD_MAX_NODES]
+
+    # Batch-hydrate authors with their list relationships in one round trip
+    user_ids = {row[0].user_id for row in rows}
+    authors = {
+        u.id: u for u in db.execute(
+            select(User)
+            .options(
+                selectinload(User.new_role_values),
+                selectinload(User.job_search_status),
+                selectinload(User.role_of_interest),
+            )
+            .where(User.id.in_(user_ids))
+        ).scalars()
+    } if user_ids else {}
+
+    breakdowns, viewer_types = reaction_summary(
+        db, Reaction.comment_id, [row[0].id for row in rows], viewer.id if viewer else None
+    )
+
+    newest_first = sorted(rows, key=lambda r: (r[0].date_created, r[0].id), reverse=True)
+    nodes = {}
+    comments = {}
+    depths = {}
+    for row in newest_first:
+        c: Comment = row[0]
+        if row.depth == 1 and row.rn > limit_per_level:
+            continue
+        comments[c.id] = c
+        depths[c.id] = row.depth
+        nodes[c.id] = CommentThreadNode(
+            id=c.id,
+            user=authors[c.user_id],
+            content=c.content,
+            date_created=c.date_created,
+            last_modified=c.last_modified,
+            replies_count=row.replies_count,
+            reactions_count=row.reactions_count,
+            reactions_breakdown=breakdowns[c.id],
+            user_reactions=viewer_types[c.id],
+        )
+
+    items: List[CommentThreadNode] = []
+    for comment_id, node in nodes.items():
+        if depths[comment_id] == 1:
+            items.append(node)
+            continue
+        parent = nodes.get(comments[comment_id].parent_comment_id)
+        if parent is None:
+            # Its parent was cut by the node cap; never promote it to the first level
+            truncated = True
+            continue
+        parent.replies.append(node)
+    for comment_id, node in nodes.items():
+        if node.replies and len(node.replies) < node.replies_count:
+            last = comments[node.replies[-1].id]
+            node.replies_next_cursor = _encode_cursor(last.date_created, last.id)
+
+    next_cursor = None
+    if any(row.depth == 1 and row.rn > limit_per_level for row in rows):
+        last = comments[items[-1].id]
+        next_cursor = _encode_cursor(last.date_created, last.id)
+
+    return CommentThreadPage(items=items, next_cursor=next_cursor, truncated=truncated)
+
+
 # Upsert/Toggle reaction on a post
 @feed_router.put("/posts/{post_id}/reactions")
-async def react_to_post(
+def react_to_post(
     post_id: int,
     payload: ReactionIn,
     db: Session = Depends(get_db),
@@ -405,7 +669,6 @@ async def react_to_post(
     db.commit()
     # db.refresh(result)
     db_reaction = result.fetchone()
-    print(db_reaction[0])
     if not db_reaction:
         raise HTTPException(
             status_code=500, detail="Failed to add reaction"
@@ -1,17 +1,24 @@
 """
 Routes for managing groups
 """
-from typing import List
+from typing import FrozenSet, List, Optional
 from sqlalchemy.orm import Session
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
 
-from api.api_models.user import UserResponse
+from api.api_models.user import USER_LIST_ADAPTER, UserResponse
 from db.database import get_db
 from db.models.groups import Group
 from core.exceptions import exceptions
+from core.config import settings
 from db.models.user import User
 from utils.oauth2 import get_current_user
 from api.api_models.groups import GroupCreate, GroupOut
+from services.timeline import TimelineService, backfill_group
+from utils.etag import check_not_modified
+from services.cache import cache
+from services.user import build_members
+from services.user_fields import MEMBER_FIELDS, list_include, member_fieldset
+from utils.responses import serialized_response
 
 groups_router = APIRouter(tags=["Groups"], prefix="/groups")
 
@@ -68,11 +75,14 @@ def list_groups(
 
 
 @groups_router.get("/{group_id}", response_model=GroupOut)
-def get_group(group_id: int, db: Session = Depends(get_db)):
+def get_group(group_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     g = db.get(Group, group_id)
     if not g:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=exceptions.GROUP_NOT_FOUND)
+    not_modified = check_not_modified(request, response, g.id, g.last_modified)
+    if not_modified:
+        return not_modified
     return GroupOut.model_validate(g)
 
 
@@ -91,6 +101,7 @@ def delete_group(
             status_code=status.HTTP_403_FORBIDDEN, detail=exceptions.GROUP_FORBIDDEN)
     db.delete(g)
     db.commit()
+    cache.invalidate_tags(f"group:{group_id}")
     return
 
 
@@ -108,13 +119,18 @@ def join_group(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=exceptions.GROUP_ALREADY_MEMBER)
     g.members.append(user)
+    g.member_count = Group.member_count + 1
+    db.flush()
+    TimelineService(db).backfill_member(user.id, group_id)
     db.commit()
+    cache.invalidate_tags(f"group:{group_id}")
     return {"detail": "Joined group"}
 
 
 @groups_router.post("/{group_id}/leave", status_code=status.HTTP_200_OK)
 def leave_group(
     group_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     user: int = Depends(get_current_user)
 ):
@@ -126,21 +142,31 @@ def leave_group(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Not a member of the group")
     g.members.remove(user)
+    g.member_count = Group.member_count - 1
+    TimelineService(db).remove_member(user.id, group_id)
     db.commit()
+    cache.invalidate_tags(f"group:{group_id}")
+    # Back under the fan-out threshold: posts written while the group was
+    # read on demand are materialized for the remaining members after the
+    # response is sent, like fan-out on post creation
+    if g.member_count == settings.TIMELINE_FANOUT_MAX_GROUP_SIZE:
+        background_tasks.add_task(backfill_group, group_id)
     return {"detail": "Left group"}
 
 
 @groups_router.get("/{group_id}/members", response_model=List[UserResponse])
 def list_group_members(
     group_id: int,
+    fieldset: Optional[FrozenSet[str]] = Depends(member_fieldset),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
+    """Members of a group. Use ?fields= / ?expand= to return (and load) only part of each user."""
     g = db.get(Group, group_id)
     if not g:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=exceptions.GROUP_NOT_FOUND)
-    group_users = db.query(User).filter(
+    group_users = db.query(User).options(*MEMBER_FIELDS.load_options(fieldset)).filter(
         User.groups.any(id=group_id) | (User.created_groups.any(id=group_id))
     ).all()
-    return group_users
+    return serialized_response(USER_LIST_ADAPTER, build_members(group_users, fieldset), include=list_include(fieldset))
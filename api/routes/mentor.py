@@ -1,8 +1,9 @@
 """
 Route for the mentor resource.
 """
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from datetime import datetime, timedelta, timezone
+from typing import FrozenSet, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.orm import Session
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy import or_, and_
@@ -13,14 +14,25 @@ from utils.enums import UserTypeEnum
 from core.exceptions import exceptions
 from utils.oauth2 import get_current_user
 from db.models.mentors import MentorPackage, MentorBooking
-from api.api_models.login import UserResponse
+from api.api_models.login import USER_LIST_ADAPTER, UserResponse
 from api.api_models.mentors import (
     MentorPackageCreate, MentorPackageResponse,
     MentorBookingResponse, MentorBookingCreate,
-    MentorScheduleResponse, MentorBookingDetailedResponse
+    MentorScheduleResponse, MentorBookingDetailedResponse,
+    AvailabilitySlot, MentorSlotsResponse
 )
 from utils.enums import MentorBookingStatusEnum
-from services.user import UserService
+from services.user import build_user_profiles, profile_load_options
+from services.user_fields import list_include, profile_fieldset
+from services.availability import (
+    MINUTES_PER_DAY, AvailabilityService, available_during, invalidate_mentor_availability,
+    package_duration, parse_minute_of_day, parse_weekday
+)
+from services.bookings import BookingService
+from core.config import settings
+from utils.etag import check_not_modified
+from utils.responses import serialized_response
+from services.cache import cache
 
 
 mentor_router = APIRouter(tags=["Mentor"], prefix="/mentors")
@@ -28,52 +40,57 @@ mentor_router = APIRouter(tags=["Mentor"], prefix="/mentors")
 
 @mentor_router.get("/", response_model=list[UserResponse])
 def get_mentors(
+    fieldset: Optional[FrozenSet[str]] = Depends(profile_fieldset),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    user_service = UserService(db)
-    mentors = db.query(User).filter(
+    """
+    Approved, active mentors. Use ?fields= / ?expand= to return (and load)
+    only part of each profile, e.g. ?fields=id,first_name,last_name,profile_pic
+    """
+    mentors = db.query(User).options(*profile_load_options(fieldset)).filter(
         User.user_type == UserTypeEnum.mentor,
         User.is_active.is_(True),
         User.is_approved.is_(True)
     ).all()
     # Convert to UserResponse format (same as login response)
-    mentor_profiles = [user_service.get_user_profile(mentor.id) for mentor in mentors]
-    return mentor_profiles
+    mentor_profiles = build_user_profiles(mentors, fieldset)
+    return serialized_response(USER_LIST_ADAPTER, mentor_profiles, include=list_include(fieldset))
 
 
 @mentor_router.get("/mentees", response_model=list[UserResponse])
 def get_all_mentees(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    fieldset: Optional[FrozenSet[str]] = Depends(profile_fieldset),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
     """
     Get all mentees in the system.
-    Only accessible by mentors.
+    Only accessible by mentors. Supports ?fields= / ?expand=.
     """
 
-    user_service = UserService(db)
-    mentees = db.query(User).filter(
+    mentees = db.query(User).options(*profile_load_options(fieldset)).filter(
         User.user_type == UserTypeEnum.mentee,
         User.is_active.is_(True)
     ).offset(skip).limit(limit).all()
 
     # Convert to UserResponse format (same as login response)
-    mentee_profiles = [user_service.get_user_profile(mentee.id) for mentee in mentees]
-    return mentee_profiles
+    mentee_profiles = build_user_profiles(mentees, fieldset)
+    return serialized_response(USER_LIST_ADAPTER, mentee_profiles, include=list_include(fieldset))
 
 
 @mentor_router.get("/mentees/me", response_model=list[UserResponse])
 def get_my_mentees(
+    fieldset: Optional[FrozenSet[str]] = Depends(profile_fieldset),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
     """
     Get all mentees who have bookings with the current mentor.
     Returns unique mentees who have had at least one booking with the mentor.
-    Only accessible by mentors.
+    Only accessible by mentors. Supports ?fields= / ?expand=.
     """
     if user.user_type != UserTypeEnum.mentor:
         raise HTTPException(
@@ -81,8 +98,6 @@ def get_my_mentees(
             detail="Only mentors can access this resource."
         )
     
-    user_service = UserService(db)
-    
     # Get unique mentees who have bookings with this mentor
     mentee_ids = db.query(MentorBooking.mentee_id).filter(
         MentorBooking.mentor_id == user.id
@@ -92,14 +107,14 @@ def get_my_mentees(
     mentee_id_list = [mentee_id[0] for mentee_id in mentee_ids]
     
     # Fetch full user details for these mentees
-    mentees = db.query(User).filter(
+    mentees = db.query(User).options(*profile_load_options(fieldset)).filter(
         User.id.in_(mentee_id_list),
         User.is_active.is_(True)
     ).all()
     
     # Convert to UserResponse format (same as login response)
-    mentee_profiles = [user_service.get_user_profile(mentee.id) for mentee in mentees]
-    return mentee_profiles
+    mentee_profiles = build_user_profiles(mentees, fieldset)
+    return serialized_response(USER_LIST_ADAPTER, mentee_profiles, include=list_include(fieldset))
 
 
 @mentor_router.get("/search", response_model=list[UserResponse])
@@ -111,6 +126,9 @@ def search_mentors(
     role_ids: Optional[str] = Query(None, description="Comma-separated role of interest IDs"),
     min_price: Optional[int] = Query(None, description="Minimum package price"),
     max_price: Optional[int] = Query(None, description="Maximum package price"),
+    available_day: Optional[str] = Query(None, description="Weekday the mentor is available (e.g. Tuesday)"),
+    available_from: Optional[str] = Query(None, description="Start of the time of day, HH:MM UTC (needs available_day)"),
+    available_to: Optional[str] = Query(None, description="End of the time of day, HH:MM UTC (needs available_day)"),
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     db: Session = Depends(get_db),
@@ -125,6 +143,7 @@ def search_mentors(
     - /mentors/search?skill_ids=1,2,3
     - /mentors/search?min_price=5000&max_price=20000
     - /mentors/search?query=software&location=Nigeria&skill_ids=5
+    - /mentors/search?skill_ids=5&available_day=Tuesday&available_from=18:00&available_to=21:00
     """
     try:
         # Base query - only active mentors
@@ -189,6 +208,19 @@ def search_mentors(
             if max_price is not None:
                 mentor_query = mentor_query.filter(MentorPackage.price <= max_price)
 
+        # Filter by weekly availability (overlap with any normalized window)
+        if available_day or available_from or available_to:
+            day = parse_weekday(available_day or "")
+            if day is None:
+                raise ValueError("available_day must be a weekday name")
+            start_min = parse_minute_of_day(available_from) if available_from else 0
+            end_min = parse_minute_of_day(available_to) if available_to else MINUTES_PER_DAY
+            if start_min is None or end_min is None or end_min <= start_min:
+                raise ValueError("available_from/available_to must be HH:MM with from before to")
+            mentor_query = mentor_query.filter(
+                available_during(User.id, day, start_min, end_min)
+            )
+
         # Remove duplicates (in case of multiple package matches)
         mentor_query = mentor_query.distinct()
 
@@ -227,6 +259,7 @@ def create_mentor_package(
         insert(MentorPackage).values(**new_package).returning(MentorPackage)
     ).scalar_one()
     db.commit()
+    cache.invalidate_tags("mentor_packages")
     return mentor_package
 
 
@@ -241,10 +274,14 @@ def get_mentors_packages(
             detail="Only mentees can access this resource."
         )
     # Logic to fetch and return mentor packages would go here
-    all_packages = db.query(MentorPackage).filter(
-        MentorPackage.is_active.is_(True)
-    ).all()
-    return all_packages
+    return cache.get_or_set(
+        "mentor_packages:active",
+        lambda: [
+            MentorPackageResponse.model_validate(package).model_dump(mode="json")
+            for package in db.query(MentorPackage).filter(MentorPackage.is_active.is_(True)).all()
+        ],
+        tags=["mentor_packages"],
+    )
 
 
 @mentor_router.get("/packages/me", response_model=list[MentorPackageResponse])
@@ -290,6 +327,7 @@ def update_mentor_package(
         setattr(mentor_package, key, value)
     db.commit()
     db.refresh(mentor_package)
+    cache.invalidate_tags("mentor_packages")
     return mentor_package
 
 
@@ -316,6 +354,7 @@ def delete_mentor_package(
         )
     db.delete(mentor_package)
     db.commit()
+    cache.invalidate_tags("mentor_packages")
     return
 
 
@@ -332,14 +371,9 @@ def create_mentor_booking(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=exceptions.MENTEES_RESTRICTION_TO_BOOKINGS
         )
-    # Logic to create a mentor booking would go here
-    booking_data = booking.model_dump()
-    booking_data["mentee_id"] = user.id
-    created_booking = MentorBooking(**booking_data)
-    db.add(created_booking)
-    db.commit()
-    db.refresh(created_booking)
-    return created_booking
+    if booking.booking_date.tzinfo is None:
+        booking.booking_date = booking.booking_date.replace(tzinfo=timezone.utc)
+    return BookingService(db).create_booking(user, booking)
 
 
 @mentor_router.patch(
@@ -347,6 +381,7 @@ def create_mentor_booking(
 )
 def cancel_booking(
     booking_id: int,
+    version: Optional[int] = Query(None, description="Version the client last saw; 409 if it changed"),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
@@ -374,10 +409,7 @@ def cancel_booking(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=exceptions.MENTEE_BOOKING_FORBIDDEN
         )
-    booking.status = MentorBookingStatusEnum.cancelled.value
-    db.commit()
-    db.refresh(booking)
-    return booking
+    return BookingService(db).transition(booking, MentorBookingStatusEnum.cancelled, version)
 
 
 @mentor_router.patch(
@@ -385,6 +417,7 @@ def cancel_booking(
 )
 def confirm_booking(
     booking_id: int,
+    version: Optional[int] = Query(None, description="Version the client last saw; 409 if it changed"),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
@@ -403,10 +436,7 @@ def confirm_booking(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=exceptions.MENTOR_BOOKING_NOT_FOUND
         )
-    booking.status = MentorBookingStatusEnum.confirmed.value
-    db.commit()
-    db.refresh(booking)
-    return booking
+    return BookingService(db).transition(booking, MentorBookingStatusEnum.confirmed, version)
 
 
 @mentor_router.get(
@@ -553,6 +583,7 @@ def delete_booking(
             )
         db.delete(booking)
         db.commit()
+        invalidate_mentor_availability(booking.mentor_id)
         return
     except (Exception, HTTPException) as e:
         raise HTTPException(
@@ -596,13 +627,60 @@ def get_packages_for_mentor(
 @mentor_router.get("{mentor_id}/details", response_model=UserResponse)
 def get_mentor_details(
     mentor_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
     """
     Get details of a specific mentor.
     """
-    # Logic to fetch and return mentor details would go here
+    mentor_filter = (
+        User.id == mentor_id,
+        User.user_type == UserTypeEnum.mentor,
+        User.is_active.is_(True)
+    )
+    last_modified = db.query(User.last_modified).filter(*mentor_filter).scalar()
+    if last_modified is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=exceptions.MENTOR_NOT_FOUND
+        )
+    not_modified = check_not_modified(request, response, mentor_id, last_modified)
+    if not_modified:
+        return not_modified
+
+    return db.query(User).filter(*mentor_filter).first()
+
+
+@mentor_router.get("/{mentor_id}/slots", response_model=MentorSlotsResponse)
+def get_mentor_free_slots(
+    mentor_id: int,
+    range_start: datetime = Query(..., alias="from", description="Start of the range (ISO 8601)"),
+    range_end: datetime = Query(..., alias="to", description="End of the range (ISO 8601)"),
+    package_id: Optional[int] = Query(None, description="Split free time into slots of this package's duration"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """
+    Free time of a mentor between `from` and `to`: the mentor's weekly
+    availability minus pending/accepted/confirmed bookings. Naive datetimes
+    are treated as UTC.
+
+    Examples:
+    - /mentors/5/slots?from=2025-01-06T00:00:00Z&to=2025-01-13T00:00:00Z
+    - /mentors/5/slots?from=2025-01-06T00:00:00Z&to=2025-01-07T00:00:00Z&package_id=3
+    """
+    if range_start.tzinfo is None:
+        range_start = range_start.replace(tzinfo=timezone.utc)
+    if range_end.tzinfo is None:
+        range_end = range_end.replace(tzinfo=timezone.utc)
+    if range_end <= range_start or range_end - range_start > timedelta(days=settings.MAX_SLOT_RANGE_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=exceptions.INVALID_SLOT_RANGE
+        )
+
     mentor = db.query(User).filter(
         User.id == mentor_id,
         User.user_type == UserTypeEnum.mentor,
@@ -613,7 +691,27 @@ def get_mentor_details(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=exceptions.MENTOR_NOT_FOUND
         )
-    return mentor
+
+    slot_length = None
+    if package_id is not None:
+        package = db.query(MentorPackage).filter(
+            MentorPackage.id == package_id,
+            MentorPackage.user_id == mentor_id
+        ).first()
+        if not package:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=exceptions.MENTOR_PACKAGE_NOT_FOUND
+            )
+        slot_length = package_duration(package)
+
+    free = AvailabilityService(db).free_slots(mentor, range_start, range_end, slot_length)
+    return MentorSlotsResponse(
+        mentor_id=mentor_id,
+        range_start=range_start,
+        range_end=range_end,
+        slots=[AvailabilitySlot(start=lo, end=hi) for lo, hi in free]
+    )
 
 
 @mentor_router.get("/{mentor_id}/schedule", response_model=MentorScheduleResponse)
@@ -1,5 +1,5 @@
 from typing import Any, List
-from fastapi import APIRouter, HTTPException, Request, Depends, status
+from fastapi import APIRouter, HTTPException, Request, Response, Depends, status
 from db.database import get_db
 from sqlalchemy import select
 from sqlalchemy.orm import Session
@@ -17,69 +17,76 @@ from api.api_models.onboarding import (
 )
 from db.models.user import User
 from utils.oauth2 import get_current_user
+from services.profile_completion import ProfileCompletionService
+from utils.etag import CACHE_PUBLIC_REFERENCE
 
 
 onboarding_router = APIRouter(tags=["Onabording Questions"], prefix="/onbarding")
 
 
-@onboarding_router.get("/new-role-values")
-async def list_role_values(db: AsyncSession = Depends(get_db)) -> List[NewRoleValueResponse]:
+def reference_data_cache(response: Response) -> None:
+    """Taxonomies are public and rarely change; also lets the compression middleware reuse their bodies"""
+    response.headers["Cache-Control"] = CACHE_PUBLIC_REFERENCE
+
+
+@onboarding_router.get("/new-role-values", dependencies=[Depends(reference_data_cache)])
+def list_role_values(db: AsyncSession = Depends(get_db)) -> List[NewRoleValueResponse]:
     all_role_values = select(NewRoleValue)
     all_roles_result = db.execute(all_role_values)
     return all_roles_result.scalars().all()
 
 
-@onboarding_router.get("/job-search-status")
-async def list_job_search_status(db: AsyncSession = Depends(get_db)) -> List[OnboardingBase]:
+@onboarding_router.get("/job-search-status", dependencies=[Depends(reference_data_cache)])
+def list_job_search_status(db: AsyncSession = Depends(get_db)) -> List[OnboardingBase]:
     all_job_steach_status = select(JobSearchStatus)
     all_job_steach_statuses = db.execute(all_job_steach_status)
     return all_job_steach_statuses.scalars().all()
 
 
-@onboarding_router.get("/role-interest")
-async def list_role_of_interest(db: AsyncSession = Depends(get_db)) -> List[RoleofInterestResponse]:
+@onboarding_router.get("/role-interest", dependencies=[Depends(reference_data_cache)])
+def list_role_of_interest(db: AsyncSession = Depends(get_db)) -> List[RoleofInterestResponse]:
     all_role_interest = select(RoleofInterest)
     all_role_interest_result = db.execute(all_role_interest)
     return all_role_interest_result.scalars().all()
 
 
-@onboarding_router.get("/industry")
-async def list_industries(db: AsyncSession = Depends(get_db)) -> List[OnboardingBase]:
+@onboarding_router.get("/industry", dependencies=[Depends(reference_data_cache)])
+def list_industries(db: AsyncSession = Depends(get_db)) -> List[OnboardingBase]:
     all_industries = select(Industry)
     all_industries_result = db.execute(all_industries)
     return all_industries_result.scalars().all()
 
 
-@onboarding_router.get("/skills")
-async def list_skills(db: AsyncSession = Depends(get_db)) -> List[OnboardingBase]:
+@onboarding_router.get("/skills", dependencies=[Depends(reference_data_cache)])
+def list_skills(db: AsyncSession = Depends(get_db)) -> List[OnboardingBase]:
     all_skills = select(Skills)
     all_skills_result = db.execute(all_skills)
     return all_skills_result.scalars().all()
 
 
-@onboarding_router.get("/career-goals")
-async def list_career_goals(db: AsyncSession = Depends(get_db)) -> List[OnboardingBase]:
+@onboarding_router.get("/career-goals", dependencies=[Depends(reference_data_cache)])
+def list_career_goals(db: AsyncSession = Depends(get_db)) -> List[OnboardingBase]:
     all_career_goals = select(CareerGoals)
     all_career_goals_result = db.execute(all_career_goals)
     return all_career_goals_result.scalars().all()
 
 
-@onboarding_router.get("/mentoring-frequency")
-async def list_mentoring_frequency(db: AsyncSession = Depends(get_db)) -> List[MentoringFrequencyResponse]:
+@onboarding_router.get("/mentoring-frequency", dependencies=[Depends(reference_data_cache)])
+def list_mentoring_frequency(db: AsyncSession = Depends(get_db)) -> List[MentoringFrequencyResponse]:
     all_frequencies = select(MentoringFrequency)
     all_frequencies_result = db.execute(all_frequencies)
     return all_frequencies_result.scalars().all()
 
 
-@onboarding_router.get("/mentoring-format")
-async def list_mentoring_format(db: AsyncSession = Depends(get_db)) -> List[MentoringFormatResponse]:
+@onboarding_router.get("/mentoring-format", dependencies=[Depends(reference_data_cache)])
+def list_mentoring_format(db: AsyncSession = Depends(get_db)) -> List[MentoringFormatResponse]:
     all_formats = select(MentoringFormat)
     all_formats_result = db.execute(all_formats)
     return all_formats_result.scalars().all()
 
 
 @onboarding_router.post("/complete")
-async def complete_onboarding(
+def complete_onboarding(
     onboarding_data: CompleteOnboardingRequest,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -176,6 +183,7 @@ async def complete_onboarding(
     # Mark onboarding as complete
     current_user.code_of_conduct_accepted = True
     current_user.onboarding_completed = True
+    ProfileCompletionService.refresh_user_completion(db, current_user)
 
     # Save to database
     db.commit()
@@ -190,7 +198,7 @@ async def complete_onboarding(
 
 
 @onboarding_router.get("/my-data", response_model=UserOnboardingDataResponse)
-async def get_my_onboarding_data(
+def get_my_onboarding_data(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> UserOnboardingDataResponse:
@@ -21,7 +21,7 @@ profile_router = APIRouter(tags=["Profile"], prefix="/profile")
 
 
 @profile_router.get("/completion", response_model=ProfileCompletionResponse)
-async def get_profile_completion(
+def get_profile_completion(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> ProfileCompletionResponse:
@@ -32,41 +32,21 @@ async def get_profile_completion(
     - Annual target completion %
     - Overall completion % (average of both)
     """
-    # Refresh user to load all relationships
-    db.refresh(current_user, [
-        'industry', 'skills', 'career_goals',
-        'mentoring_frequency', 'mentoring_format', 'annual_targets'
-    ])
-
-    # Calculate profile completion
-    profile_details = ProfileCompletionService.calculate_profile_completion(current_user)
-
-    # Calculate annual target completion
-    annual_targets_summary = ProfileCompletionService.calculate_annual_target_completion(
-        current_user.annual_targets
-    )
-
-    # Calculate overall completion
-    overall_percentage = ProfileCompletionService.calculate_overall_completion(
-        profile_details["percentage"],
-        annual_targets_summary["percentage"]
-    )
-
-    user_type = current_user.user_type.value if hasattr(current_user.user_type, 'value') else current_user.user_type
+    completion = ProfileCompletionService.get_user_completion(db, current_user)
 
     return ProfileCompletionResponse(
-        user_type=user_type,
-        profile_completion_percentage=profile_details["percentage"],
-        annual_target_completion_percentage=annual_targets_summary["percentage"],
-        overall_completion_percentage=overall_percentage,
-        profile_details=profile_details,
-        annual_targets_summary=annual_targets_summary
+        user_type=completion.user_type,
+        profile_completion_percentage=completion.profile_percentage,
+        annual_target_completion_percentage=completion.annual_target_percentage,
+        overall_completion_percentage=completion.overall_percentage,
+        profile_details=completion.profile_details,
+        annual_targets_summary=completion.annual_targets_summary
     )
 
 
 # Annual Target Endpoints
 @profile_router.post("/annual-targets", response_model=AnnualTargetResponse, status_code=status.HTTP_201_CREATED)
-async def create_annual_target(
+def create_annual_target(
     target: AnnualTargetCreate,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -81,6 +61,7 @@ async def create_annual_target(
     )
 
     db.add(new_target)
+    ProfileCompletionService.refresh_user_completion(db, current_user)
     db.commit()
     db.refresh(new_target)
 
@@ -88,7 +69,7 @@ async def create_annual_target(
 
 
 @profile_router.get("/annual-targets", response_model=List[AnnualTargetResponse])
-async def get_my_annual_targets(
+def get_my_annual_targets(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> List[AnnualTarget]:
@@ -98,7 +79,7 @@ async def get_my_annual_targets(
 
 
 @profile_router.get("/annual-targets/{target_id}", response_model=AnnualTargetResponse)
-async def get_annual_target(
+def get_annual_target(
     target_id: int,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -124,7 +105,7 @@ async def get_annual_target(
 
 
 @profile_router.patch("/annual-targets/{target_id}", response_model=AnnualTargetResponse)
-async def update_annual_target(
+def update_annual_target(
     target_id: int,
     target_update: AnnualTargetUpdate,
     db: AsyncSession = Depends(get_db),
@@ -152,6 +133,7 @@ async def update_annual_target(
     for field, value in update_data.items():
         setattr(target, field, value)
 
+    ProfileCompletionService.refresh_user_completion(db, current_user)
     db.commit()
     db.refresh(target)
 
@@ -159,7 +141,7 @@ async def update_annual_target(
 
 
 @profile_router.delete("/annual-targets/{target_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_annual_target(
+def delete_annual_target(
     target_id: int,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -182,6 +164,7 @@ async def delete_annual_target(
         )
 
     db.delete(target)
+    ProfileCompletionService.refresh_user_completion(db, current_user)
     db.commit()
 
     return None
@@ -0,0 +1,36 @@
+"""
+Full-text search routes
+"""
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from db.database import get_db
+from db.models.user import User
+from api.api_models.search import SearchPage
+from services.search import SearchService
+from utils.enums import SearchScopeEnum
+from utils.oauth2 import get_current_user
+
+
+search_router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@search_router.get("/", response_model=SearchPage)
+def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text; supports \"quoted phrases\", OR and -exclusion"),
+    scope: SearchScopeEnum = Query(SearchScopeEnum.all),
+    limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from previous page"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Ranked search across community and group posts, comments and chat
+    messages the current user can see.
+
+    Examples:
+    - /search?q=career change
+    - /search?q="product manager" -intern&scope=posts
+    """
+    return SearchService(db).search(user, q, scope=scope, limit=limit, cursor=cursor)
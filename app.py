@@ -3,11 +3,18 @@ Entry point into the backend application
 """
 from typing import Any
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 
+from core.config import settings
 from db.database import get_db
+from services.loop_monitor import loop_monitor
+from services.scheduler import scheduler
+from services.user_index import user_index
+from services.cache import cache
+from utils.compression import CompressionMiddleware
 from db.repository.seed import seed_initial_onboarding_data
 
 from api.routes.auth import auth_router
@@ -15,12 +22,13 @@ from api.routes.onabording import onboarding_router
 from api.routes.feed import feed_router
 from api.routes.groups import groups_router
 from api.routes.mentor import mentor_router
-from api.routes.chat import chat_router
+from api.routes.chat import chat_router, manager as chat_manager
 from api.routes.chat_utils import chat_utils_router
 from api.routes.admin import admin_router
 from api.routes.events import events_router
 from api.routes.dashboard import dashboard_router
 from api.routes.profile import profile_router
+from api.routes.search import search_router
 
 
 async def lifespan(db: Session) -> Any:
@@ -30,14 +38,35 @@ async def lifespan(db: Session) -> Any:
 
 @asynccontextmanager
 async def startup_event(app: FastAPI):
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
     with next(get_db()) as db:
         await lifespan(db)
+    if settings.SCHEDULER_ENABLED:
+        scheduler.start()
+    if settings.USER_INDEX_ENABLED:
+        user_index.start(settings.USER_INDEX_REFRESH_SECONDS)
+    cache.start()
+    # Idle sockets (if an idle timeout is set) are closed by their own endpoint;
+    # the reaper catches what that misses
+    chat_manager.start_reaper(
+        settings.CHAT_REAPER_INTERVAL_SECONDS, idle_timeout=2 * settings.CHAT_IDLE_TIMEOUT_SECONDS or None
+    )
     yield
+    await chat_manager.stop_reaper()
+    cache.stop()
+    if settings.USER_INDEX_ENABLED:
+        await user_index.stop()
+    if settings.SCHEDULER_ENABLED:
+        await scheduler.stop()
+    if settings.LOOP_MONITOR_ENABLED:
+        await loop_monitor.stop()
 
 
 app = FastAPI(
     title="Kocha Mentors CIC API Spec",
     lifespan=startup_event,
+    default_response_class=ORJSONResponse,
 )
 
 
@@ -48,6 +77,15 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        content_types=settings.COMPRESSION_CONTENT_TYPES.split(","),
+        cache_max_entries=settings.COMPRESSION_CACHE_MAX_ENTRIES,
+    )
 
 
 @app.get("/")
@@ -72,3 +110,4 @@ app.include_router(chat_utils_router, prefix=v1_prefix)
 app.include_router(admin_router, prefix=v1_prefix)
 app.include_router(events_router, prefix=v1_prefix)
 app.include_router(dashboard_router, prefix=v1_prefix)
+app.include_router(search_router, prefix=v1_prefix)
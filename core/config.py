@@ -23,8 +23,69 @@ class Settings:
         "POSTGRES_URL",
         f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}"
     )
+    # Async (chat) connection pool
+    ASYNC_DB_POOL_SIZE: int = int(os.environ.get("ASYNC_DB_POOL_SIZE", 5))
+    ASYNC_DB_MAX_OVERFLOW: int = int(os.environ.get("ASYNC_DB_MAX_OVERFLOW", 5))
+    ASYNC_DB_POOL_TIMEOUT: int = int(os.environ.get("ASYNC_DB_POOL_TIMEOUT", 10))
     # Redis connection
     REDIS_URL: str = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+    # Chat typing/presence events: repeats of the same state per user and room are coalesced
+    CHAT_EPHEMERAL_INTERVAL_MS: int = int(os.environ.get("CHAT_EPHEMERAL_INTERVAL_MS", 1000))
+    # Messages replayed to a rejoining socket; a larger gap tells the client to refetch history
+    CHAT_REPLAY_MAX_MESSAGES: int = int(os.environ.get("CHAT_REPLAY_MAX_MESSAGES", 200))
+    # Max rooms a socket can join with one join_rooms action
+    CHAT_JOIN_ROOMS_MAX: int = int(os.environ.get("CHAT_JOIN_ROOMS_MAX", 200))
+    # Sockets on a compact subprotocol get outbound events batched per flush window
+    CHAT_FLUSH_WINDOW_MS: int = int(os.environ.get("CHAT_FLUSH_WINDOW_MS", 15))
+    CHAT_MAX_FRAME_EVENTS: int = int(os.environ.get("CHAT_MAX_FRAME_EVENTS", 100))
+    # Chat sockets silent for this long are closed (0: never, rely on protocol pings);
+    # the reaper purges closed sockets and stale registry entries
+    CHAT_IDLE_TIMEOUT_SECONDS: int = int(os.environ.get("CHAT_IDLE_TIMEOUT_SECONDS", 0))
+    CHAT_REAPER_INTERVAL_SECONDS: int = int(os.environ.get("CHAT_REAPER_INTERVAL_SECONDS", 60))
+    # Two-tier read cache (process-local LRU in front of Redis)
+    CACHE_ENABLED: bool = os.environ.get("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_REDIS_URL: str = os.environ.get("CACHE_REDIS_URL", REDIS_URL)
+    CACHE_LOCAL_MAX_ENTRIES: int = int(os.environ.get("CACHE_LOCAL_MAX_ENTRIES", 2048))
+    CACHE_LOCAL_TTL_SECONDS: int = int(os.environ.get("CACHE_LOCAL_TTL_SECONDS", 30))
+    CACHE_DEFAULT_TTL_SECONDS: int = int(os.environ.get("CACHE_DEFAULT_TTL_SECONDS", 300))
+    # Home timeline
+    TIMELINE_MAX_ENTRIES: int = int(os.environ.get("TIMELINE_MAX_ENTRIES", 500))
+    TIMELINE_FANOUT_MAX_GROUP_SIZE: int = int(os.environ.get("TIMELINE_FANOUT_MAX_GROUP_SIZE", 1000))
+    # Comment thread endpoint: max comments returned per request
+    THREAD_MAX_NODES: int = int(os.environ.get("THREAD_MAX_NODES", 500))
+    # Admin exports: rows fetched per server-side cursor round trip
+    EXPORT_BATCH_SIZE: int = int(os.environ.get("EXPORT_BATCH_SIZE", 500))
+    # Mentor availability slot engine
+    DEFAULT_BOOKING_MINUTES: int = int(os.environ.get("DEFAULT_BOOKING_MINUTES", 60))
+    # Redis lifetime of a mentor's cached windows and busy intervals. Changes invalidate them in every
+    # worker; a missed invalidation is bounded by CACHE_LOCAL_TTL_SECONDS in other workers' local tiers
+    AVAILABILITY_CACHE_TTL_SECONDS: int = int(os.environ.get("AVAILABILITY_CACHE_TTL_SECONDS", 300))
+    MAX_SLOT_RANGE_DAYS: int = int(os.environ.get("MAX_SLOT_RANGE_DAYS", 31))
+    # In-memory user autocomplete index; catches up with other workers' changes every N seconds
+    USER_INDEX_ENABLED: bool = os.environ.get("USER_INDEX_ENABLED", "true").lower() == "true"
+    USER_INDEX_REFRESH_SECONDS: int = int(os.environ.get("USER_INDEX_REFRESH_SECONDS", 30))
+    # Catch-ups re-read this far behind the watermark, for user writes committed after a later one
+    USER_INDEX_OVERLAP_SECONDS: int = int(os.environ.get("USER_INDEX_OVERLAP_SECONDS", 120))
+    # Full id diff against active users, for deletes and deactivations the catch-up cannot see
+    USER_INDEX_RECONCILE_SECONDS: int = int(os.environ.get("USER_INDEX_RECONCILE_SECONDS", 600))
+    # Background housekeeping scheduler (leader-elected across processes)
+    SCHEDULER_ENABLED: bool = os.environ.get("SCHEDULER_ENABLED", "true").lower() == "true"
+    SCHEDULER_TICK_SECONDS: int = int(os.environ.get("SCHEDULER_TICK_SECONDS", 60))
+    SCHEDULER_BATCH_SIZE: int = int(os.environ.get("SCHEDULER_BATCH_SIZE", 200))
+    # Event-loop stall detector (debug / ops mode)
+    LOOP_MONITOR_ENABLED: bool = os.environ.get("LOOP_MONITOR_ENABLED", "false").lower() == "true"
+    LOOP_MONITOR_THRESHOLD_MS: int = int(os.environ.get("LOOP_MONITOR_THRESHOLD_MS", 100))
+    # Response compression (gzip / brotli) for bodies of at least COMPRESSION_MINIMUM_SIZE bytes
+    COMPRESSION_ENABLED: bool = os.environ.get("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MINIMUM_SIZE: int = int(os.environ.get("COMPRESSION_MINIMUM_SIZE", 1024))
+    COMPRESSION_GZIP_LEVEL: int = int(os.environ.get("COMPRESSION_GZIP_LEVEL", 6))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.environ.get("COMPRESSION_BROTLI_QUALITY", 4))
+    COMPRESSION_CONTENT_TYPES: str = os.environ.get(
+        "COMPRESSION_CONTENT_TYPES",
+        "application/json,application/x-ndjson,text/csv,text/plain,text/html",
+    )
+    # Compressed bodies of cacheable responses (ETag or public Cache-Control) kept per process
+    COMPRESSION_CACHE_MAX_ENTRIES: int = int(os.environ.get("COMPRESSION_CACHE_MAX_ENTRIES", 256))
     # App specific
     SECRET: str = os.environ.get("SECRET", "ASq0nueapAebeopyxeU9QV3BCJw89LhJo")
     REFRESH_SECRET: str = os.environ.get("REFRESH_SECRET", "jYZVNaheqameBLHvTqbjYZVNrAZr3prHer5g6RJk")
@@ -33,6 +33,14 @@ class CustomException:
     MENTEES_RESTRICTION_TO_PACKAGES: str = "Only mentees can book mentor packages."
     MENTOR_NOT_FOUND: str = "Mentor not found"
     MENTEES_RESTRICTION_TO_BOOKINGS: str = "Only mentees can create their bookings."
+    INVALID_DATE_RANGE: str = "date_from must be on or before date_to"
+    INVALID_SLOT_RANGE: str = "'from' must be before 'to' and the range must not exceed the maximum window"
+    MENTOR_SLOT_CONFLICT: str = "The mentor already has a booking at that time"
+    MENTOR_SLOT_OUTSIDE_AVAILABILITY: str = "Requested time is outside the mentor's availability"
+    INVALID_BOOKING_TRANSITION: str = "Booking cannot move from its current status to the requested one"
+    BOOKING_VERSION_CONFLICT: str = "Booking was modified by someone else; reload and try again"
+    INVALID_CURSOR: str = "Invalid cursor"
+    UNKNOWN_FIELDS: str = "Unknown fields requested"
 
 
 exceptions = CustomException()
@@ -12,8 +12,10 @@ from db.models.posts import Post
 from db.models.comments import Comment
 from db.models.reactions import Reaction
 from db.models.groups import Group
-from db.models.mentors import MentorPackage, MentorBooking
-from db.models.chat import ChatRoom, ChatRoomMember, Message
+from db.models.mentors import MentorPackage, MentorBooking, MentorAvailabilityWindow
+from db.models.chat import ChatRoom, ChatRoomMember, DirectChatRoom, Message
 from db.models.events import Event
 from db.models.email_verification import EmailVerification
 from db.models.annual_target import AnnualTarget
+from db.models.timeline import TimelineEntry
+from db.models.profile_completion import ProfileCompletion
@@ -43,6 +43,10 @@ def get_db() -> Any:
 async_engine = create_async_engine(
     SQLALCHEMY_DB_URL.replace("postgresql://", "postgresql+asyncpg://"),
     echo=False,
+    pool_size=settings.ASYNC_DB_POOL_SIZE,
+    max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+    pool_timeout=settings.ASYNC_DB_POOL_TIMEOUT,
+    pool_pre_ping=True,
 )
 AsyncSessionLocal = sessionmaker(
     bind=async_engine, class_=AsyncSession, autoflush=False, autocommit=False
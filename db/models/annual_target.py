@@ -2,7 +2,7 @@
 Annual Target model for user goal tracking
 """
 from sqlalchemy import (
-    Column, Enum, ForeignKey, Integer, TIMESTAMP, text, String, func, Text, Date
+    Column, Enum, ForeignKey, Index, Integer, TIMESTAMP, text, String, func, Text, Date
 )
 from sqlalchemy.orm import relationship
 
@@ -34,3 +34,11 @@ class AnnualTarget(Base):
 
     # Relationship
     user = relationship("User", backref="annual_targets")
+
+    __table_args__ = (
+        # Scheduler scan for open targets past their date
+        Index(
+            "ix_annual_targets_open_completed_by", "completed_by",
+            postgresql_where=text("status IN ('not_started', 'in_progress')"),
+        ),
+    )
@@ -4,10 +4,11 @@ Models for chat-related database tables.
 from datetime import datetime, timezone
 from sqlalchemy.sql import expression
 from sqlalchemy import (
-    Boolean, Column, Index, Integer, String, ForeignKey, DateTime, Text,
+    Boolean, CheckConstraint, Column, Computed, Index, Integer, String, ForeignKey, DateTime, Text,
     Enum, func
 )
-from sqlalchemy.orm import relationship, mapped_column, Mapped
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship, mapped_column, Mapped
 
 from utils.enums import RoomTypeEnum
 from db.database import Base
@@ -44,6 +45,30 @@ class ChatRoom(Base):
     )
 
 
+class DirectChatRoom(Base):
+    """
+    The direct-message room of a pair of users, keyed by the ordered pair
+    (user_low_id <= user_high_id) so each pair has exactly one room.
+    """
+    __tablename__ = "direct_chat_rooms"
+
+    # Deferred so the pair can claim a room id before the room row is inserted
+    chat_room_id = Column(
+        Integer,
+        ForeignKey("chat_rooms.id", ondelete="CASCADE", deferrable=True, initially="DEFERRED"),
+        primary_key=True,
+    )
+    user_low_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_high_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    date_created = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ux_direct_chat_rooms_pair", "user_low_id", "user_high_id", unique=True),
+        Index("ix_direct_chat_rooms_user_high_id", "user_high_id"),
+        CheckConstraint("user_low_id <= user_high_id", name="ck_direct_chat_rooms_ordered_pair"),
+    )
+
+
 class ChatRoomMember(Base):
     __tablename__ = "chat_room_members"
 
@@ -67,6 +92,10 @@ class ChatRoomMember(Base):
         "ChatRoom", back_populates="members"
     )
 
+    __table_args__ = (
+        Index("ix_chat_room_members_user_room", "user_id", "chat_room_id"),
+    )
+
 
 class Message(Base):
     __tablename__ = "messages"
@@ -85,6 +114,10 @@ class Message(Base):
     chat_room_id = Column(Integer, ForeignKey("chat_rooms.id", ondelete="CASCADE"), nullable=False)
     sender_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     content = Column(Text, nullable=False)
+    # Full-text search document, maintained by Postgres
+    search_vector = deferred(Column(
+        TSVECTOR, Computed("to_tsvector('english', coalesce(content, ''))", persisted=True)
+    ))
     edited = Column(Boolean, nullable=False, server_default=expression.false())
     deleted = Column(Boolean, nullable=False, server_default=expression.false())
 
@@ -92,6 +125,11 @@ class Message(Base):
         "ChatRoom", back_populates="messages"
     )
 
+    __table_args__ = (
+        Index("ix_messages_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_messages_room_id", "chat_room_id", "id"),
+    )
+
 
 class MessageDelivery(Base):
     __tablename__ = "message_deliveries"
@@ -3,7 +3,8 @@ Model for the comments table
 """
 from typing import List, Optional
 from datetime import datetime, timezone
-from sqlalchemy import DateTime, ForeignKey, Index, Text
+from sqlalchemy import Computed, DateTime, ForeignKey, Index, Text, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from db.database import Base
@@ -29,6 +30,11 @@ class Comment(Base):
         nullable=True, index=True
     )
     content: Mapped[str] = mapped_column(Text)
+    # Full-text search document, maintained by Postgres
+    search_vector = mapped_column(
+        TSVECTOR, Computed("to_tsvector('english', coalesce(content, ''))", persisted=True),
+        deferred=True,
+    )
 
     deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
 
@@ -46,7 +52,11 @@ class Comment(Base):
 
     __table_args__ = (
         Index(
-            "ix_comments_post_parent_created",
-            "post_id", "parent_comment_id", "date_created"
+            "ix_comments_post_parent_created_id_visible",
+            "post_id", "parent_comment_id", "date_created", "id",
+            postgresql_using="btree",
+            postgresql_ops={"date_created": "DESC", "id": "DESC"},
+            postgresql_where=text("deleted_at IS NULL"),
         ),
+        Index("ix_comments_search_vector", "search_vector", postgresql_using="gin"),
     )
@@ -20,7 +20,7 @@ class EmailVerification(Base):
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     verification_token = Column(String(255), nullable=False, unique=True)  # Magic link token
     is_verified = Column(Boolean, nullable=False, default=False)
-    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
     created_at = Column(
         TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
     )
@@ -32,6 +32,9 @@ class Group(Base):
     # Optional: visibility flags (public/private)
     is_public: Mapped[bool] = mapped_column(default=True, nullable=False)
 
+    # Denormalized size of group_membership, maintained on join/leave
+    member_count: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
+
     # relationship: posts in this group
     posts: Mapped[List["Post"]] = relationship(
         back_populates="group", cascade="all, delete-orphan"
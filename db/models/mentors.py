@@ -2,8 +2,9 @@
 Models relating to the mentor matching
 """
 from sqlalchemy import (
-    Column, Enum, ForeignKey, Integer, TIMESTAMP, text, String, func, Boolean,
+    DDL, Column, Enum, ForeignKey, Index, Integer, TIMESTAMP, text, String, func, Boolean, event,
 )
+from sqlalchemy.dialects.postgresql import INT4RANGE, ExcludeConstraint
 from sqlalchemy.orm import relationship
 
 from db.database import Base
@@ -50,11 +51,18 @@ class MentorBooking(Base):
     mentee_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     mentor_package_id = Column(Integer, ForeignKey("mentor_packages.id"), nullable=False)
     booking_date = Column(TIMESTAMP(timezone=True), nullable=False)
+    # booking_date + package duration, stored so the overlap constraint can use it
+    booking_end = Column(TIMESTAMP(timezone=True), nullable=False)
     status = Column(
         Enum(
             MentorBookingStatusEnum, values_callable=lambda obj: [e.value for e in obj]
         ), nullable=False, default=MentorBookingStatusEnum.pending)
     notes = Column(String, nullable=True)
+    # Bumped on every status transition; see services.bookings
+    version = Column(Integer, nullable=False, default=1, server_default=text("1"))
+    # Set by the scheduler when the reminder email is claimed
+    reminder_24h_sent_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    reminder_1h_sent_at = Column(TIMESTAMP(timezone=True), nullable=True)
 
     mentor = relationship(
         "User", foreign_keys=[mentor_id], backref="mentor_bookings_as_mentor"
@@ -63,3 +71,51 @@ class MentorBooking(Base):
         "User", foreign_keys=[mentee_id], backref="mentor_bookings_as_mentee"
     )
     mentor_package = relationship("MentorPackage", backref="mentor_bookings")
+
+    __table_args__ = (
+        Index("ix_mentor_bookings_mentor_date", "mentor_id", "booking_date"),
+        Index("ix_mentor_bookings_mentee_date", "mentee_id", "booking_date"),
+        # Scheduler scans for sessions that have ended / are about to start
+        Index(
+            "ix_mentor_bookings_open_end", "booking_end",
+            postgresql_where=text("status IN ('accepted', 'confirmed')"),
+        ),
+        Index(
+            "ix_mentor_bookings_open_start", "booking_date",
+            postgresql_where=text("status IN ('accepted', 'confirmed')"),
+        ),
+        # No two active bookings of a mentor may overlap (needs btree_gist)
+        ExcludeConstraint(
+            (mentor_id, "="),
+            (func.tstzrange(booking_date, booking_end, "[)"), "&&"),
+            name="ex_mentor_bookings_no_overlap",
+            using="gist",
+            where=text("status IN ('pending', 'accepted', 'confirmed')"),
+        ),
+    )
+
+
+# The exclusion constraint compares integers with gist; migrations create the
+# extension, this covers metadata.create_all (tests, fresh databases)
+event.listen(
+    MentorBooking.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
+
+
+class MentorAvailabilityWindow(Base):
+    """
+    A user's weekly availability normalized into one row per window, derived
+    from `User.availability`. `minutes` is a half-open range of minute-of-week
+    (0 = Monday 00:00 UTC, 10080 = end of Sunday) so "free on Tuesday
+    evening" is a GiST-indexed overlap query.
+    """
+    __tablename__ = "mentor_availability_windows"
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    minutes = Column(INT4RANGE, nullable=False)
+
+    __table_args__ = (
+        Index("ix_mentor_availability_windows_minutes", "minutes", postgresql_using="gist"),
+    )
@@ -3,7 +3,8 @@ Model for the posts table
 """
 from typing import List, Optional
 from datetime import datetime, timezone
-from sqlalchemy import DateTime, ForeignKey, Index, Text, literal
+from sqlalchemy import Computed, DateTime, ForeignKey, Index, Text, literal, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from db.database import Base
@@ -31,6 +32,11 @@ class Post(Base):
         ForeignKey("groups.id", ondelete="SET NULL"), nullable=True, index=True)
 
     content: Mapped[str] = mapped_column(Text)
+    # Full-text search document, maintained by Postgres
+    search_vector = mapped_column(
+        TSVECTOR, Computed("to_tsvector('english', coalesce(content, ''))", persisted=True),
+        deferred=True,
+    )
 
     deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
 
@@ -51,4 +57,15 @@ class Post(Base):
             postgresql_using="btree",
             postgresql_ops={"date_created": "DESC", "id": "DESC"},
         ),
+        # Group feed of visible posts
+        Index(
+            "ix_posts_group_created_id_visible",
+            "group_id",
+            "date_created",
+            "id",
+            postgresql_using="btree",
+            postgresql_ops={"date_created": "DESC", "id": "DESC"},
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index("ix_posts_search_vector", "search_vector", postgresql_using="gin"),
     )
@@ -0,0 +1,30 @@
+"""
+Persisted profile completion scores
+"""
+from sqlalchemy import (
+    Column, Float, ForeignKey, Integer, JSON, String, TIMESTAMP, func, text
+)
+
+from db.database import Base
+
+
+class ProfileCompletion(Base):
+    """
+    Completion percentages for one user, recomputed whenever the inputs change
+    (profile update, onboarding, annual target CRUD) rather than on every read.
+    """
+    __tablename__ = "profile_completions"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    user_type = Column(String, nullable=False)
+    profile_percentage = Column(Float, nullable=False, default=0.0)
+    annual_target_percentage = Column(Float, nullable=False, default=0.0)
+    overall_percentage = Column(Float, nullable=False, default=0.0, index=True)
+    profile_details = Column(JSON, nullable=False)
+    annual_targets_summary = Column(JSON, nullable=False)
+    last_modified = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        server_default=text("now()"),
+        onupdate=func.now(),
+    )
@@ -4,8 +4,8 @@ Common reaction models for the database.
 from typing import Optional
 from datetime import datetime, timezone
 from sqlalchemy import (
-    DateTime, ForeignKey, CheckConstraint,
-    String, UniqueConstraint
+    DateTime, ForeignKey, CheckConstraint, Index,
+    String, UniqueConstraint, text
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -47,4 +47,8 @@ class Reaction(Base):
             "(post_id IS NOT NULL AND comment_id IS NULL) OR (post_id IS NULL AND comment_id IS NOT NULL)",
             name="ck_reactions_target_exclusivity"
         ),
+
+        # Viewer reaction lookups
+        Index("ix_reactions_post_user", "post_id", "user_id", postgresql_where=text("post_id IS NOT NULL")),
+        Index("ix_reactions_comment_user", "comment_id", "user_id", postgresql_where=text("comment_id IS NOT NULL")),
     )
@@ -0,0 +1,40 @@
+"""
+Model for the materialized per-user home timeline
+"""
+from datetime import datetime
+from sqlalchemy import DateTime, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.database import Base
+
+
+class TimelineEntry(Base):
+    """
+    One post fanned out into one user's home timeline.
+    `date_created` mirrors the post's creation time so the timeline can be
+    keyset-paginated without touching the posts table.
+    """
+    __tablename__ = "timeline_entries"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    post_id: Mapped[int] = mapped_column(
+        ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True
+    )
+    group_id: Mapped[int] = mapped_column(
+        ForeignKey("groups.id", ondelete="CASCADE"), nullable=False
+    )
+    date_created: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_timeline_entries_user_created_post_desc",
+            "user_id",
+            "date_created",
+            "post_id",
+            postgresql_using="btree",
+            postgresql_ops={"date_created": "DESC", "post_id": "DESC"},
+        ),
+        Index("ix_timeline_entries_group_id", "group_id"),
+    )
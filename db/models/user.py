@@ -5,17 +5,20 @@ from sqlalchemy import (
     Boolean,
     Column,
     Enum,
+    Index,
     String,
     Integer,
     TIMESTAMP,
     Text,
     text,
     func,
-    JSON
+    JSON,
+    DDL,
+    event
 )
 from db.database import Base
 from utils.enums import UserTypeEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Session, relationship
 from db.models.user_association import (
     user_new_role_assosciation, user_job_search_status_assosciation,
     user_role_of_interest_assosciation, user_industry_assosciation,
@@ -102,3 +105,38 @@ class User(Base):
         secondary="group_membership",
         back_populates="members"
     )
+
+    __table_args__ = (
+        # Mentor / mentee directory and admin user filters
+        Index("ix_users_type_active_approved", "user_type", "is_active", "is_approved"),
+        # Trigram index behind UserService.search_users / autocomplete fallback;
+        # the expression must match services.user_index.user_search_text
+        Index(
+            "ix_users_search_text_trgm",
+            text(
+                "(coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(email, '')) gin_trgm_ops"
+            ),
+            postgresql_using="gin",
+        ),
+    )
+
+
+# ix_users_search_text_trgm uses gin_trgm_ops; migrations create the extension,
+# this covers metadata.create_all (tests, fresh databases)
+event.listen(
+    User.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+@event.listens_for(Session, "before_flush")
+def touch_user_on_association_change(session, flush_context, instances):
+    """
+    Bump last_modified when only a user's association collections (skills,
+    industries, ...) change. Those writes go to the association tables and
+    would otherwise leave the users row, and any ETag derived from it, as is.
+    """
+    for obj in session.dirty:
+        if isinstance(obj, User) and session.is_modified(obj, include_collections=True):
+            obj.last_modified = func.now()
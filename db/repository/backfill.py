@@ -0,0 +1,76 @@
+"""
+Batch backfill of derived per-user data.
+
+Usage:
+    python -m db.repository.backfill [--only completions|availability|timelines] [--batch-size N]
+"""
+import argparse
+import logging
+
+from db.database import SessionLocal
+from services.availability import backfill_availability_windows as _backfill_windows
+from services.profile_completion import ProfileCompletionService
+from services.timeline import TimelineService
+
+
+logger = logging.getLogger(__name__)
+
+
+def backfill_profile_completions(batch_size: int = 500) -> int:
+    """Compute and store profile completion for every existing user"""
+    db = SessionLocal()
+    try:
+        processed = ProfileCompletionService.backfill(db, batch_size=batch_size)
+        logger.info(f"Backfilled profile completion for {processed} users")
+        return processed
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def backfill_availability_windows(batch_size: int = 500) -> int:
+    """Build the normalized availability windows for every existing user"""
+    db = SessionLocal()
+    try:
+        processed = _backfill_windows(db, batch_size=batch_size)
+        logger.info(f"Backfilled availability windows for {processed} users")
+        return processed
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def backfill_timelines(batch_size: int = 500) -> int:
+    """Materialize the recent posts of every fanned-out group into its members' timelines"""
+    db = SessionLocal()
+    try:
+        processed = TimelineService(db).backfill_all(batch_size=batch_size)
+        logger.info(f"Backfilled home timelines for {processed} groups")
+        return processed
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+BACKFILLS = {
+    "completions": backfill_profile_completions,
+    "availability": backfill_availability_windows,
+    "timelines": backfill_timelines,
+}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Backfill derived per-user data")
+    parser.add_argument("--only", choices=sorted(BACKFILLS), help="Run a single backfill (default: all)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    for name, backfill in BACKFILLS.items():
+        if args.only in (None, name):
+            backfill(batch_size=args.batch_size)
@@ -0,0 +1,144 @@
+"""
+Load test: many idle chat sockets must not hold database connections.
+
+Seeds --sockets temporary users (the registry keeps one socket per user),
+opens one authenticated /chat/ws socket for each against a running server,
+checks every socket answers a ping, then keeps them all idle for --hold
+seconds. Meanwhile it samples the server's connections to the database
+from pg_stat_activity. At the end it measures ping round trips on a sample
+of sockets, closes everything and removes the users.
+
+With per-action sessions, the connection count stays within the async pool
+(ASYNC_DB_POOL_SIZE + ASYNC_DB_MAX_OVERFLOW) plus the sync pool, whatever
+the number of sockets. When each socket held a session for its whole
+lifetime, connects stalled once the pool was exhausted.
+
+Needs the `websockets` client (installed with uvicorn[standard]), a server
+sharing this environment's SECRET and database, and a file descriptor
+limit above --sockets (ulimit -n) on both sides. Use a scratch database.
+
+Usage:
+    python -m scripts.bench.chat_idle_sockets [--url ws://localhost:8000/api/v1/chat/ws]
+        [--sockets 5000] [--hold 60] [--concurrency 200]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from typing import List, Optional
+
+import websockets
+from sqlalchemy import delete, insert, text
+
+from db.database import SessionLocal
+from db.models.user import User
+from utils.enums import UserTypeEnum
+from utils.oauth2 import get_access_token
+
+
+BATCH_SIZE = 5000
+SERVER_CONNECTIONS = text(
+    "SELECT count(*) FROM pg_stat_activity WHERE datname = current_database() AND pid <> pg_backend_pid()"
+)
+
+
+def seed_users(count: int) -> List[int]:
+    tag = uuid.uuid4().hex[:8]
+    user_ids: List[int] = []
+    with SessionLocal() as db:
+        for offset in range(0, count, BATCH_SIZE):
+            rows = [
+                {
+                    "first_name": f"Socket{i}",
+                    "email": f"bench_ws_{tag}_{i}@example.com",
+                    "password": "not-a-real-hash",
+                    "user_type": UserTypeEnum.regular,
+                    "is_active": True,
+                    "is_approved": False,
+                    "email_verified": True,
+                    "code_of_conduct_accepted": True,
+                    "onboarding_completed": True,
+                }
+                for i in range(offset, min(offset + BATCH_SIZE, count))
+            ]
+            user_ids.extend(db.execute(
+                insert(User).returning(User.id, sort_by_parameter_order=True), rows
+            ).scalars())
+            db.commit()
+    return user_ids
+
+
+def remove_users(user_ids: List[int]) -> None:
+    with SessionLocal() as db:
+        for offset in range(0, len(user_ids), BATCH_SIZE):
+            db.execute(delete(User).where(User.id.in_(user_ids[offset:offset + BATCH_SIZE])))
+            db.commit()
+
+
+def server_connections() -> int:
+    with SessionLocal() as db:
+        return db.execute(SERVER_CONNECTIONS).scalar()
+
+
+async def ping(socket) -> float:
+    start = time.perf_counter()
+    await socket.send(json.dumps({"action": "ping"}))
+    while True:
+        reply = json.loads(await socket.recv())
+        if reply.get("action") == "pong":
+            return (time.perf_counter() - start) * 1000
+
+
+async def open_socket(url: str, user_id: int, limit: asyncio.Semaphore) -> Optional[object]:
+    async with limit:
+        try:
+            socket = await websockets.connect(
+                f"{url}?token={get_access_token(str(user_id))}", open_timeout=30, ping_interval=None,
+            )
+            # Answers only once the socket is authenticated and in its receive loop
+            await asyncio.wait_for(ping(socket), timeout=30)
+            return socket
+        except Exception as e:
+            print(f"user {user_id}: {type(e).__name__}: {e}")
+            return None
+
+
+async def run(url: str, user_ids: List[int], hold: float, concurrency: int) -> None:
+    baseline = server_connections()
+    limit = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+    opened = await asyncio.gather(*(open_socket(url, user_id, limit) for user_id in user_ids))
+    sockets = [socket for socket in opened if socket is not None]
+    print(f"opened {len(sockets)}/{len(user_ids)} sockets in {time.perf_counter() - start:.1f}s")
+
+    samples = []
+    deadline = time.monotonic() + hold
+    while time.monotonic() < deadline:
+        samples.append(await asyncio.to_thread(server_connections))
+        await asyncio.sleep(min(5.0, max(0.0, deadline - time.monotonic())))
+    print(f"server DB connections: {baseline} before, max {max(samples)} while idle ({len(samples)} samples)")
+
+    alive = [socket for socket in sockets if socket.close_code is None]
+    latencies = sorted([await ping(socket) for socket in alive[::max(1, len(alive) // 100)]])
+    print(f"{len(alive)} sockets still open after {hold:.0f}s idle")
+    if latencies:
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"ping round trip: p50 {statistics.median(latencies):.1f} ms, p95 {p95:.1f} ms")
+    await asyncio.gather(*(socket.close() for socket in sockets), return_exceptions=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hold many idle chat sockets and watch DB connections")
+    parser.add_argument("--url", default="ws://localhost:8000/api/v1/chat/ws")
+    parser.add_argument("--sockets", type=int, default=5000)
+    parser.add_argument("--hold", type=float, default=60.0, help="Seconds to keep the sockets idle")
+    parser.add_argument("--concurrency", type=int, default=200, help="Connects in flight at once")
+    args = parser.parse_args()
+
+    user_ids = seed_users(args.sockets)
+    try:
+        asyncio.run(run(args.url, user_ids, args.hold, args.concurrency))
+    finally:
+        remove_users(user_ids)
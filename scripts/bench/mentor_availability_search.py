@@ -0,0 +1,241 @@
+"""
+Mentor search by weekly availability on a large directory: the indexed
+`mentor_availability_windows` overlap (what /mentors/search runs) against
+the previous approach of loading every mentor's `availability` JSON and
+matching it in Python, alone and combined with the skill and industry
+filters the way /mentors/search composes them.
+
+Seeds --mentors active mentors with random availability, skills and
+industries (fixed seed, drawn from the seeded onboarding taxonomies) into
+the configured database, builds their windows, runs ANALYZE, checks both
+approaches find the same mentors, and reports the median wall time of each.
+Seeded rows are removed afterwards unless --keep is given. Run it against a
+scratch database, never production.
+
+Usage:
+    python -m scripts.bench.mentor_availability_search [--mentors 50000] [--rounds 5]
+        [--day Tuesday] [--from 18:00] [--to 21:00] [--keep]
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+from typing import Any, Callable, List, Set
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from db.database import SessionLocal
+from db.models.mentors import MentorAvailabilityWindow
+from db.models.onboarding import Industry, Skills
+from db.models.user import User
+from db.models.user_association import user_industry_assosciation, user_skills_assosciation
+from services.availability import (
+    WEEKDAYS,
+    available_during,
+    minute_of_week_range,
+    parse_minute_of_day,
+    parse_weekday,
+    weekly_windows,
+)
+from utils.enums import UserTypeEnum
+
+
+BATCH_SIZE = 5000
+TIME_RANGES = ["07:00-09:00", "09:00-12:00", "12:00-14:00", "14:00-17:00", "18:00-21:00", "20:00-23:00"]
+
+
+def random_availability(rng: random.Random) -> dict:
+    return {
+        "days": [day.capitalize() for day in rng.sample(WEEKDAYS, rng.randint(1, 4))],
+        "times": rng.sample(TIME_RANGES, rng.randint(1, 2)),
+    }
+
+
+def seed(db: Session, tag: str, mentors: int, skill_ids: List[int], industry_ids: List[int]) -> List[int]:
+    rng = random.Random(42)
+    user_ids: List[int] = []
+    for offset in range(0, mentors, BATCH_SIZE):
+        rows = [
+            {
+                "first_name": f"Bench{i}",
+                "email": f"bench_avail_{tag}_{i}@example.com",
+                "password": "not-a-real-hash",
+                "user_type": UserTypeEnum.mentor,
+                "is_active": True,
+                "is_approved": True,
+                "email_verified": True,
+                "code_of_conduct_accepted": True,
+                "onboarding_completed": True,
+                "availability": random_availability(rng),
+            }
+            for i in range(offset, min(offset + BATCH_SIZE, mentors))
+        ]
+        ids = list(db.execute(
+            insert(User).returning(User.id, sort_by_parameter_order=True), rows
+        ).scalars())
+        windows = [
+            {"user_id": user_id, "minutes": minute_of_week_range(day, start_min, end_min)}
+            for user_id, row in zip(ids, rows)
+            for day, start_min, end_min in weekly_windows(row["availability"])
+        ]
+        db.execute(insert(MentorAvailabilityWindow), windows)
+        db.execute(insert(user_skills_assosciation), [
+            {"user_id": user_id, "skills_id": skill_id}
+            for user_id in ids
+            for skill_id in rng.sample(skill_ids, min(len(skill_ids), rng.randint(1, 4)))
+        ])
+        db.execute(insert(user_industry_assosciation), [
+            {"user_id": user_id, "industry_id": industry_id}
+            for user_id in ids
+            for industry_id in rng.sample(industry_ids, min(len(industry_ids), rng.randint(1, 2)))
+        ])
+        db.commit()
+        user_ids.extend(ids)
+    for table in ("users", "mentor_availability_windows", "user_skills_assosciation", "user_industry_assosciation"):
+        db.execute(text(f"ANALYZE {table}"))
+    db.commit()
+    return user_ids
+
+
+def cleanup(db: Session, user_ids: List[int]) -> None:
+    for offset in range(0, len(user_ids), BATCH_SIZE):
+        batch = user_ids[offset:offset + BATCH_SIZE]
+        db.execute(delete(MentorAvailabilityWindow).where(MentorAvailabilityWindow.user_id.in_(batch)))
+        db.execute(delete(user_skills_assosciation).where(user_skills_assosciation.c.user_id.in_(batch)))
+        db.execute(delete(user_industry_assosciation).where(user_industry_assosciation.c.user_id.in_(batch)))
+        db.execute(delete(User).where(User.id.in_(batch)))
+        db.commit()
+
+
+def _mentor_filters():
+    # As /mentors/search filters the directory
+    return (
+        User.user_type == UserTypeEnum.mentor,
+        User.is_active == True,  # noqa: E712
+    )
+
+
+def _matches(availability, day: int, start_min: int, end_min: int) -> bool:
+    return any(d == day and s < end_min and start_min < e for d, s, e in weekly_windows(availability))
+
+
+def json_scan(db: Session, day: int, start_min: int, end_min: int) -> Set[int]:
+    """Before: every mentor's availability blob, matched in Python"""
+    rows = db.execute(select(User.id, User.availability).where(*_mentor_filters())).all()
+    return {user_id for user_id, availability in rows if _matches(availability, day, start_min, end_min)}
+
+
+def windows_query(db: Session, day: int, start_min: int, end_min: int) -> Set[int]:
+    """After: the EXISTS overlap on the GiST-indexed windows"""
+    stmt = select(User.id).where(*_mentor_filters(), available_during(User.id, day, start_min, end_min))
+    return set(db.execute(stmt).scalars())
+
+
+def search_page(db: Session, day: int, start_min: int, end_min: int) -> Set[int]:
+    """After, as /mentors/search runs it: the first page of 20"""
+    stmt = (
+        select(User.id)
+        .where(*_mentor_filters(), available_during(User.id, day, start_min, end_min))
+        .order_by(User.id)
+        .limit(20)
+    )
+    return set(db.execute(stmt).scalars())
+
+
+def _skill_industry_query(db: Session, columns, skill_ids: List[int], industry_ids: List[int]):
+    # Same joins and filters as /mentors/search?skill_ids=...&industry_ids=...
+    return (
+        db.query(*columns)
+        .filter(*_mentor_filters())
+        .join(User.skills).filter(Skills.id.in_(skill_ids))
+        .join(User.industry).filter(Industry.id.in_(industry_ids))
+    )
+
+
+def combined_json_scan(
+    db: Session, day: int, start_min: int, end_min: int, skill_ids: List[int], industry_ids: List[int],
+) -> Set[int]:
+    """Before: skill/industry filters in SQL, availability matched in Python"""
+    rows = _skill_industry_query(db, (User.id, User.availability), skill_ids, industry_ids).all()
+    return {user_id for user_id, availability in rows if _matches(availability, day, start_min, end_min)}
+
+
+def combined_query(
+    db: Session, day: int, start_min: int, end_min: int, skill_ids: List[int], industry_ids: List[int],
+) -> Set[int]:
+    """After: skill/industry joins and the availability EXISTS in one query"""
+    query = _skill_industry_query(db, (User.id,), skill_ids, industry_ids).filter(
+        available_during(User.id, day, start_min, end_min)
+    )
+    return {user_id for user_id, in query.distinct().all()}
+
+
+def combined_page(
+    db: Session, day: int, start_min: int, end_min: int, skill_ids: List[int], industry_ids: List[int],
+) -> Set[int]:
+    """After, as /mentors/search runs it with all three filters: distinct, first page of 20"""
+    query = _skill_industry_query(db, (User.id,), skill_ids, industry_ids).filter(
+        available_during(User.id, day, start_min, end_min)
+    )
+    return {user_id for user_id, in query.distinct().offset(0).limit(20).all()}
+
+
+def median_ms(func: Callable[..., Set[int]], db: Session, rounds: int, *args: Any) -> float:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(db, *args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark mentor search by availability")
+    parser.add_argument("--mentors", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--day", default="Tuesday")
+    parser.add_argument("--from", dest="start", default="18:00")
+    parser.add_argument("--to", dest="end", default="21:00")
+    parser.add_argument("--skills", type=int, default=2, help="Skills to filter by in the combined search")
+    parser.add_argument("--industries", type=int, default=1, help="Industries to filter by in the combined search")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded mentors")
+    args = parser.parse_args()
+
+    day = parse_weekday(args.day)
+    start_min, end_min = parse_minute_of_day(args.start), parse_minute_of_day(args.end)
+    if day is None or start_min is None or end_min is None or end_min <= start_min:
+        parser.error("--day must be a weekday and --from/--to HH:MM with from before to")
+
+    db = SessionLocal()
+    user_ids: List[int] = []
+    try:
+        all_skill_ids = list(db.execute(select(Skills.id).order_by(Skills.id)).scalars())
+        all_industry_ids = list(db.execute(select(Industry.id).order_by(Industry.id)).scalars())
+        if not all_skill_ids or not all_industry_ids:
+            parser.error("no skills or industries; seed the onboarding data first")
+        user_ids = seed(db, uuid.uuid4().hex[:8], args.mentors, all_skill_ids, all_industry_ids)
+        total = db.execute(select(func.count()).select_from(User).where(*_mentor_filters())).scalar()
+        window = (day, start_min, end_min)
+        matches = windows_query(db, *window)
+        assert matches == json_scan(db, *window), "approaches disagree"
+        print(f"{total} active mentors, {len(matches)} available {args.day} {args.start}-{args.end}")
+        for name, func_ in (("json scan", json_scan), ("windows (all)", windows_query), ("windows (page)", search_page)):
+            print(f"{name:>24}: {median_ms(func_, db, args.rounds, *window):9.1f} ms")
+
+        combined = (*window, all_skill_ids[:args.skills], all_industry_ids[:args.industries])
+        matches = combined_query(db, *combined)
+        assert matches == combined_json_scan(db, *combined), "combined approaches disagree"
+        print(f"{len(matches)} of them also have one of skills {combined[3]} and industries {combined[4]}")
+        for name, func_ in (
+            ("skills+industry json", combined_json_scan),
+            ("skills+industry (all)", combined_query),
+            ("skills+industry (page)", combined_page),
+        ):
+            print(f"{name:>24}: {median_ms(func_, db, args.rounds, *combined):9.1f} ms")
+    finally:
+        db.rollback()
+        if user_ids and not args.keep:
+            cleanup(db, user_ids)
+        db.close()
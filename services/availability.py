@@ -0,0 +1,304 @@
+"""
+Mentor availability slot engine.
+
+A mentor's recurring weekly availability (`User.availability`, e.g.
+{"days": ["Monday", "Tuesday"], "times": ["9:00-12:00", "14:00-17:00"]}) is
+expanded into concrete UTC intervals over a requested range, and the
+mentor's active bookings are subtracted from it using a sorted interval
+index.
+"""
+import logging
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, exists, insert, select
+from sqlalchemy.dialects.postgresql import Range
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from db.models.mentors import MentorAvailabilityWindow, MentorBooking, MentorPackage
+from db.models.user import User
+from services.cache import cache
+from utils.enums import MentorBookingStatusEnum
+
+
+logger = logging.getLogger(__name__)
+
+Interval = Tuple[datetime, datetime]
+# (weekday 0=Monday, start minute of day, end minute of day)
+WeeklyWindow = Tuple[int, int, int]
+
+MINUTES_PER_DAY = 24 * 60
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# Bookings in these statuses occupy the mentor's time
+ACTIVE_BOOKING_STATUSES = [
+    MentorBookingStatusEnum.pending,
+    MentorBookingStatusEnum.accepted,
+    MentorBookingStatusEnum.confirmed,
+]
+
+
+def parse_weekday(day: str) -> Optional[int]:
+    day = day.strip().lower()
+    for index, name in enumerate(WEEKDAYS):
+        if len(day) >= 3 and name.startswith(day):
+            return index
+    return None
+
+
+def parse_minute_of_day(value: str) -> Optional[int]:
+    hours, _, minutes = value.strip().partition(":")
+    try:
+        h, m = int(hours), int(minutes or 0)
+    except ValueError:
+        return None
+    if not (0 <= h <= 24 and 0 <= m < 60) or h * 60 + m > MINUTES_PER_DAY:
+        return None
+    return h * 60 + m
+
+
+def parse_time_range(value: str) -> Optional[Tuple[int, int]]:
+    """'9:00-12:00' -> (540, 720); None if malformed or empty"""
+    start, sep, end = value.partition("-")
+    if not sep:
+        return None
+    start_min, end_min = parse_minute_of_day(start), parse_minute_of_day(end)
+    if start_min is None or end_min is None or end_min <= start_min:
+        return None
+    return start_min, end_min
+
+
+def weekly_windows(availability: Any) -> List[WeeklyWindow]:
+    """Normalize the availability JSON into (weekday, start_min, end_min) windows"""
+    if not availability:
+        return []
+    if hasattr(availability, "model_dump"):
+        availability = availability.model_dump()
+    days = [d for d in (parse_weekday(day) for day in availability.get("days") or []) if d is not None]
+    ranges = [r for r in (parse_time_range(t) for t in availability.get("times") or []) if r is not None]
+    return sorted({(day, start, end) for day in days for start, end in ranges})
+
+
+def minute_of_week_range(day: int, start_min: int, end_min: int) -> Range:
+    """[start, end) of a window as minute-of-week, the unit of `mentor_availability_windows`"""
+    offset = day * MINUTES_PER_DAY
+    return Range(offset + start_min, offset + end_min, bounds="[)")
+
+
+def sync_availability_windows(db: Session, user: User) -> None:
+    """
+    Rewrite the normalized availability windows of a user from its
+    `availability` JSON. The caller owns the transaction and commits.
+    """
+    db.execute(delete(MentorAvailabilityWindow).where(MentorAvailabilityWindow.user_id == user.id))
+    rows = [
+        {"user_id": user.id, "minutes": minute_of_week_range(day, start_min, end_min)}
+        for day, start_min, end_min in weekly_windows(user.availability)
+    ]
+    if rows:
+        db.execute(insert(MentorAvailabilityWindow), rows)
+
+
+def backfill_availability_windows(db: Session, batch_size: int = 500) -> int:
+    """
+    Rebuild the windows of every user with availability, in id-ordered
+    batches committed one at a time. Returns the number of users processed.
+    """
+    processed = 0
+    last_id = 0
+    while True:
+        users = db.execute(
+            select(User)
+            .where(User.id > last_id, User.availability.is_not(None))
+            .order_by(User.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not users:
+            return processed
+        for user in users:
+            sync_availability_windows(db, user)
+        db.commit()
+        processed += len(users)
+        last_id = users[-1].id
+        db.expunge_all()
+
+
+def available_during(user_id_column, day: int, start_min: int, end_min: int):
+    """
+    EXISTS clause: the user has a window overlapping [start_min, end_min) on
+    `day`. Combine with other filters on `users` in the same query.
+    """
+    return exists(
+        select(MentorAvailabilityWindow.id).where(
+            MentorAvailabilityWindow.user_id == user_id_column,
+            MentorAvailabilityWindow.minutes.overlaps(minute_of_week_range(day, start_min, end_min)),
+        )
+    )
+
+
+def package_duration(package: Optional[MentorPackage]) -> timedelta:
+    """Session length of a package; `duration` is stored as minutes in a string column"""
+    try:
+        minutes = int(package.duration) if package else 0
+    except (TypeError, ValueError):
+        minutes = 0
+    return timedelta(minutes=minutes if minutes > 0 else settings.DEFAULT_BOOKING_MINUTES)
+
+
+def expand_windows(windows: List[WeeklyWindow], start: datetime, end: datetime) -> List[Interval]:
+    """Concrete, merged UTC intervals of the weekly windows clipped to [start, end)"""
+    intervals: List[Interval] = []
+    by_day: Dict[int, List[Tuple[int, int]]] = {}
+    for day, start_min, end_min in windows:
+        by_day.setdefault(day, []).append((start_min, end_min))
+
+    current: date = start.date()
+    while current <= end.date():
+        for start_min, end_min in by_day.get(current.weekday(), []):
+            midnight = datetime.combine(current, time.min, tzinfo=timezone.utc)
+            lo = max(midnight + timedelta(minutes=start_min), start)
+            hi = min(midnight + timedelta(minutes=end_min), end)
+            if lo < hi:
+                intervals.append((lo, hi))
+        current += timedelta(days=1)
+    return IntervalIndex(intervals).intervals
+
+
+class IntervalIndex:
+    """
+    Sorted, merged, non-overlapping intervals with parallel start/end lists
+    so overlap queries are a pair of bisects.
+    """
+
+    def __init__(self, intervals: List[Interval]) -> None:
+        merged: List[Interval] = []
+        for lo, hi in sorted(intervals):
+            if merged and lo <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+            else:
+                merged.append((lo, hi))
+        self.intervals = merged
+        self._starts = [lo for lo, _ in merged]
+        self._ends = [hi for _, hi in merged]
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Interval]:
+        """Intervals intersecting [start, end)"""
+        first = bisect_right(self._ends, start)
+        last = bisect_left(self._starts, end)
+        return self.intervals[first:last]
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        return bool(self.overlapping(start, end))
+
+    def covers(self, start: datetime, end: datetime) -> bool:
+        """Whether a single interval contains [start, end) entirely"""
+        hits = self.overlapping(start, end)
+        return len(hits) == 1 and hits[0][0] <= start and hits[0][1] >= end
+
+    def subtract_from(self, intervals: List[Interval]) -> List[Interval]:
+        """The parts of `intervals` not covered by this index"""
+        free: List[Interval] = []
+        for lo, hi in intervals:
+            cursor = lo
+            for busy_lo, busy_hi in self.overlapping(lo, hi):
+                if busy_lo > cursor:
+                    free.append((cursor, busy_lo))
+                cursor = max(cursor, busy_hi)
+            if cursor < hi:
+                free.append((cursor, hi))
+        return free
+
+
+def split_into_slots(intervals: List[Interval], length: timedelta) -> List[Interval]:
+    """Chop free intervals into back-to-back slots of a fixed length"""
+    slots: List[Interval] = []
+    for lo, hi in intervals:
+        while lo + length <= hi:
+            slots.append((lo, lo + length))
+            lo += length
+    return slots
+
+
+def mentor_availability_tag(mentor_id: int) -> str:
+    return f"mentor_availability:{mentor_id}"
+
+
+def invalidate_mentor_availability(*mentor_ids: int) -> None:
+    """
+    Drop the cached windows and busy intervals of `mentor_ids` in every
+    process. Call after committing a change to a mentor's availability or
+    to the status or time of their bookings.
+    """
+    cache.invalidate_tags(*{mentor_availability_tag(mentor_id) for mentor_id in mentor_ids})
+
+
+class AvailabilityService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _busy_intervals(self, mentor_id: int, since: datetime, until: Optional[datetime] = None) -> List[Interval]:
+        """Active bookings of a mentor as [booking_date, booking_end) intersecting [since, until)"""
+        query = self.db.query(MentorBooking.booking_date, MentorBooking.booking_end).filter(
+            MentorBooking.mentor_id == mentor_id,
+            MentorBooking.status.in_(ACTIVE_BOOKING_STATUSES),
+            MentorBooking.booking_end > since,
+        )
+        if until is not None:
+            query = query.filter(MentorBooking.booking_date < until)
+        return [(start, end) for start, end in query.all()]
+
+    def _mentor_state(self, mentor: User) -> Tuple[List[WeeklyWindow], IntervalIndex]:
+        """
+        Weekly windows and busy-interval index of a mentor, shared by all
+        workers through the two-tier cache under the mentor's
+        `mentor_availability:{id}` tag
+        """
+        def load() -> Dict[str, Any]:
+            busy = self._busy_intervals(mentor.id, datetime.now(timezone.utc))
+            return {
+                "windows": weekly_windows(mentor.availability),
+                "busy": [(lo.isoformat(), hi.isoformat()) for lo, hi in busy],
+            }
+
+        tag = mentor_availability_tag(mentor.id)
+        state = cache.get_or_set(tag, load, ttl=settings.AVAILABILITY_CACHE_TTL_SECONDS, tags=[tag])
+        windows = [(day, start_min, end_min) for day, start_min, end_min in state["windows"]]
+        busy = IntervalIndex([(datetime.fromisoformat(lo), datetime.fromisoformat(hi)) for lo, hi in state["busy"]])
+        return windows, busy
+
+    def free_slots(
+        self,
+        mentor: User,
+        start: datetime,
+        end: datetime,
+        slot_length: Optional[timedelta] = None,
+    ) -> List[Interval]:
+        """
+        Free time of a mentor in [start, end): availability minus active
+        bookings, optionally chopped into slots of `slot_length`.
+        """
+        start = max(start, datetime.now(timezone.utc))
+        if start >= end:
+            return []
+        windows, busy = self._mentor_state(mentor)
+        free = busy.subtract_from(expand_windows(windows, start, end))
+        return split_into_slots(free, slot_length) if slot_length else free
+
+    def check_bookable(self, mentor: User, start: datetime, length: timedelta) -> Optional[str]:
+        """
+        Validate a new booking against fresh data (not the cache).
+        Returns None when bookable, "conflict" when it overlaps an active
+        booking, or "outside_availability" when the mentor has published
+        availability that doesn't cover it.
+        """
+        end = start + length
+        busy = IntervalIndex(self._busy_intervals(mentor.id, start, until=end))
+        if busy.overlaps(start, end):
+            return "conflict"
+        windows = weekly_windows(mentor.availability)
+        if windows and not IntervalIndex(expand_windows(windows, start, end)).covers(start, end):
+            return "outside_availability"
+        return None
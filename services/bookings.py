@@ -0,0 +1,150 @@
+"""
+Mentor booking lifecycle.
+
+Status changes go through a single state machine and are applied with a
+compare-and-swap UPDATE on the booking's `version`, so two concurrent
+requests can't both act on the same prior state. Overlapping active
+bookings are rejected by the `ex_mentor_bookings_no_overlap` exclusion
+constraint rather than by a read-then-insert check.
+"""
+import logging
+from typing import Dict, FrozenSet, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from api.api_models.mentors import MentorBookingCreate
+from core.exceptions import exceptions
+from db.models.mentors import MentorBooking, MentorPackage
+from db.models.user import User
+from services.availability import AvailabilityService, invalidate_mentor_availability, package_duration
+from utils.enums import MentorBookingStatusEnum, UserTypeEnum
+
+
+logger = logging.getLogger(__name__)
+
+# Postgres SQLSTATE for exclusion_violation
+EXCLUSION_VIOLATION = "23P01"
+
+Status = MentorBookingStatusEnum
+
+# Allowed status transitions; rejected, cancelled and completed are final
+BOOKING_TRANSITIONS: Dict[Status, FrozenSet[Status]] = {
+    Status.pending: frozenset({Status.accepted, Status.confirmed, Status.rejected, Status.cancelled}),
+    Status.accepted: frozenset({Status.confirmed, Status.rejected, Status.cancelled, Status.completed}),
+    Status.confirmed: frozenset({Status.cancelled, Status.completed}),
+    Status.rejected: frozenset(),
+    Status.cancelled: frozenset(),
+    Status.completed: frozenset(),
+}
+
+
+def can_transition(current: Status, target: Status) -> bool:
+    return Status(target) in BOOKING_TRANSITIONS[Status(current)]
+
+
+def is_exclusion_violation(error: IntegrityError) -> bool:
+    return getattr(error.orig, "pgcode", None) == EXCLUSION_VIOLATION
+
+
+class BookingService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_booking(self, mentee: User, booking: MentorBookingCreate) -> MentorBooking:
+        """
+        Book a mentor. Availability is checked up front for a friendly error;
+        the exclusion constraint is what makes concurrent attempts safe.
+        """
+        mentor = self.db.query(User).filter(
+            User.id == booking.mentor_id,
+            User.user_type == UserTypeEnum.mentor,
+            User.is_active.is_(True)
+        ).first()
+        if not mentor:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=exceptions.MENTOR_NOT_FOUND
+            )
+        package = self.db.get(MentorPackage, booking.mentor_package_id)
+        if not package:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=exceptions.MENTOR_PACKAGE_NOT_FOUND
+            )
+
+        length = package_duration(package)
+        problem = AvailabilityService(self.db).check_bookable(mentor, booking.booking_date, length)
+        if problem == "conflict":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=exceptions.MENTOR_SLOT_CONFLICT
+            )
+        if problem == "outside_availability":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=exceptions.MENTOR_SLOT_OUTSIDE_AVAILABILITY
+            )
+
+        booking_data = booking.model_dump()
+        booking_data["mentee_id"] = mentee.id
+        booking_data["booking_end"] = booking.booking_date + length
+        created_booking = MentorBooking(**booking_data)
+        self.db.add(created_booking)
+        try:
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            if is_exclusion_violation(e):
+                # Lost the race to a concurrent booking of the same slot
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=exceptions.MENTOR_SLOT_CONFLICT
+                )
+            raise
+        self.db.refresh(created_booking)
+        invalidate_mentor_availability(created_booking.mentor_id)
+        return created_booking
+
+    def transition(
+        self,
+        booking: MentorBooking,
+        target: Status,
+        expected_version: Optional[int] = None,
+    ) -> MentorBooking:
+        """
+        Move a booking to `target` if the state machine allows it and nobody
+        changed it since `expected_version` (defaults to the version just read).
+        """
+        if not can_transition(booking.status, target):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=exceptions.INVALID_BOOKING_TRANSITION
+            )
+        version = booking.version if expected_version is None else expected_version
+        result = self.db.execute(
+            update(MentorBooking)
+            .where(
+                MentorBooking.id == booking.id,
+                MentorBooking.version == version,
+                MentorBooking.status == booking.status,
+            )
+            .values(
+                status=target,
+                version=MentorBooking.version + 1,
+                last_modified=func.now(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=exceptions.BOOKING_VERSION_CONFLICT
+            )
+        self.db.commit()
+        self.db.refresh(booking)
+        invalidate_mentor_availability(booking.mentor_id)
+        return booking
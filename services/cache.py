@@ -0,0 +1,314 @@
+"""
+Two-tier read cache: a process-local LRU in front of Redis.
+
+Values are JSON-encoded (orjson) in both tiers, so every hit returns a fresh
+object and cached functions must return JSON-compatible data (e.g. a
+response model's `model_dump(mode="json")`).
+
+- Keys are namespaced strings; the `cached` decorator builds them from the
+  decorated function's arguments.
+- Tags group keys for invalidation (`user:{id}`, `events`, ...).
+  `invalidate_tags` deletes the tagged keys in Redis and publishes the tags
+  so every process drops its local copies; the short local TTL bounds
+  staleness if a notification is missed.
+- Concurrent misses for one key in a process share a single load
+  (single-flight), so an expiring hot key costs one query, not one per
+  request.
+- Redis errors never fail a request: the cache falls back to the loader and
+  skips Redis for a few seconds.
+
+Metrics are exposed through `stats()`.
+"""
+import inspect
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import orjson
+import redis
+
+from core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# How long Redis is skipped after an error
+REDIS_BACKOFF_SECONDS = 5.0
+# Tag sets outlive the keys they point at
+TAG_TTL_SECONDS = 24 * 60 * 60
+
+
+class TwoTierCache:
+    def __init__(
+        self,
+        redis_url: str,
+        namespace: str,
+        local_max_entries: int,
+        local_ttl: float,
+        default_ttl: int,
+        enabled: bool = True,
+    ) -> None:
+        self.redis_url = redis_url
+        self.namespace = namespace
+        self.local_max_entries = local_max_entries
+        self.local_ttl = local_ttl
+        self.default_ttl = default_ttl
+        self.enabled = enabled
+        self._redis: Optional[redis.Redis] = None
+        self._redis_down_until = 0.0
+        # key -> (expires_at, encoded value, tags)
+        self._local: "OrderedDict[str, Tuple[float, bytes, Tuple[str, ...]]]" = OrderedDict()
+        self._local_tags: Dict[str, Set[str]] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._metrics: Counter = Counter()
+        # Bumped by every invalidation; a load that overlaps one isn't stored
+        self._generation = 0
+        self._pubsub_thread = None
+
+    @property
+    def _channel(self) -> str:
+        return f"{self.namespace}:invalidate"
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.namespace}:tag:{tag}"
+
+    # Redis tier
+
+    def _client(self) -> Optional[redis.Redis]:
+        if time.monotonic() < self._redis_down_until:
+            return None
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(
+                self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5
+            )
+        return self._redis
+
+    def _redis_failed(self, e: Exception) -> None:
+        self._metrics["redis_errors"] += 1
+        self._redis_down_until = time.monotonic() + REDIS_BACKOFF_SECONDS
+        logger.warning(f"Cache Redis tier unavailable, skipping it for {REDIS_BACKOFF_SECONDS}s: {str(e)}")
+
+    def _redis_get(self, key: str) -> Optional[bytes]:
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            return client.get(self._key(key))
+        except redis.RedisError as e:
+            self._redis_failed(e)
+            return None
+
+    def _redis_set(self, key: str, encoded: bytes, ttl: int, tags: Tuple[str, ...]) -> None:
+        client = self._client()
+        if client is None:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.set(self._key(key), encoded, ex=ttl)
+            for tag in tags:
+                pipe.sadd(self._tag_key(tag), key)
+                pipe.expire(self._tag_key(tag), TAG_TTL_SECONDS)
+            pipe.execute()
+        except redis.RedisError as e:
+            self._redis_failed(e)
+
+    # Local tier
+
+    def _local_get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, encoded, tags = entry
+            if expires_at < time.monotonic():
+                self._local_drop_locked(key)
+                return None
+            self._local.move_to_end(key)
+            return encoded
+
+    def _local_set(self, key: str, encoded: bytes, ttl: float, tags: Tuple[str, ...]) -> None:
+        with self._lock:
+            self._local_drop_locked(key)
+            self._local[key] = (time.monotonic() + min(ttl, self.local_ttl), encoded, tags)
+            for tag in tags:
+                self._local_tags.setdefault(tag, set()).add(key)
+            while len(self._local) > self.local_max_entries:
+                self._local_drop_locked(next(iter(self._local)))
+                self._metrics["local_evictions"] += 1
+
+    def _local_drop_locked(self, key: str) -> None:
+        entry = self._local.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._local_tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._local_tags[tag]
+
+    def _local_invalidate(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in list(self._local_tags.get(tag, ())):
+                    self._local_drop_locked(key)
+
+    # Public API
+
+    def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: Optional[int] = None,
+        tags: Iterable[str] = (),
+    ) -> Any:
+        """
+        The cached value of `key`, loading it with `loader` on a miss. Only
+        one caller per process runs the loader for a key at a time; the
+        others wait for its result.
+        """
+        if not self.enabled:
+            return loader()
+        encoded = self._local_get(key)
+        if encoded is not None:
+            self._metrics["local_hits"] += 1
+            return orjson.loads(encoded)
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            self._metrics["coalesced"] += 1
+            return orjson.loads(future.result())
+
+        ttl = ttl or self.default_ttl
+        tags = tuple(tags)
+        generation = self._generation
+        try:
+            encoded = self._redis_get(key)
+            if encoded is not None:
+                self._metrics["redis_hits"] += 1
+            else:
+                self._metrics["misses"] += 1
+                encoded = orjson.dumps(loader())
+                if generation == self._generation:
+                    self._redis_set(key, encoded, ttl, tags)
+            if generation == self._generation:
+                self._local_set(key, encoded, ttl, tags)
+            future.set_result(encoded)
+        except BaseException as e:
+            self._metrics["load_errors"] += 1
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return orjson.loads(encoded)
+
+    def invalidate_tags(self, *tags: str) -> None:
+        """Drop every key tagged with any of `tags`, here, in Redis and in other processes"""
+        if not self.enabled or not tags:
+            return
+        self._metrics["invalidations"] += len(tags)
+        self._local_invalidate(tags)
+        client = self._client()
+        if client is None:
+            return
+        try:
+            for tag in tags:
+                keys = client.smembers(self._tag_key(tag))
+                pipe = client.pipeline(transaction=False)
+                if keys:
+                    pipe.delete(*[self._key(key.decode()) for key in keys])
+                pipe.delete(self._tag_key(tag))
+                pipe.execute()
+            client.publish(self._channel, orjson.dumps(list(tags)))
+        except redis.RedisError as e:
+            self._redis_failed(e)
+
+    def stats(self) -> Dict[str, int]:
+        hits = self._metrics["local_hits"] + self._metrics["redis_hits"]
+        lookups = hits + self._metrics["misses"]
+        return {
+            "local_entries": len(self._local),
+            "local_hits": self._metrics["local_hits"],
+            "redis_hits": self._metrics["redis_hits"],
+            "misses": self._metrics["misses"],
+            "coalesced": self._metrics["coalesced"],
+            "load_errors": self._metrics["load_errors"],
+            "invalidations": self._metrics["invalidations"],
+            "local_evictions": self._metrics["local_evictions"],
+            "redis_errors": self._metrics["redis_errors"],
+            "hit_ratio_pct": round(100 * hits / lookups) if lookups else 0,
+        }
+
+    # Cross-process invalidation
+
+    def _on_invalidate(self, message: dict) -> None:
+        try:
+            self._local_invalidate(orjson.loads(message["data"]))
+        except Exception as e:
+            logger.warning(f"Ignoring malformed cache invalidation: {str(e)}")
+
+    def start(self) -> None:
+        """Listen for other processes' invalidations in a background thread"""
+        if not self.enabled:
+            return
+        try:
+            client = self._client() or redis.Redis.from_url(self.redis_url)
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self._channel: self._on_invalidate})
+            self._pubsub_thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        except redis.RedisError as e:
+            # Local entries still expire after local_ttl
+            logger.warning(f"Cache invalidation listener not started: {str(e)}")
+
+    def stop(self) -> None:
+        if self._pubsub_thread is not None:
+            self._pubsub_thread.stop()
+            self._pubsub_thread = None
+
+
+cache = TwoTierCache(
+    redis_url=settings.CACHE_REDIS_URL,
+    namespace="kocha:cache",
+    local_max_entries=settings.CACHE_LOCAL_MAX_ENTRIES,
+    local_ttl=settings.CACHE_LOCAL_TTL_SECONDS,
+    default_ttl=settings.CACHE_DEFAULT_TTL_SECONDS,
+    enabled=settings.CACHE_ENABLED,
+)
+
+
+def cached(key: str, ttl: Optional[int] = None, tags: List[str] = ()) -> Callable:
+    """
+    Cache a function's (JSON-compatible) return value. `key` and `tags` are
+    str.format templates over the function's arguments, e.g.
+    @cached("user_profile:{user_id}", tags=["user:{user_id}"]).
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = bound.arguments
+            return cache.get_or_set(
+                key.format(**params),
+                lambda: func(*args, **kwargs),
+                ttl=ttl,
+                tags=[tag.format(**params) for tag in tags],
+            )
+        return wrapper
+    return decorator
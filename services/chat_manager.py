@@ -2,8 +2,23 @@
 Management for the chat connection
 """
 import asyncio
-from typing import Dict, Set
+import logging
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from fastapi import WebSocket
+from starlette.websockets import WebSocketState
+
+
+logger = logging.getLogger(__name__)
+
+
+def _is_closed(websocket: WebSocket) -> bool:
+    # Chat sockets are wrapped in a ChatConnection; look at the raw socket
+    raw = getattr(websocket, "websocket", websocket)
+    return WebSocketState.DISCONNECTED in (
+        getattr(raw, "client_state", None), getattr(raw, "application_state", None)
+    )
 
 
 class ConnectionManager:
@@ -14,7 +29,11 @@ class ConnectionManager:
     def __init__(self) -> None:
         self.active_connections: Dict[int, WebSocket] = {}
         self.room_members: Dict[int, Set[int]] = {}
+        # Reverse of room_members, so a disconnect only touches the user's rooms
+        self.user_rooms: Dict[int, Set[int]] = {}
+        self.last_seen: Dict[int, float] = {}
         self.lock = asyncio.Lock()
+        self._reaper_task: Optional[asyncio.Task] = None
 
     async def connect(self, user_id: int, websocket: WebSocket) -> None:
         """
@@ -23,27 +42,60 @@ class ConnectionManager:
         # await websocket.accept()
         async with self.lock:
             self.active_connections[user_id] = websocket
+            self.last_seen[user_id] = time.monotonic()
 
-    async def disconnect(self, user_id: int) -> None:
+    def touch(self, user_id: int) -> None:
+        """Record inbound activity from a user's registered socket"""
+        # Sockets that never joined a room aren't registered; tracking them here
+        # would leave entries nothing ever removes
+        if user_id in self.active_connections:
+            self.last_seen[user_id] = time.monotonic()
+
+    def _drop_user_locked(self, user_id: int) -> Optional[WebSocket]:
+        ws = self.active_connections.pop(user_id, None)
+        self.last_seen.pop(user_id, None)
+        for room_id in self.user_rooms.pop(user_id, ()):
+            members = self.room_members.get(room_id)
+            if members is not None:
+                members.discard(user_id)
+                if not members:
+                    del self.room_members[room_id]
+        return ws
+
+    async def disconnect(self, user_id: int, websocket: Optional[WebSocket] = None) -> None:
         """
-        Disconnects a user from the websocket manager
+        Disconnects a user from the websocket manager. When `websocket` is
+        given, nothing happens if the user has since connected on another one.
         """
         async with self.lock:
-            ws = self.active_connections.pop(user_id, None)
-            for member in self.room_members.values():
-                member.discard(user_id)
-            if ws:
+            if websocket is not None and self.active_connections.get(user_id) is not websocket:
+                if user_id not in self.active_connections:
+                    self.last_seen.pop(user_id, None)
+                return
+            ws = self._drop_user_locked(user_id)
+        if ws and not _is_closed(ws):
+            try:
                 await ws.close()
+            except Exception:
+                pass
 
     async def add_user_to_room(self, user_id: int, room_id: int, websocket: WebSocket) -> None:
         """
         Adds a user to a chat room
         """
+        await self.add_user_to_rooms(user_id, [room_id], websocket)
+
+    async def add_user_to_rooms(self, user_id: int, room_ids: Iterable[int], websocket: WebSocket) -> None:
+        """
+        Adds a user to several chat rooms under a single lock acquisition
+        """
         async with self.lock:
-            # print(f"Adding user {user_id} to room {room_id}")
             self.active_connections[user_id] = websocket
-            members = self.room_members.setdefault(room_id, set())
-            members.add(user_id)
+            self.last_seen[user_id] = time.monotonic()
+            rooms = self.user_rooms.setdefault(user_id, set())
+            for room_id in room_ids:
+                self.room_members.setdefault(room_id, set()).add(user_id)
+                rooms.add(room_id)
 
     async def remove_user_from_room(self, user_id: int, room_id: int) -> None:
         """
@@ -53,8 +105,28 @@ class ConnectionManager:
             members = self.room_members.get(room_id)
             if members:
                 members.discard(user_id)
-                # if not members:
-                #     del self.room_members[room_id]
+                if not members:
+                    del self.room_members[room_id]
+            rooms = self.user_rooms.get(user_id)
+            if rooms:
+                rooms.discard(room_id)
+
+    def is_in_room(self, user_id: int, room_id: int) -> bool:
+        """
+        Whether the user has joined the room on this instance (membership
+        was validated at join time)
+        """
+        return user_id in self.room_members.get(room_id, ())
+
+    async def _send(self, user_id: int, websocket: WebSocket, message) -> bool:
+        """Send to one socket; a socket that fails is dropped from the registry"""
+        try:
+            await websocket.send_json(message)
+            return True
+        except Exception as e:
+            logger.info(f"Dropping chat socket of user {user_id}: {str(e)}")
+            await self.disconnect(user_id, websocket)
+            return False
 
     async def send_personal_message(self, message: str, user_id: int) -> None:
         """
@@ -63,15 +135,83 @@ class ConnectionManager:
         # async with self.lock:
         websocket = self.active_connections.get(user_id)
         if websocket:
-            await websocket.send_json(message)
+            await self._send(user_id, websocket, message)
 
     async def broadcast_to_room(self, message: str, room_id: int) -> None:
         """
         Broadcasts a message to all members of a chat room
         """
         async with self.lock:
-            members = self.room_members.get(room_id, set())
-        for user_id in members:
-            websocket = self.active_connections.get(user_id)
-            if websocket:
-                await websocket.send_json(message)
+            targets: List[Tuple[int, WebSocket]] = [
+                (user_id, self.active_connections[user_id])
+                for user_id in self.room_members.get(room_id, ())
+                if user_id in self.active_connections
+            ]
+        for user_id, websocket in targets:
+            await self._send(user_id, websocket, message)
+
+    async def reap(self, idle_timeout: Optional[float] = None) -> int:
+        """
+        Drop closed sockets, sockets silent for longer than `idle_timeout`
+        (if given), and room and activity entries of users without a socket.
+        Returns the number of users dropped.
+        """
+        cutoff = time.monotonic() - idle_timeout if idle_timeout else None
+        async with self.lock:
+            stale = [
+                (user_id, ws) for user_id, ws in self.active_connections.items()
+                if _is_closed(ws) or (cutoff is not None and self.last_seen.get(user_id, 0.0) < cutoff)
+            ]
+            for user_id, _ in stale:
+                self._drop_user_locked(user_id)
+            orphans = [
+                user_id for user_id in self.user_rooms.keys() | self.last_seen.keys()
+                if user_id not in self.active_connections
+            ]
+            for user_id in orphans:
+                self._drop_user_locked(user_id)
+        for _, ws in stale:
+            if not _is_closed(ws):
+                try:
+                    await ws.close()
+                except Exception:
+                    pass
+        return len(stale) + len(orphans)
+
+    def stats(self) -> Dict[str, int]:
+        """Gauges for the registry: live sockets, rooms, memberships and approximate bytes held"""
+        registry_bytes = sum(
+            sys.getsizeof(container)
+            for container in (self.active_connections, self.room_members, self.user_rooms, self.last_seen)
+        )
+        registry_bytes += sum(sys.getsizeof(members) for members in self.room_members.values())
+        registry_bytes += sum(sys.getsizeof(rooms) for rooms in self.user_rooms.values())
+        return {
+            "sockets": len(self.active_connections),
+            "rooms": len(self.room_members),
+            "room_memberships": sum(len(members) for members in self.room_members.values()),
+            "registry_bytes": registry_bytes,
+        }
+
+    async def _reap_forever(self, interval: float, idle_timeout: Optional[float]) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                reaped = await self.reap(idle_timeout)
+                if reaped:
+                    logger.info(f"Chat reaper dropped {reaped} stale connections; registry: {self.stats()}")
+            except Exception as e:
+                logger.error(f"Chat reaper failed: {str(e)}")
+
+    def start_reaper(self, interval: float, idle_timeout: Optional[float] = None) -> None:
+        """Reap stale connections every `interval` seconds on the running loop"""
+        self._reaper_task = asyncio.get_running_loop().create_task(self._reap_forever(interval, idle_timeout))
+
+    async def stop_reaper(self) -> None:
+        if self._reaper_task:
+            self._reaper_task.cancel()
+            try:
+                await self._reaper_task
+            except asyncio.CancelledError:
+                pass
+            self._reaper_task = None
@@ -0,0 +1,151 @@
+"""
+Framing for chat websockets.
+
+Clients may negotiate a compact subprotocol when they connect:
+
+- "kocha.msgpack.v1": binary MessagePack frames
+- "kocha.json.v1": compact JSON text frames (orjson)
+
+With either one, every outbound frame is a list of events: events for a
+connection are queued and flushed together after a short window, so a busy
+room costs one frame (and one send) per window instead of one per event.
+Inbound frames may hold a single action or a list of actions.
+
+Clients that don't ask for a subprotocol keep the original behaviour: one
+JSON text frame per event, one action per frame.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence
+
+import msgpack
+import orjson
+from fastapi import WebSocket, WebSocketDisconnect
+
+from core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class FrameDecodeError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Codec:
+    subprotocol: str
+    binary: bool
+    encode: Callable[[Any], Any]
+    decode: Callable[[Any], Any]
+
+
+MSGPACK_CODEC = Codec(
+    subprotocol="kocha.msgpack.v1",
+    binary=True,
+    encode=lambda obj: msgpack.packb(obj, default=str),
+    decode=lambda data: msgpack.unpackb(data, raw=False),
+)
+JSON_CODEC = Codec(
+    subprotocol="kocha.json.v1",
+    binary=False,
+    encode=lambda obj: orjson.dumps(obj, default=str).decode(),
+    decode=orjson.loads,
+)
+# In order of preference
+CODECS = [MSGPACK_CODEC, JSON_CODEC]
+
+
+def negotiate(offered: Sequence[str]) -> Optional[Codec]:
+    """The preferred codec among the subprotocols the client offered"""
+    for codec in CODECS:
+        if codec.subprotocol in offered:
+            return codec
+    return None
+
+
+class ChatConnection:
+    """
+    A chat websocket with the negotiated framing. Exposes the `send_json`
+    used by the connection manager and action handlers, so callers don't
+    care which framing is in use.
+    """
+
+    def __init__(self, websocket: WebSocket, codec: Optional[Codec]) -> None:
+        self.websocket = websocket
+        self.codec = codec
+        self.flush_window = settings.CHAT_FLUSH_WINDOW_MS / 1000
+        self.max_frame_events = settings.CHAT_MAX_FRAME_EVENTS
+        self._pending: List[dict] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._send_lock = asyncio.Lock()
+
+    async def accept(self) -> None:
+        await self.websocket.accept(subprotocol=self.codec.subprotocol if self.codec else None)
+
+    async def send_json(self, event: dict) -> None:
+        """Send now (no subprotocol) or queue for the next batched frame"""
+        if self.codec is None:
+            await self.websocket.send_json(event)
+            return
+        self._pending.append(event)
+        if len(self._pending) >= self.max_frame_events:
+            await self.flush()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_window)
+        self._flush_task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            # The socket went away; the receive loop handles the disconnect
+            logger.debug(f"Dropped chat frame: {str(e)}")
+
+    async def flush(self) -> None:
+        async with self._send_lock:
+            if not self._pending:
+                return
+            events, self._pending = self._pending, []
+            frame = self.codec.encode(events)
+            if self.codec.binary:
+                await self.websocket.send_bytes(frame)
+            else:
+                await self.websocket.send_text(frame)
+
+    async def receive(self) -> List[Any]:
+        """
+        The actions in the next inbound frame. Raises WebSocketDisconnect when
+        the client goes away and FrameDecodeError for undecodable frames.
+        """
+        if self.codec is None:
+            try:
+                return [await self.websocket.receive_json()]
+            except ValueError as e:
+                raise FrameDecodeError(str(e))
+        message = await self.websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+        data = message.get("bytes") if self.codec.binary else message.get("text")
+        if data is None:
+            raise FrameDecodeError(f"Expected a {'binary' if self.codec.binary else 'text'} frame")
+        try:
+            decoded = self.codec.decode(data)
+        except Exception as e:
+            raise FrameDecodeError(str(e))
+        actions = decoded if isinstance(decoded, list) else [decoded]
+        if len(actions) > self.max_frame_events:
+            raise FrameDecodeError(f"At most {self.max_frame_events} actions per frame")
+        return actions
+
+    async def close(self, code: int = 1000) -> None:
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        try:
+            if self.codec is not None:
+                await self.flush()
+        finally:
+            await self.websocket.close(code=code)
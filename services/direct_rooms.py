@@ -0,0 +1,73 @@
+"""
+Direct-message room resolution.
+
+Each pair of users has at most one direct room, recorded in
+`direct_chat_rooms` under the ordered pair (user_low_id, user_high_id).
+Resolving an existing room is one lookup on the unique pair index; creating
+one claims the pair with a single INSERT ... ON CONFLICT ... RETURNING, so
+two users opening a chat with each other at the same time end up in the
+same room.
+"""
+from typing import Tuple
+
+from sqlalchemy import literal_column, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models.chat import ChatRoom, ChatRoomMember, DirectChatRoom
+from utils.enums import RoomTypeEnum
+
+
+def ordered_pair(user_id: int, other_id: int) -> Tuple[int, int]:
+    return (user_id, other_id) if user_id <= other_id else (other_id, user_id)
+
+
+def direct_room_name(user_low_id: int, user_high_id: int) -> str:
+    """Stable, unique `ChatRoom.name` of a direct room; independent of emails"""
+    return f"direct:{user_low_id}:{user_high_id}"
+
+
+async def get_or_create_direct_room(db: AsyncSession, user_id: int, other_id: int) -> int:
+    """
+    Id of the direct room between two users, created (with both members) if
+    it doesn't exist yet. Commits when it creates the room. Raises
+    IntegrityError if either user doesn't exist.
+    """
+    low, high = ordered_pair(user_id, other_id)
+    room_id = await db.scalar(
+        select(DirectChatRoom.chat_room_id).where(
+            DirectChatRoom.user_low_id == low,
+            DirectChatRoom.user_high_id == high,
+        )
+    )
+    if room_id is not None:
+        return room_id
+
+    # The room id is taken from the chat_rooms sequence up front; the FK to
+    # chat_rooms is deferred until commit. On conflict the no-op update makes
+    # RETURNING yield the winner's room, and xmax = 0 tells who inserted.
+    stmt = insert(DirectChatRoom).values(
+        chat_room_id=text("nextval(pg_get_serial_sequence('chat_rooms', 'id'))"),
+        user_low_id=low,
+        user_high_id=high,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DirectChatRoom.user_low_id, DirectChatRoom.user_high_id],
+        set_={"user_low_id": stmt.excluded.user_low_id},
+    ).returning(DirectChatRoom.chat_room_id, literal_column("xmax = 0"))
+    room_id, created = (await db.execute(stmt)).one()
+
+    if created:
+        db.add(ChatRoom(
+            id=room_id,
+            name=direct_room_name(low, high),
+            is_public=False,
+            chat_type=RoomTypeEnum.direct,
+            created_by=user_id,
+        ))
+        db.add_all([
+            ChatRoomMember(chat_room_id=room_id, user_id=member_id, is_admin=False)
+            for member_id in {low, high}
+        ])
+    await db.commit()
+    return room_id
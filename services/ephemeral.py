@@ -0,0 +1,58 @@
+"""
+Ephemeral chat events: typing, stop-typing and presence pings.
+
+These are never written to Postgres. Clients send them far more often than
+anyone needs to see them (typing fires per keystroke), so repeats of the
+same state for a user in a room are coalesced: the first one in an interval
+goes out, the rest are dropped, and a change of state (typing -> stopped,
+online -> away) always goes out immediately.
+"""
+import time
+from typing import Dict, Tuple
+
+from core.config import settings
+
+
+TYPING_ACTIONS = {"typing": "typing", "stop_typing": "idle"}
+PRESENCE_STATUSES = {"online", "away"}
+
+# (user_id, room_id, channel) -> (last state, monotonic time it was emitted)
+ThrottleKey = Tuple[int, int, str]
+
+
+class EphemeralThrottle:
+    """
+    Per-process coalescing of ephemeral events. Only touched from the event
+    loop, so it needs no lock.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._last: Dict[ThrottleKey, Tuple[str, float]] = {}
+        self._next_prune = 0.0
+
+    def should_emit(self, user_id: int, room_id: int, channel: str, state: str) -> bool:
+        now = time.monotonic()
+        self._prune(now)
+        key = (user_id, room_id, channel)
+        last = self._last.get(key)
+        if last and last[0] == state and now - last[1] < self.interval:
+            return False
+        self._last[key] = (state, now)
+        return True
+
+    def forget_user(self, user_id: int) -> None:
+        for key in [key for key in self._last if key[0] == user_id]:
+            del self._last[key]
+
+    def _prune(self, now: float) -> None:
+        """Drop entries older than the interval, at most once per interval"""
+        if now < self._next_prune:
+            return
+        self._next_prune = now + self.interval
+        cutoff = now - self.interval
+        for key in [key for key, (_, at) in self._last.items() if at < cutoff]:
+            del self._last[key]
+
+
+ephemeral_throttle = EphemeralThrottle(interval=settings.CHAT_EPHEMERAL_INTERVAL_MS / 1000)
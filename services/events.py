@@ -12,6 +12,7 @@ from api.api_models.events import EventCreate, EventUpdate, EventResponse
 from db.models.events import Event
 from db.models.user import User
 from db.repository.crud import Crud
+from services.cache import cache, cached
 
 
 logger = logging.getLogger(__name__)
@@ -30,6 +31,7 @@ class EventService:
             
             event = self.crud.create(Event, event_dict)
             self.db.commit()
+            cache.invalidate_tags("events")
             return event
 
         except Exception as e:
@@ -68,6 +70,14 @@ class EventService:
             )
         ).order_by(Event.start_date.asc()).offset(skip).limit(limit).all()
 
+    @cached("events:upcoming:{skip}:{limit}", ttl=60, tags=["events"])
+    def get_upcoming_events_cached(self, skip: int = 0, limit: int = 10) -> List[dict]:
+        """get_upcoming_events as response payloads, shared across requests"""
+        return [
+            EventResponse.model_validate(event).model_dump(mode="json")
+            for event in self.get_upcoming_events(skip=skip, limit=limit)
+        ]
+
     def update_event(self, event_id: int, event_data: EventUpdate) -> Event:
         """Update an event (admin only)"""
         try:
@@ -76,6 +86,7 @@ class EventService:
             update_data = event_data.model_dump(exclude_unset=True)
             updated_event = self.crud.update(event, update_data)
             self.db.commit()
+            cache.invalidate_tags("events")
             return updated_event
 
         except HTTPException:
@@ -94,6 +105,7 @@ class EventService:
             event = self.get_event_by_id(event_id)
             self.db.delete(event)
             self.db.commit()
+            cache.invalidate_tags("events")
             return True
 
         except HTTPException:
@@ -0,0 +1,202 @@
+"""
+Service for streaming admin report exports.
+
+Rows are read through a server-side cursor (`yield_per`) and written out
+batch by batch, so memory stays flat regardless of how many rows match.
+"""
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, aliased, selectinload
+
+from core.config import settings
+from db.database import SessionLocal
+from db.models.annual_target import AnnualTarget
+from db.models.mentors import MentorBooking
+from db.models.posts import Post
+from db.models.user import User
+from utils.enums import ExportFormatEnum, ExportKindEnum
+
+
+logger = logging.getLogger(__name__)
+
+
+USER_ASSOCIATIONS = [
+    "new_role_values", "job_search_status", "role_of_interest", "industry",
+    "skills", "career_goals", "mentoring_frequency", "mentoring_format",
+]
+
+USER_COLUMNS = [
+    "id", "email", "first_name", "last_name", "user_type", "is_active",
+    "is_approved", "email_verified", "onboarding_completed", "gender",
+    "nationality", "location", "current_role", "company",
+    "years_of_experience", "date_created", "last_modified",
+] + USER_ASSOCIATIONS
+
+BOOKING_COLUMNS = [
+    "id", "mentor_id", "mentor_email", "mentee_id", "mentee_email",
+    "mentor_package_id", "booking_date", "status", "notes",
+    "date_created", "last_modified",
+]
+
+POST_COLUMNS = [
+    "id", "user_id", "group_id", "content", "date_created",
+    "last_modified", "deleted_at",
+]
+
+ANNUAL_TARGET_COLUMNS = [
+    "id", "user_id", "objective", "measured_by", "completed_by",
+    "upload_path", "status", "date_created", "last_modified",
+]
+
+
+def _day_bounds(date_from: Optional[date], date_to: Optional[date]):
+    """Inclusive calendar-day range as UTC datetimes (upper bound exclusive)"""
+    start = datetime.combine(date_from, time.min, tzinfo=timezone.utc) if date_from else None
+    end = datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=timezone.utc) if date_to else None
+    return start, end
+
+
+def _serialize(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class ExportService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _stream(self, stmt, scalars: bool = False):
+        result = self.db.execute(stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        return result.scalars() if scalars else result.mappings()
+
+    def iter_users(self, date_from: Optional[date] = None, date_to: Optional[date] = None) -> Iterator[Dict[str, Any]]:
+        start, end = _day_bounds(date_from, date_to)
+        stmt = (
+            select(User)
+            .options(*[selectinload(getattr(User, name)) for name in USER_ASSOCIATIONS])
+            .order_by(User.id)
+        )
+        if start:
+            stmt = stmt.where(User.date_created >= start)
+        if end:
+            stmt = stmt.where(User.date_created < end)
+
+        for user in self._stream(stmt, scalars=True):
+            row = {column: getattr(user, column) for column in USER_COLUMNS if column not in USER_ASSOCIATIONS}
+            for name in USER_ASSOCIATIONS:
+                row[name] = [item.name for item in getattr(user, name)]
+            yield row
+
+    def iter_bookings(self, date_from: Optional[date] = None, date_to: Optional[date] = None) -> Iterator[Dict[str, Any]]:
+        start, end = _day_bounds(date_from, date_to)
+        mentor = aliased(User)
+        mentee = aliased(User)
+        stmt = (
+            select(
+                MentorBooking.id,
+                MentorBooking.mentor_id,
+                mentor.email.label("mentor_email"),
+                MentorBooking.mentee_id,
+                mentee.email.label("mentee_email"),
+                MentorBooking.mentor_package_id,
+                MentorBooking.booking_date,
+                MentorBooking.status,
+                MentorBooking.notes,
+                MentorBooking.date_created,
+                MentorBooking.last_modified,
+            )
+            .join(mentor, mentor.id == MentorBooking.mentor_id)
+            .join(mentee, mentee.id == MentorBooking.mentee_id)
+            .order_by(MentorBooking.id)
+        )
+        if start:
+            stmt = stmt.where(MentorBooking.booking_date >= start)
+        if end:
+            stmt = stmt.where(MentorBooking.booking_date < end)
+        yield from self._stream(stmt)
+
+    def iter_posts(self, date_from: Optional[date] = None, date_to: Optional[date] = None) -> Iterator[Dict[str, Any]]:
+        start, end = _day_bounds(date_from, date_to)
+        stmt = select(*[getattr(Post, column) for column in POST_COLUMNS]).order_by(Post.id)
+        if start:
+            stmt = stmt.where(Post.date_created >= start)
+        if end:
+            stmt = stmt.where(Post.date_created < end)
+        yield from self._stream(stmt)
+
+    def iter_annual_targets(self, date_from: Optional[date] = None, date_to: Optional[date] = None) -> Iterator[Dict[str, Any]]:
+        start, end = _day_bounds(date_from, date_to)
+        stmt = select(*[getattr(AnnualTarget, column) for column in ANNUAL_TARGET_COLUMNS]).order_by(AnnualTarget.id)
+        if start:
+            stmt = stmt.where(AnnualTarget.date_created >= start)
+        if end:
+            stmt = stmt.where(AnnualTarget.date_created < end)
+        yield from self._stream(stmt)
+
+
+EXPORTS: Dict[ExportKindEnum, tuple[List[str], Callable[..., Iterator[Dict[str, Any]]]]] = {
+    ExportKindEnum.users: (USER_COLUMNS, ExportService.iter_users),
+    ExportKindEnum.bookings: (BOOKING_COLUMNS, ExportService.iter_bookings),
+    ExportKindEnum.posts: (POST_COLUMNS, ExportService.iter_posts),
+    ExportKindEnum.annual_targets: (ANNUAL_TARGET_COLUMNS, ExportService.iter_annual_targets),
+}
+
+
+def _ndjson_lines(rows: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps({key: _serialize(value) for key, value in row.items()}, default=str) + "\n"
+
+
+def _csv_chunks(columns: List[str], rows: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 1
+    for row in rows:
+        writer.writerow([
+            "; ".join(value) if isinstance(value, list) else _serialize(value)
+            for value in (row[column] for column in columns)
+        ])
+        pending += 1
+        if pending >= settings.EXPORT_BATCH_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+
+def stream_export(
+    kind: ExportKindEnum,
+    fmt: ExportFormatEnum,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> Iterator[str]:
+    """
+    Response body generator for an export. It opens its own session because
+    the request-scoped one is closed before a streaming body is sent.
+    """
+    columns, iter_rows = EXPORTS[kind]
+    db = SessionLocal()
+    try:
+        rows = iter_rows(ExportService(db), date_from, date_to)
+        if fmt == ExportFormatEnum.csv:
+            yield from _csv_chunks(columns, rows)
+        else:
+            yield from _ndjson_lines(rows)
+    except Exception as e:
+        logger.error(f"Error streaming {kind.value} export: {str(e)}")
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,87 @@
+"""
+Event-loop stall detector (debug / ops mode).
+
+A heartbeat task on the loop stamps the time every `interval`. A watchdog
+thread checks that stamp; if the loop hasn't beaten for longer than the
+threshold, some callback is blocking it, and the watchdog logs the loop
+thread's current stack, i.e. the code that is blocking, while it blocks.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """
+    Logs a stack trace for any callback that blocks the event loop longer
+    than `threshold` seconds.
+    """
+
+    def __init__(self, threshold: float, interval: Optional[float] = None) -> None:
+        self.threshold = threshold
+        self.interval = interval or threshold / 2
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = time.monotonic() - expected
+            if lag > self.threshold:
+                logger.warning(f"Event loop lagged {lag * 1000:.0f} ms behind schedule")
+
+    def _watch(self) -> None:
+        reported_beat = None
+        while not self._stopped.wait(self.interval):
+            last_beat = self._last_beat
+            blocked_for = time.monotonic() - last_beat
+            # Report each stall once, while it is still in progress
+            if blocked_for <= self.threshold or reported_beat == last_beat:
+                continue
+            reported_beat = last_beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<no frame>"
+            logger.warning(
+                f"Event loop blocked for {blocked_for * 1000:.0f} ms "
+                f"(threshold {self.threshold * 1000:.0f} ms). Loop thread stack:\n{stack}"
+            )
+
+    def start(self) -> None:
+        """Start monitoring the running loop; call from within it"""
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._heartbeat_task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"Event loop lag monitor started (threshold {self.threshold * 1000:.0f} ms)")
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+        if self._watchdog:
+            self._watchdog.join(timeout=self.interval * 2)
+            self._watchdog = None
+
+
+loop_monitor = LoopLagMonitor(threshold=settings.LOOP_MONITOR_THRESHOLD_MS / 1000)
@@ -1,12 +1,24 @@
 """
 Service for calculating profile completion percentage
 """
-from typing import Dict, Any
+from collections import Counter, defaultdict
+from typing import Dict, Any, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, selectinload
 from db.models.user import User
 from db.models.annual_target import AnnualTarget
+from db.models.profile_completion import ProfileCompletion
 from utils.enums import AnnualTargetStatusEnum
 
 
+# Relationships read by the completion calculation
+COMPLETION_RELATIONSHIPS = (
+    User.industry, User.skills, User.career_goals,
+    User.mentoring_frequency, User.mentoring_format,
+)
+
+
 class ProfileCompletionService:
     """Calculate profile completion based on user type"""
 
@@ -153,30 +165,32 @@ class ProfileCompletionService:
         Returns:
             dict: Annual target completion details
         """
-        if not annual_targets:
-            return {
-                "total_targets": 0,
-                "completed_targets": 0,
-                "in_progress_targets": 0,
-                "not_started_targets": 0,
-                "overdue_targets": 0,
-                "percentage": 0.0
-            }
+        return ProfileCompletionService.calculate_annual_target_completion_from_counts(
+            Counter(t.status for t in annual_targets)
+        )
+
+    @staticmethod
+    def calculate_annual_target_completion_from_counts(status_counts: Dict[Any, int]) -> Dict[str, Any]:
+        """
+        Same as calculate_annual_target_completion, from per-status target counts.
 
-        total = len(annual_targets)
-        completed = sum(1 for t in annual_targets if t.status == AnnualTargetStatusEnum.completed)
-        in_progress = sum(1 for t in annual_targets if t.status == AnnualTargetStatusEnum.in_progress)
-        not_started = sum(1 for t in annual_targets if t.status == AnnualTargetStatusEnum.not_started)
-        overdue = sum(1 for t in annual_targets if t.status == AnnualTargetStatusEnum.overdue)
+        Args:
+            status_counts: Mapping of AnnualTargetStatusEnum to number of targets
+
+        Returns:
+            dict: Annual target completion details
+        """
+        total = sum(status_counts.values())
+        completed = status_counts.get(AnnualTargetStatusEnum.completed, 0)
 
         percentage = (completed / total * 100) if total > 0 else 0.0
 
         return {
             "total_targets": total,
             "completed_targets": completed,
-            "in_progress_targets": in_progress,
-            "not_started_targets": not_started,
-            "overdue_targets": overdue,
+            "in_progress_targets": status_counts.get(AnnualTargetStatusEnum.in_progress, 0),
+            "not_started_targets": status_counts.get(AnnualTargetStatusEnum.not_started, 0),
+            "overdue_targets": status_counts.get(AnnualTargetStatusEnum.overdue, 0),
             "percentage": round(percentage, 2)
         }
 
@@ -195,3 +209,101 @@ class ProfileCompletionService:
         """
         overall = (profile_percentage + annual_target_percentage) / 2
         return round(overall, 2)
+
+    @staticmethod
+    def _annual_target_counts(db: Session, user_ids: List[int]) -> Dict[int, Dict[Any, int]]:
+        """Per-user, per-status annual target counts in a single grouped query"""
+        rows = db.execute(
+            select(AnnualTarget.user_id, AnnualTarget.status, func.count(AnnualTarget.id))
+            .where(AnnualTarget.user_id.in_(user_ids))
+            .group_by(AnnualTarget.user_id, AnnualTarget.status)
+        ).all()
+        counts: Dict[int, Dict[Any, int]] = defaultdict(dict)
+        for user_id, target_status, count in rows:
+            counts[user_id][target_status] = count
+        return counts
+
+    @staticmethod
+    def refresh_completions(db: Session, users: List[User]) -> None:
+        """
+        Recompute and upsert the stored completion rows for the given users.
+        Pending changes are flushed first so the calculation sees them; the
+        caller owns the transaction and commits.
+        """
+        if not users:
+            return
+        db.flush()
+        target_counts = ProfileCompletionService._annual_target_counts(db, [u.id for u in users])
+
+        rows = []
+        for user in users:
+            profile_details = ProfileCompletionService.calculate_profile_completion(user)
+            annual_targets_summary = ProfileCompletionService.calculate_annual_target_completion_from_counts(
+                target_counts.get(user.id, {})
+            )
+            rows.append({
+                "user_id": user.id,
+                "user_type": user.user_type.value if hasattr(user.user_type, 'value') else user.user_type,
+                "profile_percentage": profile_details["percentage"],
+                "annual_target_percentage": annual_targets_summary["percentage"],
+                "overall_percentage": ProfileCompletionService.calculate_overall_completion(
+                    profile_details["percentage"], annual_targets_summary["percentage"]
+                ),
+                "profile_details": profile_details,
+                "annual_targets_summary": annual_targets_summary,
+            })
+
+        stmt = pg_insert(ProfileCompletion).values(rows)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ProfileCompletion.user_id],
+                set_={
+                    "user_type": stmt.excluded.user_type,
+                    "profile_percentage": stmt.excluded.profile_percentage,
+                    "annual_target_percentage": stmt.excluded.annual_target_percentage,
+                    "overall_percentage": stmt.excluded.overall_percentage,
+                    "profile_details": stmt.excluded.profile_details,
+                    "annual_targets_summary": stmt.excluded.annual_targets_summary,
+                    "last_modified": func.now(),
+                },
+            )
+        )
+
+    @staticmethod
+    def refresh_user_completion(db: Session, user: User) -> None:
+        """Recompute the stored completion row for one user"""
+        ProfileCompletionService.refresh_completions(db, [user])
+
+    @staticmethod
+    def get_user_completion(db: Session, user: User) -> ProfileCompletion:
+        """Stored completion for a user, computed on first access if missing"""
+        completion: Optional[ProfileCompletion] = db.get(ProfileCompletion, user.id)
+        if completion is None:
+            ProfileCompletionService.refresh_user_completion(db, user)
+            db.commit()
+            completion = db.get(ProfileCompletion, user.id)
+        return completion
+
+    @staticmethod
+    def backfill(db: Session, batch_size: int = 500) -> int:
+        """
+        Recompute completion for every user in id-ordered batches, committing
+        after each batch. Returns the number of users processed.
+        """
+        processed = 0
+        last_id = 0
+        while True:
+            users = db.execute(
+                select(User)
+                .options(*[selectinload(rel) for rel in COMPLETION_RELATIONSHIPS])
+                .where(User.id > last_id)
+                .order_by(User.id)
+                .limit(batch_size)
+            ).scalars().all()
+            if not users:
+                return processed
+            ProfileCompletionService.refresh_completions(db, users)
+            db.commit()
+            processed += len(users)
+            last_id = users[-1].id
+            db.expunge_all()
@@ -0,0 +1,307 @@
+"""
+Background job runner for time-based housekeeping.
+
+Every app process may start the scheduler, but only the one holding a
+Postgres session-level advisory lock runs jobs; the others keep retrying the
+lock and take over if the leader's connection goes away. Jobs are idempotent
+and work in chunks claimed with `FOR UPDATE SKIP LOCKED`, so a job that also
+runs elsewhere (e.g. `python -m services.scheduler` during a hand-over) never
+processes the same rows twice.
+
+Usage as a separate process:
+    python -m services.scheduler
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, List, Optional
+
+import anyio
+from anyio import from_thread, to_thread
+from sqlalchemy import Connection, delete, select, text, update
+from sqlalchemy.orm import Session, aliased, selectinload
+
+from core.config import settings
+from db.database import SessionLocal, engine
+from db.models.annual_target import AnnualTarget
+from db.models.email_verification import EmailVerification
+from db.models.mentors import MentorBooking
+from db.models.user import User
+from services.availability import invalidate_mentor_availability
+from services.bookings import BOOKING_TRANSITIONS
+from services.profile_completion import COMPLETION_RELATIONSHIPS, ProfileCompletionService
+from utils.enums import AnnualTargetStatusEnum, MentorBookingStatusEnum
+from utils.mail_service import send_booking_reminder
+
+
+logger = logging.getLogger(__name__)
+
+# pg_try_advisory_lock key shared by every scheduler instance
+SCHEDULER_LOCK_KEY = 0x6B6F6368
+
+# Statuses a booking can be completed from
+COMPLETABLE_STATUSES = [
+    current for current, targets in BOOKING_TRANSITIONS.items()
+    if MentorBookingStatusEnum.completed in targets
+]
+REMINDER_STATUSES = [MentorBookingStatusEnum.accepted, MentorBookingStatusEnum.confirmed]
+
+
+def complete_past_bookings(db: Session, batch_size: int) -> int:
+    """accepted/confirmed bookings whose session has ended -> completed"""
+    ids = select(MentorBooking.id).where(
+        MentorBooking.status.in_(COMPLETABLE_STATUSES),
+        MentorBooking.booking_end <= datetime.now(timezone.utc),
+    ).limit(batch_size).with_for_update(skip_locked=True)
+    mentor_ids = db.execute(
+        update(MentorBooking)
+        .where(MentorBooking.id.in_(ids.scalar_subquery()))
+        .values(status=MentorBookingStatusEnum.completed, version=MentorBooking.version + 1)
+        .returning(MentorBooking.mentor_id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.commit()
+    invalidate_mentor_availability(*mentor_ids)
+    return len(mentor_ids)
+
+
+def mark_overdue_targets(db: Session, batch_size: int) -> int:
+    """Open annual targets past their completed_by date -> overdue"""
+    ids = select(AnnualTarget.id).where(
+        AnnualTarget.status.in_([AnnualTargetStatusEnum.not_started, AnnualTargetStatusEnum.in_progress]),
+        AnnualTarget.completed_by < date.today(),
+    ).limit(batch_size).with_for_update(skip_locked=True)
+    user_ids = db.execute(
+        update(AnnualTarget)
+        .where(AnnualTarget.id.in_(ids.scalar_subquery()))
+        .values(status=AnnualTargetStatusEnum.overdue)
+        .returning(AnnualTarget.user_id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    if user_ids:
+        # Overdue counts are part of the stored completion summary
+        users = db.execute(
+            select(User)
+            .options(*[selectinload(rel) for rel in COMPLETION_RELATIONSHIPS])
+            .where(User.id.in_(set(user_ids)))
+        ).scalars().all()
+        ProfileCompletionService.refresh_completions(db, users)
+    db.commit()
+    return len(user_ids)
+
+
+def purge_expired_verifications(db: Session, batch_size: int) -> int:
+    """Delete email verification tokens that can no longer be used"""
+    ids = select(EmailVerification.id).where(
+        EmailVerification.expires_at < datetime.now(timezone.utc)
+    ).limit(batch_size).with_for_update(skip_locked=True)
+    result = db.execute(
+        delete(EmailVerification)
+        .where(EmailVerification.id.in_(ids.scalar_subquery()))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def _send_reminders(db: Session, batch_size: int, sent_column, lead: timedelta, floor: timedelta) -> int:
+    """
+    Claim bookings starting within (now + floor, now + lead] whose reminder
+    hasn't gone out, mark them sent, commit, then email both parties. Marking
+    before sending keeps the job idempotent: a reminder is sent at most once.
+    """
+    now = datetime.now(timezone.utc)
+    mentor, mentee = aliased(User), aliased(User)
+    claimed = select(MentorBooking.id).where(
+        MentorBooking.status.in_(REMINDER_STATUSES),
+        sent_column.is_(None),
+        MentorBooking.booking_date > now + floor,
+        MentorBooking.booking_date <= now + lead,
+    ).limit(batch_size).with_for_update(skip_locked=True)
+    booking_ids = db.execute(
+        update(MentorBooking)
+        .where(MentorBooking.id.in_(claimed.scalar_subquery()))
+        .values({sent_column: now})
+        .returning(MentorBooking.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    if not booking_ids:
+        db.commit()
+        return 0
+    rows = db.execute(
+        select(
+            MentorBooking.booking_date,
+            mentor.email, mentor.first_name,
+            mentee.email, mentee.first_name,
+        )
+        .join(mentor, mentor.id == MentorBooking.mentor_id)
+        .join(mentee, mentee.id == MentorBooking.mentee_id)
+        .where(MentorBooking.id.in_(booking_ids))
+    ).all()
+    db.commit()
+
+    for booking_date, mentor_email, mentor_name, mentee_email, mentee_name in rows:
+        for email, username, other_name in (
+            (mentor_email, mentor_name, mentee_name),
+            (mentee_email, mentee_name, mentor_name),
+        ):
+            try:
+                from_thread.run(send_booking_reminder, email, username, other_name, booking_date)
+            except Exception as e:
+                logger.error(f"Failed to send booking reminder to {email}: {str(e)}")
+    return len(booking_ids)
+
+
+def send_day_reminders(db: Session, batch_size: int) -> int:
+    """24h booking reminders (skipped for bookings already inside the 1h window)"""
+    return _send_reminders(
+        db, batch_size, MentorBooking.reminder_24h_sent_at, timedelta(hours=24), timedelta(hours=1)
+    )
+
+
+def send_hour_reminders(db: Session, batch_size: int) -> int:
+    """1h booking reminders"""
+    return _send_reminders(
+        db, batch_size, MentorBooking.reminder_1h_sent_at, timedelta(hours=1), timedelta(0)
+    )
+
+
+@dataclass
+class ScheduledJob:
+    name: str
+    interval: float
+    func: Callable[[Session, int], int]
+    next_run: float = 0.0
+
+    def run(self, batch_size: int) -> int:
+        """Run chunks until one comes back short. Blocking; call from a worker thread"""
+        total = 0
+        db = SessionLocal()
+        try:
+            while True:
+                processed = self.func(db, batch_size)
+                total += processed
+                if processed < batch_size:
+                    return total
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+def default_jobs() -> List[ScheduledJob]:
+    return [
+        ScheduledJob("complete_past_bookings", 300, complete_past_bookings),
+        ScheduledJob("mark_overdue_targets", 3600, mark_overdue_targets),
+        ScheduledJob("purge_expired_verifications", 3600, purge_expired_verifications),
+        ScheduledJob("send_day_reminders", 60, send_day_reminders),
+        ScheduledJob("send_hour_reminders", 60, send_hour_reminders),
+    ]
+
+
+class Scheduler:
+    """
+    Ticks every `tick` seconds; while leader, runs each job whose interval
+    has elapsed. Jobs run in worker threads so the event loop stays free.
+    """
+
+    def __init__(self, jobs: List[ScheduledJob], tick: float, batch_size: int) -> None:
+        self.jobs = jobs
+        self.tick = tick
+        self.batch_size = batch_size
+        self._lock_conn: Optional[Connection] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_conn is not None
+
+    def _acquire_leadership(self) -> bool:
+        """Hold the advisory lock on a dedicated connection; verify it's still alive"""
+        if self._lock_conn is not None:
+            try:
+                self._lock_conn.execute(text("SELECT 1"))
+                return True
+            except Exception:
+                logger.warning("Scheduler lost its leader connection")
+                self._release_leadership()
+        conn = engine.connect()
+        try:
+            acquired = conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": SCHEDULER_LOCK_KEY}
+            ).scalar()
+            conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        if not acquired:
+            conn.close()
+            return False
+        logger.info("Scheduler acquired leadership")
+        self._lock_conn = conn
+        return True
+
+    def _release_leadership(self) -> None:
+        if self._lock_conn is None:
+            return
+        try:
+            self._lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEDULER_LOCK_KEY})
+            self._lock_conn.commit()
+        except Exception:
+            pass
+        finally:
+            self._lock_conn.close()
+            self._lock_conn = None
+
+    async def run_due_jobs(self) -> None:
+        if not await to_thread.run_sync(self._acquire_leadership):
+            return
+        for job in self.jobs:
+            now = time.monotonic()
+            if job.next_run > now:
+                continue
+            job.next_run = now + job.interval
+            try:
+                processed = await to_thread.run_sync(job.run, self.batch_size)
+                if processed:
+                    logger.info(f"Scheduled job {job.name} processed {processed} rows")
+            except Exception as e:
+                logger.error(f"Scheduled job {job.name} failed: {str(e)}")
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await self.run_due_jobs()
+            except Exception as e:
+                logger.error(f"Scheduler tick failed: {str(e)}")
+            await asyncio.sleep(self.tick)
+
+    def start(self) -> None:
+        """Start ticking on the running loop"""
+        self._task = asyncio.get_running_loop().create_task(self.run_forever())
+        logger.info(f"Scheduler started (tick {self.tick}s)")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await to_thread.run_sync(self._release_leadership)
+
+
+scheduler = Scheduler(
+    default_jobs(),
+    tick=settings.SCHEDULER_TICK_SECONDS,
+    batch_size=settings.SCHEDULER_BATCH_SIZE,
+)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    anyio.run(scheduler.run_forever)
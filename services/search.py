@@ -0,0 +1,175 @@
+"""
+Full-text search over posts, comments and chat messages.
+
+Each source is matched against its generated `search_vector` column (GIN
+indexed) and restricted to what the user may see in the same statement:
+visible community posts and posts in groups that are public, joined or
+owned by the user; comments on those posts; messages in rooms the user is a
+member of. The sources are combined with UNION ALL, ranked with ts_rank and
+keyset-paginated on (rank, kind, id). Headlines are only computed for the
+returned page.
+"""
+import logging
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import (
+    REAL, Integer, String, and_, cast, exists, false, func, literal, literal_column, null, or_, select, union_all
+)
+from sqlalchemy.orm import Session
+
+from api.api_models.search import SearchPage, SearchResult
+from core.exceptions import exceptions
+from db.models.chat import ChatRoomMember, Message
+from db.models.comments import Comment
+from db.models.groups import Group, GroupMembership
+from db.models.posts import Post
+from db.models.user import User
+from utils.enums import SearchScopeEnum
+from utils.utils import _visible_comments_where, _visible_posts_where
+
+
+logger = logging.getLogger(__name__)
+
+# Must match the configuration of the generated search_vector columns
+TS_CONFIG = literal_column("'english'::regconfig")
+HEADLINE_OPTIONS = "StartSel=<b>, StopSel=</b>, MaxWords=35, MinWords=15, MaxFragments=2"
+
+
+def _encode_search_cursor(rank: float, kind: str, id_: int) -> str:
+    return urlsafe_b64encode(f"{rank!r}|{kind}|{id_}".encode()).decode()
+
+
+def _decode_search_cursor(cursor: str) -> Tuple[float, str, int]:
+    try:
+        rank_s, kind, id_s = urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return float(rank_s), kind, int(id_s)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=exceptions.INVALID_CURSOR)
+
+
+def visible_post_where(user: User):
+    """Posts the user may see: community posts, or group posts in public/joined/owned groups"""
+    member = exists(
+        select(GroupMembership.group_id).where(
+            GroupMembership.group_id == Post.group_id,
+            GroupMembership.user_id == user.id,
+        )
+    )
+    accessible_group = exists(
+        select(Group.id).where(
+            Group.id == Post.group_id,
+            or_(Group.is_public.is_(True), Group.created_by == user.id),
+        )
+    )
+    return and_(
+        _visible_posts_where(),
+        or_(Post.group_id.is_(None), accessible_group, member),
+    )
+
+
+class SearchService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _post_source(self, user: User, query):
+        return select(
+            literal("post", String).label("kind"),
+            Post.id.label("id"),
+            func.ts_rank(Post.search_vector, query).label("rank"),
+            Post.content.label("content"),
+            Post.user_id.label("author_id"),
+            Post.date_created.label("date_created"),
+            Post.id.label("post_id"),
+            Post.group_id.label("group_id"),
+            cast(null(), Integer).label("chat_room_id"),
+        ).where(Post.search_vector.op("@@")(query), visible_post_where(user))
+
+    def _comment_source(self, user: User, query):
+        return select(
+            literal("comment", String).label("kind"),
+            Comment.id.label("id"),
+            func.ts_rank(Comment.search_vector, query).label("rank"),
+            Comment.content.label("content"),
+            Comment.user_id.label("author_id"),
+            Comment.date_created.label("date_created"),
+            Comment.post_id.label("post_id"),
+            Post.group_id.label("group_id"),
+            cast(null(), Integer).label("chat_room_id"),
+        ).join(Post, Post.id == Comment.post_id).where(
+            Comment.search_vector.op("@@")(query),
+            _visible_comments_where(),
+            visible_post_where(user),
+        )
+
+    def _message_source(self, user: User, query):
+        return select(
+            literal("message", String).label("kind"),
+            Message.id.label("id"),
+            func.ts_rank(Message.search_vector, query).label("rank"),
+            Message.content.label("content"),
+            Message.sender_id.label("author_id"),
+            Message.date_created.label("date_created"),
+            cast(null(), Integer).label("post_id"),
+            cast(null(), Integer).label("group_id"),
+            Message.chat_room_id.label("chat_room_id"),
+        ).join(
+            ChatRoomMember,
+            and_(
+                ChatRoomMember.chat_room_id == Message.chat_room_id,
+                ChatRoomMember.user_id == user.id,
+            ),
+        ).where(
+            Message.search_vector.op("@@")(query),
+            Message.deleted.is_(false()),
+        )
+
+    def search(
+        self,
+        user: User,
+        q: str,
+        scope: SearchScopeEnum = SearchScopeEnum.all,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> SearchPage:
+        query = func.websearch_to_tsquery(TS_CONFIG, q)
+        sources = []
+        if scope in (SearchScopeEnum.all, SearchScopeEnum.posts):
+            sources.append(self._post_source(user, query))
+        if scope in (SearchScopeEnum.all, SearchScopeEnum.comments):
+            sources.append(self._comment_source(user, query))
+        if scope in (SearchScopeEnum.all, SearchScopeEnum.messages):
+            sources.append(self._message_source(user, query))
+        matches = (union_all(*sources) if len(sources) > 1 else sources[0]).subquery("matches")
+
+        page = select(matches)
+        if cursor:
+            rank, kind, last_id = _decode_search_cursor(cursor)
+            # ts_rank returns real; compare as real so the cursor round-trips exactly
+            last_rank = cast(literal(rank), REAL)
+            page = page.where(
+                or_(
+                    matches.c.rank < last_rank,
+                    and_(matches.c.rank == last_rank, matches.c.kind > kind),
+                    and_(matches.c.rank == last_rank, matches.c.kind == kind, matches.c.id < last_id),
+                )
+            )
+        page = page.order_by(
+            matches.c.rank.desc(), matches.c.kind.asc(), matches.c.id.desc()
+        ).limit(limit + 1).subquery("page")
+
+        rows = self.db.execute(
+            select(
+                page.c.kind, page.c.id, page.c.rank, page.c.author_id, page.c.date_created,
+                page.c.post_id, page.c.group_id, page.c.chat_room_id,
+                func.ts_headline(TS_CONFIG, page.c.content, query, HEADLINE_OPTIONS).label("headline"),
+            ).order_by(page.c.rank.desc(), page.c.kind.asc(), page.c.id.desc())
+        ).all()
+
+        items: List[SearchResult] = [SearchResult(**row._mapping) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = _encode_search_cursor(last.rank, last.kind, last.id)
+        return SearchPage(items=items, next_cursor=next_cursor)
@@ -0,0 +1,339 @@
+"""
+Service for the materialized home timeline.
+
+Posts in small groups are fanned out on write into `timeline_entries` for every
+member of the group. Community posts and posts in groups larger than
+`TIMELINE_FANOUT_MAX_GROUP_SIZE` are not fanned out; they are merged in at read
+time (fan-out-on-read) from the posts table.
+"""
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Integer, func, literal, or_, select, text, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, selectinload
+
+from core.config import settings
+from db.database import SessionLocal
+from db.models.comments import Comment
+from db.models.groups import Group, GroupMembership
+from db.models.posts import Post
+from db.models.reactions import Reaction
+from db.models.timeline import TimelineEntry
+from db.models.user import User
+from api.api_models.posts import PostListResponse
+from utils.utils import (
+    _decode_cursor, _encode_cursor, _visible_comments_where, _visible_posts_where, reaction_summary
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+# Keep only the newest TIMELINE_MAX_ENTRIES rows for each of the given users
+TRIM_TIMELINES_SQL = text(
+    """
+    DELETE FROM timeline_entries t
+    USING (
+        SELECT u.user_id, cutoff.date_created, cutoff.post_id
+        FROM unnest(:user_ids) AS u(user_id)
+        CROSS JOIN LATERAL (
+            SELECT te.date_created, te.post_id
+            FROM timeline_entries te
+            WHERE te.user_id = u.user_id
+            ORDER BY te.date_created DESC, te.post_id DESC
+            OFFSET :max_entries LIMIT 1
+        ) AS cutoff
+    ) AS c
+    WHERE t.user_id = c.user_id
+      AND (t.date_created, t.post_id) <= (c.date_created, c.post_id)
+    """
+)
+
+
+class TimelineService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _group_audience(self, group: Group) -> List[int]:
+        """Members of a group plus its creator"""
+        member_ids = self.db.execute(
+            select(GroupMembership.user_id).where(GroupMembership.group_id == group.id)
+        ).scalars().all()
+        audience = set(member_ids)
+        if group.created_by is not None:
+            audience.add(group.created_by)
+        return list(audience)
+
+    @staticmethod
+    def is_fanned_out(group: Optional[Group]) -> bool:
+        """Whether posts in this group are materialized into member timelines"""
+        return group is not None and group.member_count <= settings.TIMELINE_FANOUT_MAX_GROUP_SIZE
+
+    def trim(self, user_ids: List[int]) -> None:
+        if not user_ids:
+            return
+        self.db.execute(
+            TRIM_TIMELINES_SQL,
+            {"user_ids": user_ids, "max_entries": settings.TIMELINE_MAX_ENTRIES},
+        )
+
+    def fan_out_post(self, post_id: int) -> int:
+        """
+        Push a newly created group post into the timeline of every group member.
+        Returns the number of timelines written to.
+        """
+        post = self.db.get(Post, post_id)
+        if not post or post.deleted_at is not None or post.group_id is None:
+            return 0
+        group = self.db.get(Group, post.group_id)
+        if not self.is_fanned_out(group):
+            return 0
+
+        audience = self._group_audience(group)
+        if not audience:
+            return 0
+        self.db.execute(
+            pg_insert(TimelineEntry)
+            .values([
+                {
+                    "user_id": user_id,
+                    "post_id": post.id,
+                    "group_id": post.group_id,
+                    "date_created": post.date_created,
+                }
+                for user_id in audience
+            ])
+            .on_conflict_do_nothing()
+        )
+        self.trim(audience)
+        self.db.commit()
+        return len(audience)
+
+    def backfill_member(self, user_id: int, group_id: int) -> None:
+        """Copy the most recent posts of a group into a new member's timeline"""
+        group = self.db.get(Group, group_id)
+        if not self.is_fanned_out(group):
+            return
+        recent_posts = (
+            select(
+                literal(user_id).label("user_id"),
+                Post.id,
+                Post.group_id,
+                Post.date_created,
+            )
+            .where(Post.group_id == group_id, _visible_posts_where())
+            .order_by(Post.date_created.desc(), Post.id.desc())
+            .limit(settings.TIMELINE_MAX_ENTRIES)
+        )
+        self.db.execute(
+            pg_insert(TimelineEntry)
+            .from_select(["user_id", "post_id", "group_id", "date_created"], recent_posts)
+            .on_conflict_do_nothing()
+        )
+        self.trim([user_id])
+
+    def backfill_group(self, group_id: int) -> int:
+        """
+        Copy the most recent posts of a fanned-out group into the timeline of
+        every member: for posts written before the timeline existed, or while
+        the group was above the fan-out threshold. Returns the number of
+        timelines written to; the caller commits.
+        """
+        group = self.db.get(Group, group_id)
+        if not self.is_fanned_out(group):
+            return 0
+        audience = self._group_audience(group)
+        if not audience:
+            return 0
+        recent_posts = (
+            select(Post.id, Post.group_id, Post.date_created)
+            .where(Post.group_id == group_id, _visible_posts_where())
+            .order_by(Post.date_created.desc(), Post.id.desc())
+            .limit(settings.TIMELINE_MAX_ENTRIES)
+            .subquery()
+        )
+        members = select(
+            func.unnest(literal(audience, ARRAY(Integer))).label("user_id")
+        ).subquery()
+        self.db.execute(
+            pg_insert(TimelineEntry)
+            .from_select(
+                ["user_id", "post_id", "group_id", "date_created"],
+                select(members.c.user_id, recent_posts.c.id, recent_posts.c.group_id, recent_posts.c.date_created),
+            )
+            .on_conflict_do_nothing()
+        )
+        self.trim(audience)
+        return len(audience)
+
+    def backfill_all(self, batch_size: int = 500) -> int:
+        """
+        `backfill_group` for every fanned-out group, committing after each
+        one. Run after the timeline is introduced or the fan-out threshold is
+        raised. Returns the number of groups processed.
+        """
+        processed = 0
+        last_id = 0
+        while True:
+            group_ids = self.db.execute(
+                select(Group.id)
+                .where(Group.id > last_id, Group.member_count <= settings.TIMELINE_FANOUT_MAX_GROUP_SIZE)
+                .order_by(Group.id)
+                .limit(batch_size)
+            ).scalars().all()
+            if not group_ids:
+                return processed
+            for group_id in group_ids:
+                self.backfill_group(group_id)
+                self.db.commit()
+            processed += len(group_ids)
+            last_id = group_ids[-1]
+            self.db.expunge_all()
+
+    def remove_member(self, user_id: int, group_id: int) -> None:
+        """Drop a group's posts from the timeline of a member who left it"""
+        self.db.query(TimelineEntry).filter(
+            TimelineEntry.user_id == user_id,
+            TimelineEntry.group_id == group_id,
+        ).delete(synchronize_session=False)
+
+    def remove_post(self, post_id: int) -> None:
+        self.db.query(TimelineEntry).filter(
+            TimelineEntry.post_id == post_id
+        ).delete(synchronize_session=False)
+
+    def _fan_out_on_read_group_ids(self, user_id: int) -> List[int]:
+        """Groups of the user whose posts are not materialized"""
+        return self.db.execute(
+            select(Group.id).where(
+                or_(Group.members.any(id=user_id), Group.created_by == user_id),
+                Group.member_count > settings.TIMELINE_FANOUT_MAX_GROUP_SIZE,
+            )
+        ).scalars().all()
+
+    def _page_ids(
+        self, user: User, limit: int, cursor: Optional[Tuple[datetime, int]]
+    ) -> List[Tuple[datetime, int]]:
+        """Merge materialized entries with fan-out-on-read posts, newest first"""
+        materialized = select(TimelineEntry.date_created, TimelineEntry.post_id).where(
+            TimelineEntry.user_id == user.id
+        )
+        if cursor:
+            materialized = materialized.where(
+                tuple_(TimelineEntry.date_created, TimelineEntry.post_id) < tuple_(*cursor)
+            )
+        materialized = materialized.order_by(
+            TimelineEntry.date_created.desc(), TimelineEntry.post_id.desc()
+        ).limit(limit + 1)
+
+        large_group_ids = self._fan_out_on_read_group_ids(user.id)
+        on_read = select(Post.date_created, Post.id).where(
+            _visible_posts_where(),
+            or_(Post.group_id.is_(None), Post.group_id.in_(large_group_ids))
+            if large_group_ids else Post.group_id.is_(None),
+        )
+        if cursor:
+            on_read = on_read.where(tuple_(Post.date_created, Post.id) < tuple_(*cursor))
+        on_read = on_read.order_by(Post.date_created.desc(), Post.id.desc()).limit(limit + 1)
+
+        merged = {
+            post_id: ts
+            for ts, post_id in list(self.db.execute(materialized).all()) + list(self.db.execute(on_read).all())
+        }
+        return sorted(((ts, post_id) for post_id, ts in merged.items()), reverse=True)[:limit + 1]
+
+    def hydrate(self, post_ids: List[int], viewer: User) -> List[PostListResponse]:
+        """Load posts, counts, authors and the viewer's reaction for a page in a fixed number of queries"""
+        if not post_ids:
+            return []
+        comments_count = (
+            select(func.count(Comment.id))
+            .where(Comment.post_id == Post.id, Comment.parent_comment_id.is_(None), _visible_comments_where())
+            .correlate(Post)
+            .scalar_subquery()
+        )
+        reactions_count = (
+            select(func.count(Reaction.id))
+            .where(Reaction.post_id == Post.id)
+            .correlate(Post)
+            .scalar_subquery()
+        )
+        rows = self.db.execute(
+            select(
+                Post,
+                comments_count.label("comments_count"),
+                reactions_count.label("reactions_count"),
+            )
+            .options(selectinload(Post.group))
+            .where(Post.id.in_(post_ids), _visible_posts_where())
+        ).all()
+
+        author_ids = {row[0].user_id for row in rows}
+        authors = {u.id: u for u in self.db.query(User).filter(User.id.in_(author_ids)).all()}
+        breakdowns, viewer_types = reaction_summary(self.db, Reaction.post_id, post_ids, viewer.id)
+
+        by_id = {row[0].id: row for row in rows}
+        items = []
+        for post_id in post_ids:
+            row = by_id.get(post_id)
+            if row is None:
+                continue
+            post: Post = row[0]
+            items.append(
+                PostListResponse(
+                    id=post.id,
+                    user=authors.get(post.user_id),
+                    group=post.group,
+                    content=post.content,
+                    date_created=post.date_created,
+                    last_modified=post.last_modified,
+                    comments_count=row.comments_count,
+                    reactions_count=row.reactions_count,
+                    reactions_breakdown=breakdowns[post.id],
+                    user_reactions=viewer_types[post.id],
+                    user_reaction=viewer_types[post.id][0] if viewer_types[post.id] else None,
+                )
+            )
+        return items
+
+    def home_feed(
+        self, user: User, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[PostListResponse], Optional[str]]:
+        decoded = _decode_cursor(cursor) if cursor else None
+        page = self._page_ids(user, limit, decoded)
+
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = _encode_cursor(*page[-1])
+        return self.hydrate([post_id for _, post_id in page], user), next_cursor
+
+
+def fan_out_post(post_id: int) -> None:
+    """Background task entry point: fan a post out with its own session"""
+    db = SessionLocal()
+    try:
+        written = TimelineService(db).fan_out_post(post_id)
+        logger.info(f"Fanned out post {post_id} to {written} timelines")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error fanning out post {post_id}: {str(e)}")
+    finally:
+        db.close()
+
+
+def backfill_group(group_id: int) -> None:
+    """Background task entry point: backfill a group's member timelines with its own session"""
+    db = SessionLocal()
+    try:
+        written = TimelineService(db).backfill_group(group_id)
+        db.commit()
+        logger.info(f"Backfilled group {group_id} into {written} timelines")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error backfilling group {group_id}: {str(e)}")
+    finally:
+        db.close()
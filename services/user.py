@@ -2,28 +2,169 @@
 Service for user creation
 """
 import logging
-from typing import Optional, List
+from typing import FrozenSet, Optional, List
 from fastapi import HTTPException, UploadFile, status
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
-from api.api_models.user import UserSignup, UserUpdate
+from sqlalchemy.orm import Session
+from api.api_models.user import (
+    Availability, SocialLinks, UserSignup, UserUpdate, UserResponse as MemberResponse
+)
 from api.api_models.login import (
     ProfessionalBackgroundData, GoalsData, MentoringPreferencesData,
     UserResponse
 )
 from api.api_models.onboarding import (
     IndustryResponse, SkillsResponse, CareerGoalsResponse,
-    MentoringFrequencyResponse, MentoringFormatResponse
+    MentoringFrequencyResponse, MentoringFormatResponse,
+    NewRoleValueResponse, JobSearchStatusResponse, RoleofInterestResponse
 )
 from db.models.user import User
+from db.models.profile_completion import ProfileCompletion
 from db.repository.crud import Crud
+from services.profile_completion import ProfileCompletionService
+from services.availability import invalidate_mentor_availability, sync_availability_windows
+from services.user_index import user_index, user_search_text
+from services.cache import cache
+from services.user_fields import MEMBER_FIELDS, PROFILE_FIELDS, USER_SCALAR_FIELDS
 from core.exceptions import exceptions
 from core.config import settings
+from utils.enums import SortOrderEnum
 from utils.oauth2 import get_password_hash, verify_password
 
 
 logger = logging.getLogger(__name__)
 
+# Response model of each association's items
+ASSOCIATION_ITEM_MODELS = {
+    "new_role_values": NewRoleValueResponse,
+    "job_search_status": JobSearchStatusResponse,
+    "role_of_interest": RoleofInterestResponse,
+    "industry": IndustryResponse,
+    "skills": SkillsResponse,
+    "career_goals": CareerGoalsResponse,
+    "mentoring_frequency": MentoringFrequencyResponse,
+    "mentoring_format": MentoringFormatResponse,
+}
+
+
+def profile_load_options(fieldset: Optional[FrozenSet[str]] = None) -> list:
+    """
+    Loader options for what `build_user_profile` reads for `fieldset` (all of
+    it by default). selectinload issues one query per relationship for the
+    whole batch of users; eight joinedloads multiply into one row per
+    combination of associations.
+    """
+    return PROFILE_FIELDS.load_options(fieldset)
+
+
+def _construct_list(model, rows, memo: dict) -> list:
+    # Taxonomy rows are shared between users; build each one's model once
+    items = []
+    for row in rows or ():
+        item = memo.get((model, id(row)))
+        if item is None:
+            item = memo[(model, id(row))] = model.model_construct(
+                **{name: getattr(row, name) for name in model.model_fields}
+            )
+        items.append(item)
+    return items
+
+
+def _as_dict(value) -> Optional[dict]:
+    if not value:
+        return None
+    if isinstance(value, dict):
+        return value
+    return value.model_dump() if hasattr(value, "model_dump") else dict(value)
+
+
+def build_user_profile(
+    user: User,
+    memo: Optional[dict] = None,
+    fieldset: Optional[FrozenSet[str]] = None,
+) -> UserResponse:
+    """
+    UserResponse for a loaded user (see `profile_load_options`). The data
+    comes straight from the database, so the models are built with
+    `model_construct` instead of being validated field by field. Only the
+    fields in `fieldset` (all by default) are read; serialize with the
+    same fieldset as `include`.
+    """
+    memo = {} if memo is None else memo
+    wanted = PROFILE_FIELDS.all_fields if fieldset is None else fieldset
+    values = {name: getattr(user, name) for name in USER_SCALAR_FIELDS if name in wanted}
+    if "social_links" in values:
+        values["social_links"] = _as_dict(values["social_links"])
+    if "availability" in values:
+        values["availability"] = _as_dict(values["availability"])
+    if "is_onboarded" in wanted:
+        values["is_onboarded"] = user.onboarding_completed
+
+    if "professional_background" in wanted:
+        values["professional_background"] = ProfessionalBackgroundData.model_construct(
+            current_role=user.current_role,
+            company=user.company,
+            years_of_experience=user.years_of_experience,
+            industry=_construct_list(IndustryResponse, user.industry, memo),
+            skills=_construct_list(SkillsResponse, user.skills, memo),
+        )
+
+    if "goals" in wanted or "mentoring_preferences" in wanted:
+        user_type_value = user.user_type.value if hasattr(user.user_type, "value") else user.user_type
+    if "goals" in wanted:
+        values["goals"] = None
+        if user_type_value == "mentee":
+            values["goals"] = GoalsData.model_construct(
+                career_goals=_construct_list(CareerGoalsResponse, user.career_goals, memo),
+                long_term_goals=user.long_term_goals,
+            )
+    if "mentoring_preferences" in wanted:
+        values["mentoring_preferences"] = None
+        if user_type_value in ["mentor", "mentee"]:
+            values["mentoring_preferences"] = MentoringPreferencesData.model_construct(
+                mentoring_frequency=_construct_list(MentoringFrequencyResponse, user.mentoring_frequency, memo),
+                mentoring_format=_construct_list(MentoringFormatResponse, user.mentoring_format, memo),
+                preferred_skills=_construct_list(SkillsResponse, user.skills, memo),
+                preferred_industries=_construct_list(IndustryResponse, user.industry, memo),
+            )
+
+    # Legacy fields (kept for backward compatibility)
+    for name in ("new_role_values", "job_search_status", "role_of_interest"):
+        if name in wanted:
+            values[name] = _construct_list(ASSOCIATION_ITEM_MODELS[name], getattr(user, name), memo)
+
+    return UserResponse.model_construct(**values)
+
+
+def build_user_profiles(users: List[User], fieldset: Optional[FrozenSet[str]] = None) -> List[UserResponse]:
+    """`build_user_profile` for a batch, sharing the taxonomy models between users"""
+    memo: dict = {}
+    return [build_user_profile(user, memo, fieldset) for user in users]
+
+
+def build_members(users: List[User], fieldset: Optional[FrozenSet[str]] = None) -> List[MemberResponse]:
+    """
+    Flat user models (api.api_models.user.UserResponse) for a batch loaded
+    with `MEMBER_FIELDS.load_options(fieldset)`; only `fieldset` is read.
+    """
+    memo: dict = {}
+    wanted = MEMBER_FIELDS.all_fields if fieldset is None else fieldset
+    members = []
+    for user in users:
+        values = {}
+        for name in wanted:
+            if name in MEMBER_FIELDS.relationships:
+                values[name] = _construct_list(ASSOCIATION_ITEM_MODELS[name], getattr(user, name), memo)
+            elif MEMBER_FIELDS.columns[name]:
+                values[name] = getattr(user, name)
+        if "user_type" in values and hasattr(values["user_type"], "value"):
+            values["user_type"] = values["user_type"].value
+        if values.get("social_links"):
+            values["social_links"] = SocialLinks.model_validate(values["social_links"])
+        if values.get("availability"):
+            values["availability"] = Availability.model_validate(values["availability"])
+        members.append(MemberResponse.model_construct(**values))
+    return members
+
 
 class UserService:
     def __init__(self, db: Session):
@@ -54,6 +195,8 @@ class UserService:
             # Create user
             user = self.crud.create(User, new_user)
             self.db.flush()
+            if user.availability:
+                sync_availability_windows(self.db, user)
             return user
 
         except HTTPException as e:
@@ -74,112 +217,10 @@ class UserService:
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=exceptions.USER_NOT_FOUND
                 )
+            return build_user_profile(user)
 
-            # Get user type value
-            user_type_value = user.user_type.value if hasattr(user.user_type, 'value') else user.user_type
-
-            # Convert ORM objects to Pydantic response models
-            industry_list = [IndustryResponse.model_validate(ind, from_attributes=True) for ind in (user.industry or [])]
-            skills_list = [SkillsResponse.model_validate(skill, from_attributes=True) for skill in (user.skills or [])]
-            career_goals_list = [CareerGoalsResponse.model_validate(cg, from_attributes=True) for cg in (user.career_goals or [])]
-            mentoring_frequency_list = [MentoringFrequencyResponse.model_validate(mf, from_attributes=True) for mf in (user.mentoring_frequency or [])]
-            mentoring_format_list = [MentoringFormatResponse.model_validate(mfmt, from_attributes=True) for mfmt in (user.mentoring_format or [])]
-
-            # Build professional background as Pydantic model
-            professional_background = ProfessionalBackgroundData(
-                current_role=user.current_role,
-                company=user.company,
-                years_of_experience=user.years_of_experience,
-                industry=industry_list,
-                skills=skills_list
-            )
-
-            # Build goals as Pydantic model (for mentees)
-            goals = None
-            if user_type_value == "mentee":
-                goals = GoalsData(
-                    career_goals=career_goals_list,
-                    long_term_goals=user.long_term_goals
-                )
-
-            # Build mentoring preferences as Pydantic model (for mentors and mentees)
-            mentoring_preferences = None
-            if user_type_value in ["mentor", "mentee"]:
-                mentoring_preferences = MentoringPreferencesData(
-                    mentoring_frequency=mentoring_frequency_list,
-                    mentoring_format=mentoring_format_list,
-                    preferred_skills=skills_list,
-                    preferred_industries=industry_list
-                )
-
-            # Debug: Print what we have
-            print(f"DEBUG - Professional background: {professional_background}")
-            print(f"DEBUG - Goals: {goals}")
-            print(f"DEBUG - Mentoring preferences: {mentoring_preferences}")
-            print(f"DEBUG - Is onboarded value: {user.onboarding_completed}")
-
-            # Convert social_links and availability to dicts if they are objects
-            print(f"DEBUG - user.social_links type: {type(user.social_links)}, value: {user.social_links}")
-            print(f"DEBUG - user.availability type: {type(user.availability)}, value: {user.availability}")
-            
-            social_links_dict = None
-            if user.social_links:
-                if isinstance(user.social_links, dict):
-                    social_links_dict = user.social_links
-                else:
-                    # Convert Pydantic model to dict
-                    print(f"DEBUG - Converting social_links from {type(user.social_links)}")
-                    social_links_dict = user.social_links.model_dump() if hasattr(user.social_links, 'model_dump') else dict(user.social_links)
-            
-            availability_dict = None
-            if user.availability:
-                if isinstance(user.availability, dict):
-                    availability_dict = user.availability
-                else:
-                    # Convert Pydantic model to dict
-                    print(f"DEBUG - Converting availability from {type(user.availability)}")
-                    availability_dict = user.availability.model_dump() if hasattr(user.availability, 'model_dump') else dict(user.availability)
-            
-            print(f"DEBUG - social_links_dict: {social_links_dict}")
-            print(f"DEBUG - availability_dict: {availability_dict}")
-
-            # Convert Pydantic models to dicts for the nested fields
-            response = UserResponse(
-                id=user.id,
-                first_name=user.first_name,
-                last_name=user.last_name,
-                email=user.email,
-                gender=user.gender,
-                nationality=user.nationality,
-                location=user.location,
-                phone=user.phone,
-                is_active=user.is_active,
-                email_verified=user.email_verified,
-                profile_pic=user.profile_pic,
-                cover_photo=user.cover_photo,
-                about=user.about,
-                user_type=user.user_type,
-                social_links=social_links_dict,
-                availability=availability_dict,
-                # Nested onboarding data - convert to dicts with mode='json' to serialize datetimes
-                professional_background=professional_background.model_dump(mode='json') if professional_background else None,
-                goals=goals.model_dump(mode='json') if goals else None,
-                mentoring_preferences=mentoring_preferences.model_dump(mode='json') if mentoring_preferences else None,
-                # Onboarding status
-                code_of_conduct_accepted=user.code_of_conduct_accepted,
-                onboarding_completed=user.onboarding_completed,
-                is_onboarded=user.onboarding_completed,
-                # Legacy fields (kept for backward compatibility)
-                new_role_values=user.new_role_values,
-                job_search_status=user.job_search_status,
-                role_of_interest=user.role_of_interest,
-            )
-
-            print(f"DEBUG - Response created successfully")
-            print(f"DEBUG - Response is_onboarded: {response.is_onboarded}")
-
-            return response
-
+        except HTTPException as e:
+            raise e
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -189,14 +230,7 @@ class UserService:
     def get_user_by_id(self, user_id: int) -> Optional[User]:
         """Get user by ID with all relationships loaded"""
         return self.db.query(User).options(
-            joinedload(User.industry),
-            joinedload(User.skills),
-            joinedload(User.career_goals),
-            joinedload(User.mentoring_frequency),
-            joinedload(User.mentoring_format),
-            joinedload(User.new_role_values),
-            joinedload(User.job_search_status),
-            joinedload(User.role_of_interest)
+            *profile_load_options()
         ).filter(User.id == user_id).first()
 
     def get_user_by_email(self, email: str) -> Optional[User]:
@@ -249,6 +283,8 @@ class UserService:
             # Related data (email_verifications, etc.) will be cascade deleted
             self.db.delete(user)
             self.db.commit()
+            user_index.remove(user_id)
+            cache.invalidate_tags(f"user:{user_id}", "recent_members")
             return True
 
         except HTTPException:
@@ -279,11 +315,7 @@ class UserService:
     def search_users(self, query: str, skip: int = 0, limit: int = 10) -> List[User]:
         """Search users by name or email"""
         return self.db.query(User).filter(
-            or_(
-                User.email.ilike(f"%{query}%"),
-                User.first_name.ilike(f"%{query}%"),
-                User.last_name.ilike(f"%{query}%")
-            )
+            user_search_text().ilike(f"%{query}%")
         ).offset(skip).limit(limit).all()
 
     def change_password(self, user_id: int, old_password: str, new_password: str) -> bool:
@@ -326,7 +358,14 @@ class UserService:
             else:
                 update_data = user_data.model_dump(exclude_unset=True)
             updated_user = self.crud.update(user, update_data)
+            if "availability" in update_data:
+                sync_availability_windows(self.db, updated_user)
+            ProfileCompletionService.refresh_user_completion(self.db, updated_user)
             self.db.commit()
+            if "availability" in update_data:
+                invalidate_mentor_availability(updated_user.id)
+            user_index.upsert(updated_user)
+            cache.invalidate_tags(f"user:{updated_user.id}", "recent_members")
             return updated_user
 
         except Exception as e:
@@ -336,6 +375,32 @@ class UserService:
                 detail=str(e)
             )
 
-    def get_all_users(self, skip: int = 0, limit: int = 10) -> List[User]:
-        """Get all users with pagination"""
-        return self.db.query(User).offset(skip).limit(limit).all()
+    def get_all_users(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        min_completion: Optional[float] = None,
+        max_completion: Optional[float] = None,
+        completion_order: Optional[SortOrderEnum] = None,
+        fieldset: Optional[FrozenSet[str]] = None,
+    ) -> List[User]:
+        """
+        Get all users with pagination, optionally filtered and sorted by their
+        stored overall profile completion. Users without a stored score are
+        excluded by the completion filters and sort last. Only what
+        `fieldset` needs is loaded (see `profile_load_options`).
+        """
+        query = self.db.query(User).options(*profile_load_options(fieldset))
+        if min_completion is not None or max_completion is not None or completion_order:
+            query = query.outerjoin(ProfileCompletion, ProfileCompletion.user_id == User.id)
+        if min_completion is not None:
+            query = query.filter(ProfileCompletion.overall_percentage >= min_completion)
+        if max_completion is not None:
+            query = query.filter(ProfileCompletion.overall_percentage <= max_completion)
+        if completion_order == SortOrderEnum.asc:
+            query = query.order_by(ProfileCompletion.overall_percentage.asc().nulls_last(), User.id)
+        elif completion_order == SortOrderEnum.desc:
+            query = query.order_by(ProfileCompletion.overall_percentage.desc().nulls_last(), User.id)
+        else:
+            query = query.order_by(User.id)
+        return query.offset(skip).limit(limit).all()
@@ -0,0 +1,154 @@
+"""
+Sparse fieldsets for user-returning endpoints.
+
+`?fields=` names the response fields to return and `?expand=` the
+associations to include on top of the plain fields:
+
+- neither: the full response, as before
+- fields only: just those fields (naming an association in fields expands it)
+- expand only: every plain field plus just those associations
+
+The fieldset drives both sides: the query loads only the columns behind the
+requested fields (`load_only`) and selectinloads only the requested
+associations, so the others are never queried, and the serializer only
+emits the requested fields. `id` is always included.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy.orm import load_only, selectinload
+
+from core.exceptions import exceptions
+from db.models.user import User
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """The response fields of one user model and what each of them reads"""
+    # field -> columns it reads
+    columns: Dict[str, Tuple]
+    # association field -> relationships it reads
+    relationships: Dict[str, Tuple] = field(default_factory=dict)
+    # association field -> columns it reads besides its relationships
+    association_columns: Dict[str, Tuple] = field(default_factory=dict)
+
+    @property
+    def all_fields(self) -> FrozenSet[str]:
+        return frozenset(self.columns) | frozenset(self.relationships)
+
+    def parse(self, fields: Optional[str], expand: Optional[str]) -> Optional[FrozenSet[str]]:
+        """The requested fieldset, or None for the full response"""
+        requested = _split(fields)
+        expanded = _split(expand)
+        if not requested and not expanded:
+            return None
+        unknown = (requested - self.all_fields) | (expanded - frozenset(self.relationships))
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{exceptions.UNKNOWN_FIELDS}: {', '.join(sorted(unknown))}",
+            )
+        plain = requested & frozenset(self.columns) if requested else frozenset(self.columns)
+        return plain | (requested & frozenset(self.relationships)) | expanded | {"id"}
+
+    def load_options(self, fieldset: Optional[FrozenSet[str]] = None) -> list:
+        """Loader options for a query of users serialized with `fieldset`"""
+        names = self.all_fields if fieldset is None else fieldset
+        relationships = {rel for name in names for rel in self.relationships.get(name, ())}
+        # Sorted so equal fieldsets give equal options (and cached statements)
+        options = [selectinload(rel) for rel in sorted(relationships, key=lambda rel: rel.key)]
+        if fieldset is not None:
+            columns = {
+                column
+                for name in names
+                for column in self.columns.get(name, ()) + self.association_columns.get(name, ())
+            }
+            options.append(load_only(*sorted(columns, key=lambda column: column.key)))
+        return options
+
+
+def _split(value: Optional[str]) -> FrozenSet[str]:
+    return frozenset(name.strip() for name in (value or "").split(",") if name.strip())
+
+
+def list_include(fieldset: Optional[FrozenSet[str]]) -> Optional[dict]:
+    """`include` argument that applies a fieldset to every item of a list"""
+    return None if fieldset is None else {"__all__": set(fieldset)}
+
+
+def _columns(*names: str) -> Dict[str, Tuple]:
+    return {name: (getattr(User, name),) for name in names}
+
+
+USER_SCALAR_FIELDS = (
+    "id", "first_name", "last_name", "email", "gender", "nationality", "location",
+    "phone", "is_active", "email_verified", "profile_pic", "cover_photo", "about",
+    "user_type", "social_links", "availability", "code_of_conduct_accepted",
+    "onboarding_completed",
+)
+
+# api.api_models.login.UserResponse (login, /users/me, mentor and admin lists)
+PROFILE_FIELDS = FieldSpec(
+    columns={
+        **_columns(*USER_SCALAR_FIELDS),
+        "is_onboarded": (User.onboarding_completed,),
+    },
+    relationships={
+        "professional_background": (User.industry, User.skills),
+        "goals": (User.career_goals,),
+        "mentoring_preferences": (
+            User.mentoring_frequency, User.mentoring_format, User.skills, User.industry,
+        ),
+        "new_role_values": (User.new_role_values,),
+        "job_search_status": (User.job_search_status,),
+        "role_of_interest": (User.role_of_interest,),
+    },
+    association_columns={
+        "professional_background": (User.current_role, User.company, User.years_of_experience),
+        # goals / mentoring preferences depend on the user type
+        "goals": (User.user_type, User.long_term_goals),
+        "mentoring_preferences": (User.user_type,),
+    },
+)
+
+# api.api_models.user.UserResponse (group members): flat columns and associations
+MEMBER_FIELDS = FieldSpec(
+    columns={
+        **_columns(
+            *USER_SCALAR_FIELDS, "current_role", "company", "years_of_experience", "long_term_goals",
+        ),
+        # Not backed by the user row; always their defaults on this model
+        "is_onboarded": (),
+        "professional_background": (),
+        "goals": (),
+        "mentoring_preferences": (),
+    },
+    relationships={
+        name: (getattr(User, name),)
+        for name in (
+            "new_role_values", "job_search_status", "role_of_interest", "industry",
+            "skills", "career_goals", "mentoring_frequency", "mentoring_format",
+        )
+    },
+)
+
+
+FIELDS_DESCRIPTION = "Comma-separated response fields to return, e.g. id,first_name,last_name,profile_pic,user_type"
+EXPAND_DESCRIPTION = "Comma-separated associations to include; when only expand is given, all plain fields are returned too"
+
+
+def profile_fieldset(
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+) -> Optional[FrozenSet[str]]:
+    """Fieldset of a UserResponse (profile) endpoint; None for the full response"""
+    return PROFILE_FIELDS.parse(fields, expand)
+
+
+def member_fieldset(
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+) -> Optional[FrozenSet[str]]:
+    """Fieldset of a group member listing; None for the full response"""
+    return MEMBER_FIELDS.parse(fields, expand)
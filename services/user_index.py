@@ -0,0 +1,280 @@
+"""
+In-memory prefix index for user autocomplete (@mentions, starting DMs).
+
+Active users are indexed under their normalized first name, last name, full
+name and email local part in one sorted array of (key, user_id); a lookup is
+a bisect to the first key >= prefix followed by a scan while keys still
+start with it. The index is loaded once at startup, updated in place when
+this process changes a user, and caught up periodically from
+`users.last_modified` so changes made by other workers show up as well.
+`last_modified` is the writer's transaction start time, so a transaction
+that commits late can carry a timestamp below the watermark; catch-ups
+re-read an overlap window behind it, and a periodic reconcile against the
+active user ids drops users deleted or deactivated elsewhere and picks up
+anything still missed. Until it is ready, lookups fall back to a
+pg_trgm-backed ILIKE query.
+"""
+import asyncio
+import logging
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from anyio import to_thread
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from db.database import SessionLocal
+from db.models.user import User
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class UserEntry:
+    id: int
+    first_name: str
+    last_name: Optional[str]
+    profile_pic: Optional[str]
+    user_type: str
+    current_role: Optional[str]
+
+
+ENTRY_COLUMNS = (
+    User.id, User.first_name, User.last_name, User.profile_pic, User.user_type,
+    User.current_role, User.email, User.is_active, User.last_modified,
+)
+
+
+def user_search_text():
+    """
+    first name, last name and email as one string; matches the expression of
+    the ix_users_search_text_trgm GIN index so ILIKE '%q%' can use it.
+    """
+    return func.coalesce(User.first_name, "") + " " + func.coalesce(User.last_name, "") + " " + func.coalesce(User.email, "")
+
+
+def _entry(row) -> UserEntry:
+    return UserEntry(
+        id=row.id,
+        first_name=row.first_name,
+        last_name=row.last_name,
+        profile_pic=row.profile_pic,
+        user_type=row.user_type.value if hasattr(row.user_type, "value") else row.user_type,
+        current_role=row.current_role,
+    )
+
+
+def normalize(value: Optional[str]) -> str:
+    """Casefold and strip accents so 'Zoë' matches 'zoe'"""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold().strip()
+
+
+def index_keys(first_name: Optional[str], last_name: Optional[str], email: Optional[str]) -> List[str]:
+    first, last = normalize(first_name), normalize(last_name)
+    local_part = normalize(email).split("@", 1)[0]
+    return sorted({key for key in (first, last, f"{first} {last}".strip(), local_part) if key})
+
+
+def _words(keys: List[str]) -> FrozenSet[str]:
+    return frozenset(word for key in keys for word in key.split())
+
+
+class UserPrefixIndex:
+    def __init__(self, overlap: timedelta, reconcile_every: float) -> None:
+        # How far behind the watermark catch-ups re-read, for late commits
+        self.overlap = overlap
+        self.reconcile_every = reconcile_every
+        self._keys: List[Tuple[str, int]] = []
+        self._entries: Dict[int, UserEntry] = {}
+        self._user_keys: Dict[int, List[str]] = {}
+        # Individual words of a user's keys, for matching the trailing query tokens
+        self._user_words: Dict[int, FrozenSet[str]] = {}
+        self._lock = threading.Lock()
+        self._watermark: Optional[datetime] = None
+        self._reconciled_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove_locked(self, user_id: int) -> None:
+        for key in self._user_keys.pop(user_id, []):
+            position = bisect_left(self._keys, (key, user_id))
+            if position < len(self._keys) and self._keys[position] == (key, user_id):
+                del self._keys[position]
+        self._user_words.pop(user_id, None)
+        self._entries.pop(user_id, None)
+
+    def _upsert_locked(self, row) -> None:
+        self._remove_locked(row.id)
+        if not row.is_active:
+            return
+        keys = index_keys(row.first_name, row.last_name, row.email)
+        self._entries[row.id] = _entry(row)
+        self._user_keys[row.id] = keys
+        self._user_words[row.id] = _words(keys)
+        for key in keys:
+            insort(self._keys, (key, row.id))
+
+    def upsert(self, user: User) -> None:
+        """Add or refresh one user; inactive users are dropped"""
+        with self._lock:
+            self._upsert_locked(user)
+
+    def remove(self, user_id: int) -> None:
+        with self._lock:
+            self._remove_locked(user_id)
+
+    def load(self, db: Session) -> None:
+        """Build the whole index from scratch, then swap it in"""
+        rows = db.execute(select(*ENTRY_COLUMNS).where(User.is_active.is_(True))).all()
+        keys: List[Tuple[str, int]] = []
+        entries: Dict[int, UserEntry] = {}
+        user_keys: Dict[int, List[str]] = {}
+        user_words: Dict[int, FrozenSet[str]] = {}
+        for row in rows:
+            entries[row.id] = _entry(row)
+            user_keys[row.id] = index_keys(row.first_name, row.last_name, row.email)
+            user_words[row.id] = _words(user_keys[row.id])
+            keys.extend((key, row.id) for key in user_keys[row.id])
+        # One sort instead of n insorts
+        keys.sort()
+        with self._lock:
+            self._keys, self._entries = keys, entries
+            self._user_keys, self._user_words = user_keys, user_words
+            self._watermark = max((row.last_modified for row in rows), default=None)
+            self._reconciled_at = time.monotonic()
+            self.ready = True
+        logger.info(f"User prefix index loaded with {len(rows)} users")
+
+    def catch_up(self, db: Session) -> int:
+        """
+        Apply users modified since the last load / catch-up, including by
+        other processes. Rows within `overlap` of the watermark are read
+        again, so writes that committed after the previous catch-up with an
+        earlier `last_modified` are not skipped.
+        """
+        stmt = select(*ENTRY_COLUMNS).order_by(User.last_modified)
+        if self._watermark is not None:
+            stmt = stmt.where(User.last_modified >= self._watermark - self.overlap)
+        rows = db.execute(stmt).all()
+        with self._lock:
+            for row in rows:
+                self._upsert_locked(row)
+            if rows and (self._watermark is None or rows[-1].last_modified > self._watermark):
+                self._watermark = rows[-1].last_modified
+        return len(rows)
+
+    def reconcile(self, db: Session) -> Tuple[int, int]:
+        """
+        Diff the indexed ids against the active user ids: drop users deleted
+        or deactivated by other processes, add active users still missing.
+        Returns (removed, added).
+        """
+        active_ids = set(db.execute(select(User.id).where(User.is_active.is_(True))).scalars())
+        with self._lock:
+            stale_ids = self._entries.keys() - active_ids
+            missing_ids = active_ids - self._entries.keys()
+        rows = []
+        if missing_ids:
+            rows = db.execute(select(*ENTRY_COLUMNS).where(User.id.in_(missing_ids))).all()
+        with self._lock:
+            for user_id in stale_ids:
+                self._remove_locked(user_id)
+            for row in rows:
+                self._upsert_locked(row)
+            self._reconciled_at = time.monotonic()
+        if stale_ids or rows:
+            logger.info(f"User prefix index reconciled: {len(stale_ids)} removed, {len(rows)} added")
+        return len(stale_ids), len(rows)
+
+    def lookup(self, query: str, limit: int = 10, exclude_id: Optional[int] = None) -> List[UserEntry]:
+        """
+        Users with a key starting with the first query token; any further
+        tokens must each prefix a word of the user's keys ("jo sm" -> John Smith).
+        """
+        tokens = normalize(query).split()
+        if not tokens:
+            return []
+        head, rest = tokens[0], tokens[1:]
+        results: List[UserEntry] = []
+        seen = set()
+        with self._lock:
+            position = bisect_left(self._keys, (head, -1))
+            while position < len(self._keys) and len(results) < limit:
+                key, user_id = self._keys[position]
+                if not key.startswith(head):
+                    break
+                position += 1
+                if user_id in seen or user_id == exclude_id:
+                    continue
+                seen.add(user_id)
+                if rest:
+                    words = self._user_words[user_id]
+                    if not all(any(word.startswith(token) for word in words) for token in rest):
+                        continue
+                results.append(self._entries[user_id])
+        return results
+
+    async def _refresh_forever(self, interval: float) -> None:
+        while True:
+            try:
+                await to_thread.run_sync(self._refresh_once)
+            except Exception as e:
+                logger.error(f"User prefix index refresh failed: {str(e)}")
+            await asyncio.sleep(interval)
+
+    def _refresh_once(self) -> None:
+        db = SessionLocal()
+        try:
+            if self.ready:
+                self.catch_up(db)
+                if time.monotonic() - self._reconciled_at >= self.reconcile_every:
+                    self.reconcile(db)
+            else:
+                self.load(db)
+        finally:
+            db.close()
+
+    def start(self, interval: float) -> None:
+        """Load in the background and keep catching up every `interval` seconds"""
+        self._refresh_task = asyncio.get_running_loop().create_task(self._refresh_forever(interval))
+
+    async def stop(self) -> None:
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+
+user_index = UserPrefixIndex(
+    overlap=timedelta(seconds=settings.USER_INDEX_OVERLAP_SECONDS),
+    reconcile_every=settings.USER_INDEX_RECONCILE_SECONDS,
+)
+
+
+def autocomplete_users(db: Session, query: str, limit: int = 10, exclude_id: Optional[int] = None) -> List[UserEntry]:
+    """Prefix lookup from the in-memory index, or pg_trgm ILIKE while it is loading"""
+    if user_index.ready:
+        return user_index.lookup(query, limit=limit, exclude_id=exclude_id)
+    stmt = select(*ENTRY_COLUMNS).where(
+        User.is_active.is_(True), user_search_text().ilike(f"%{query.strip()}%")
+    )
+    if exclude_id is not None:
+        stmt = stmt.where(User.id != exclude_id)
+    rows = db.execute(stmt.order_by(User.first_name, User.id).limit(limit)).all()
+    return [_entry(row) for row in rows]
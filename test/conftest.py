@@ -139,6 +139,28 @@ def test_user(session: Session) -> User:
     return user
 
 
+@pytest.fixture
+def make_user(session: Session) -> Any:
+    """Factory for committed users with unique emails: make_user(user_type=UserTypeEnum.mentor, ...)"""
+    from utils.oauth2 import get_password_hash
+
+    def _make_user(**fields: Any) -> User:
+        data = {
+            "first_name": "Test",
+            "last_name": "User",
+            "email": f"test_user_{uuid.uuid4().hex[:8]}@example.com",
+            "is_active": True,
+            "password": get_password_hash("test123"),
+        }
+        data.update(fields)
+        user = User(**data)
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        return user
+    return _make_user
+
+
 @pytest.fixture
 def mock_send_email(mocker) -> Any:
     return mocker.patch(
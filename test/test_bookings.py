@@ -0,0 +1,141 @@
+"""
+Concurrency tests for mentor bookings: the exclusion constraint and the
+versioned status transitions.
+"""
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app import app
+from db.database import get_db
+from db.models.mentors import MentorBooking, MentorPackage
+from services.availability import AvailabilityService
+from services.bookings import BookingService
+from conftest import TestingSessionLocal
+from utils.enums import MentorBookingStatusEnum, UserTypeEnum
+from utils.oauth2 import get_current_user
+
+
+@pytest.fixture
+def mentor_package(session, make_user) -> MentorPackage:
+    mentor = make_user(user_type=UserTypeEnum.mentor, is_approved=True)
+    package = MentorPackage(
+        name=f"package-{uuid.uuid4().hex[:8]}",
+        price=5000,
+        duration="60",
+        user_id=mentor.id,
+    )
+    session.add(package)
+    session.commit()
+    session.refresh(package)
+    return package
+
+
+@pytest.fixture
+def per_request_db() -> Any:
+    """Every request gets its own session, like in production"""
+    def override_get_db() -> Any:
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield
+    app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+def test_concurrent_overlapping_bookings(monkeypatch, session, make_user, mentor_package, per_request_db):
+    mentee = make_user(user_type=UserTypeEnum.mentee)
+    session.expunge(mentee)
+    app.dependency_overrides[get_current_user] = lambda: mentee
+
+    # Both requests pass the friendly pre-check at the same time, so only the
+    # exclusion constraint can stop the second insert
+    barrier = threading.Barrier(2, timeout=10)
+
+    def racing_check(self, mentor, start, length):
+        barrier.wait()
+        return None
+
+    monkeypatch.setattr(AvailabilityService, "check_bookable", racing_check)
+
+    start = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=7)
+    payloads = [
+        {"mentor_id": mentor_package.user_id, "mentor_package_id": mentor_package.id,
+         "booking_date": start.isoformat()},
+        # Overlaps the first one by 30 minutes
+        {"mentor_id": mentor_package.user_id, "mentor_package_id": mentor_package.id,
+         "booking_date": (start + timedelta(minutes=30)).isoformat()},
+    ]
+    statuses = []
+
+    def book(payload: dict) -> None:
+        response = TestClient(app).post(f"/api/v1/mentors/bookings/{payload['mentor_id']}/create", json=payload)
+        statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=book, args=(payload,)) for payload in payloads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(statuses) == [200, 409]
+    assert session.query(MentorBooking).filter(MentorBooking.mentor_id == mentor_package.user_id).count() == 1
+
+
+def test_stale_version_status_updates_have_one_winner(session, make_user, mentor_package):
+    mentee = make_user(user_type=UserTypeEnum.mentee)
+    start = datetime.now(timezone.utc) + timedelta(days=14)
+    booking = MentorBooking(
+        mentor_id=mentor_package.user_id,
+        mentee_id=mentee.id,
+        mentor_package_id=mentor_package.id,
+        booking_date=start,
+        booking_end=start + timedelta(minutes=60),
+    )
+    session.add(booking)
+    session.commit()
+    session.refresh(booking)
+    initial_version = booking.version
+
+    # Both sides read the booking at the same version, then act on it
+    barrier = threading.Barrier(2, timeout=10)
+    outcomes = []
+
+    def act(target: MentorBookingStatusEnum) -> None:
+        db = TestingSessionLocal()
+        try:
+            mine = db.get(MentorBooking, booking.id)
+            barrier.wait()
+            BookingService(db).transition(mine, target, expected_version=initial_version)
+            outcomes.append(("ok", target))
+        except HTTPException as e:
+            outcomes.append((e.status_code, target))
+        finally:
+            db.close()
+
+    threads = [
+        threading.Thread(target=act, args=(MentorBookingStatusEnum.confirmed,)),
+        threading.Thread(target=act, args=(MentorBookingStatusEnum.cancelled,)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    winners = [target for result, target in outcomes if result == "ok"]
+    assert len(winners) == 1
+    assert [result for result, _ in outcomes if result != "ok"] == [409]
+
+    session.expire_all()
+    final = session.get(MentorBooking, booking.id)
+    assert final.status == winners[0]
+    assert final.version == initial_version + 1
@@ -0,0 +1,127 @@
+"""
+Tests for the two-tier read cache, over an in-process Redis stand-in.
+"""
+import threading
+import time
+from typing import Any, Callable
+
+import fakeredis
+import pytest
+
+from services.cache import TwoTierCache
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def redis_server() -> fakeredis.FakeServer:
+    """One stand-in Redis server, shared by every cache made in a test"""
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def make_cache(redis_server: fakeredis.FakeServer) -> Any:
+    """Factory for caches talking to the stand-in server, stopped after the test"""
+    caches = []
+
+    def _make_cache(**options: Any) -> TwoTierCache:
+        config = {
+            "redis_url": "redis://stand-in:6379/0",
+            "namespace": "test:cache",
+            "local_max_entries": 100,
+            "local_ttl": 60,
+            "default_ttl": 300,
+        }
+        config.update(options)
+        cache = TwoTierCache(**config)
+        cache._redis = fakeredis.FakeRedis(server=redis_server)
+        caches.append(cache)
+        return cache
+
+    yield _make_cache
+    for cache in caches:
+        cache.stop()
+
+
+def test_concurrent_misses_run_the_loader_once(make_cache):
+    cache = make_cache()
+    workers = 8
+    release = threading.Event()
+    calls = []
+
+    def loader() -> dict:
+        calls.append(1)
+        release.wait(5)
+        return {"value": 42}
+
+    results = []
+
+    def read() -> None:
+        results.append(cache.get_or_set("hot", loader))
+
+    threads = [threading.Thread(target=read) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    # Every other reader is waiting on the leader's load before it finishes
+    assert wait_for(lambda: cache.stats()["coalesced"] == workers - 1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"value": 42}] * workers
+    assert cache.stats()["misses"] == 1
+
+
+def test_tag_invalidation_reaches_other_instances(make_cache):
+    writer = make_cache()
+    reader = make_cache()
+    writer.start()
+    reader.start()
+
+    assert reader.get_or_set("user_profile:1", lambda: {"name": "old"}, tags=["user:1"]) == {"name": "old"}
+    # Served from the reader's local tier from now on
+    assert reader.get_or_set("user_profile:1", lambda: {"name": "unexpected"}) == {"name": "old"}
+    assert reader.stats()["local_hits"] == 1
+
+    writer.invalidate_tags("user:1")
+
+    assert wait_for(lambda: reader._local_get("user_profile:1") is None)
+    # Gone from Redis too, so the next read loads again
+    assert reader.get_or_set("user_profile:1", lambda: {"name": "new"}, tags=["user:1"]) == {"name": "new"}
+
+
+def test_local_tier_evicts_least_recently_used(make_cache):
+    cache = make_cache(local_max_entries=2)
+    cache.get_or_set("a", lambda: 1)
+    cache.get_or_set("b", lambda: 2)
+    # Reading "a" makes "b" the least recently used
+    cache.get_or_set("a", lambda: 1)
+    cache.get_or_set("c", lambda: 3)
+
+    assert list(cache._local) == ["a", "c"]
+    assert cache.stats()["local_evictions"] == 1
+    # Evicted locally, still served by Redis
+    assert cache.get_or_set("b", lambda: "unexpected") == 2
+    assert cache.stats()["redis_hits"] == 1
+
+
+def test_falls_back_to_loader_when_redis_is_down(make_cache, redis_server):
+    cache = make_cache()
+    redis_server.connected = False
+
+    assert cache.get_or_set("a", lambda: {"value": 1}, tags=["t"]) == {"value": 1}
+    assert cache.stats()["redis_errors"] == 1
+    # Redis is skipped while backing off instead of failing every lookup
+    assert cache.get_or_set("b", lambda: {"value": 2}) == {"value": 2}
+    cache.invalidate_tags("t")
+    assert cache.stats()["redis_errors"] == 1
+    # The local tier keeps working
+    assert cache.get_or_set("b", lambda: "unexpected") == {"value": 2}
@@ -0,0 +1,221 @@
+"""
+EXPLAIN checks: the hot query shapes are planned on the indexes added for
+them. Sequential scans are disabled while explaining, so a small seeded
+dataset is enough to tell which index the planner picks.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import pytest
+from sqlalchemy import delete, exists, insert, select, text
+from sqlalchemy.orm import Session
+
+from db.models.chat import ChatRoom, ChatRoomMember
+from db.models.comments import Comment
+from db.models.groups import Group
+from db.models.mentors import MentorBooking, MentorPackage
+from db.models.posts import Post
+from db.models.reactions import Reaction
+from db.models.user import User
+from conftest import TestingSessionLocal
+from utils.enums import MentorBookingStatusEnum, UserTypeEnum
+from utils.utils import _visible_comments_where, _visible_posts_where
+
+
+USERS = 300
+MENTORS = 30
+GROUPS = 20
+POSTS = 3000
+COMMENTS_PER_POST = 2
+ROOMS = 200
+ROOMS_PER_USER = 5
+BOOKINGS_PER_MENTOR = 40
+
+
+def _insert(db: Session, model: Any, rows: List[Dict[str, Any]]) -> List[int]:
+    table = model.__table__
+    return list(db.execute(insert(table).returning(table.c.id, sort_by_parameter_order=True), rows).scalars())
+
+
+@pytest.fixture(scope="module")
+def dataset() -> Any:
+    db = TestingSessionLocal()
+    tag = uuid.uuid4().hex[:8]
+    now = datetime.now(timezone.utc)
+
+    user_ids = _insert(db, User, [
+        {
+            "first_name": f"Explain{i}",
+            "email": f"explain_{tag}_{i}@example.com",
+            "password": "not-a-real-hash",
+            "user_type": UserTypeEnum.mentor if i < MENTORS else UserTypeEnum.mentee,
+            "is_active": i % 3 != 0,
+            "is_approved": i % 2 == 0,
+            "email_verified": True,
+            "code_of_conduct_accepted": True,
+            "onboarding_completed": True,
+        }
+        for i in range(USERS)
+    ])
+    mentor_ids, mentee_ids = user_ids[:MENTORS], user_ids[MENTORS:]
+    group_ids = _insert(db, Group, [
+        {"name": f"explain-{tag}-{i}", "is_public": True, "date_created": now, "last_modified": now}
+        for i in range(GROUPS)
+    ])
+    post_ids = _insert(db, Post, [
+        {
+            "user_id": user_ids[i % USERS],
+            "group_id": group_ids[i % GROUPS],
+            "content": f"post {i}",
+            "date_created": now - timedelta(minutes=i),
+            "last_modified": now,
+            "deleted_at": now if i % 50 == 0 else None,
+        }
+        for i in range(POSTS)
+    ])
+    comment_ids = _insert(db, Comment, [
+        {
+            "post_id": post_id,
+            "user_id": user_ids[(i + j) % USERS],
+            "content": f"comment {i}.{j}",
+            "date_created": now - timedelta(seconds=i * 10 + j),
+            "last_modified": now,
+        }
+        for i, post_id in enumerate(post_ids)
+        for j in range(COMMENTS_PER_POST)
+    ])
+    _insert(db, Reaction, [
+        {"post_id": post_id, "user_id": user_ids[i % USERS], "type": "like", "date_created": now}
+        for i, post_id in enumerate(post_ids)
+    ] + [
+        {"comment_id": comment_id, "user_id": user_ids[i % USERS], "type": "like", "date_created": now}
+        for i, comment_id in enumerate(comment_ids)
+    ])
+    room_ids = _insert(db, ChatRoom, [
+        {"name": f"explain-{tag}-{i}", "date_created": now, "last_modified": now}
+        for i in range(ROOMS)
+    ])
+    _insert(db, ChatRoomMember, [
+        {"user_id": user_id, "chat_room_id": room_ids[(i * ROOMS_PER_USER + j) % ROOMS], "date_created": now,
+         "last_modified": now}
+        for i, user_id in enumerate(user_ids)
+        for j in range(ROOMS_PER_USER)
+    ])
+    package_ids = _insert(db, MentorPackage, [
+        {"name": f"explain-{tag}-{i}", "price": 5000, "duration": "60", "is_active": True, "user_id": mentor_id}
+        for i, mentor_id in enumerate(mentor_ids)
+    ])
+    bookings = []
+    for i, (mentor_id, package_id) in enumerate(zip(mentor_ids, package_ids)):
+        for j in range(BOOKINGS_PER_MENTOR):
+            # One booking per mentor per day never overlaps
+            start = now + timedelta(days=j, hours=i % 8)
+            bookings.append({
+                "mentor_id": mentor_id,
+                "mentee_id": mentee_ids[(i * BOOKINGS_PER_MENTOR + j) % len(mentee_ids)],
+                "mentor_package_id": package_id,
+                "booking_date": start,
+                "booking_end": start + timedelta(minutes=60),
+                "status": MentorBookingStatusEnum.confirmed,
+            })
+    _insert(db, MentorBooking, bookings)
+    db.commit()
+    for model in (User, Group, Post, Comment, Reaction, ChatRoom, ChatRoomMember, MentorPackage, MentorBooking):
+        db.execute(text(f"ANALYZE {model.__tablename__}"))
+    db.commit()
+
+    yield {
+        "mentor_id": mentor_ids[0],
+        "mentee_id": mentee_ids[0],
+        "user_id": user_ids[1],
+        "group_id": group_ids[0],
+        "post_id": post_ids[1],
+        "post_ids": post_ids[:20],
+        "comment_ids": comment_ids[:20],
+    }
+
+    db.execute(delete(MentorBooking).where(MentorBooking.mentor_id.in_(mentor_ids)))
+    db.execute(delete(MentorPackage).where(MentorPackage.id.in_(package_ids)))
+    db.execute(delete(ChatRoom).where(ChatRoom.id.in_(room_ids)))
+    # Posts, comments, reactions and memberships go with their users
+    db.execute(delete(Post).where(Post.id.in_(post_ids)))
+    db.execute(delete(User).where(User.id.in_(user_ids)))
+    db.execute(delete(Group).where(Group.id.in_(group_ids)))
+    db.commit()
+    db.close()
+
+
+def explain(db: Session, stmt: Any) -> str:
+    compiled = stmt.compile(bind=db.get_bind(), compile_kwargs={"literal_binds": True})
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = "\n".join(row[0] for row in db.execute(text(f"EXPLAIN {compiled}")))
+    db.rollback()
+    return plan
+
+
+def test_group_feed_uses_visible_posts_index(session, dataset):
+    stmt = (
+        select(Post.id)
+        .where(_visible_posts_where(), Post.group_id == dataset["group_id"])
+        .order_by(Post.date_created.desc(), Post.id.desc())
+        .limit(21)
+    )
+    assert "ix_posts_group_created_id_visible" in explain(session, stmt)
+
+
+def test_comment_page_uses_visible_comments_index(session, dataset):
+    stmt = (
+        select(Comment.id)
+        .where(Comment.post_id == dataset["post_id"], _visible_comments_where(), Comment.parent_comment_id.is_(None))
+        .order_by(Comment.date_created.desc(), Comment.id.desc())
+        .limit(21)
+    )
+    assert "ix_comments_post_parent_created_id_visible" in explain(session, stmt)
+
+
+@pytest.mark.parametrize("target, ids, index", [
+    (Reaction.post_id, "post_ids", "ix_reactions_post_user"),
+    (Reaction.comment_id, "comment_ids", "ix_reactions_comment_user"),
+])
+def test_reaction_summary_uses_target_index(session, dataset, target, ids, index):
+    # Same shape as utils.utils.reaction_summary
+    stmt = (
+        select(target, Reaction.type, Reaction.user_id)
+        .where(target.in_(dataset[ids]))
+        .order_by(target, Reaction.type)
+    )
+    assert index in explain(session, stmt)
+
+
+def test_room_membership_uses_user_room_index(session, dataset):
+    # Same shape as join_rooms with "all": true
+    is_member = exists().where(
+        ChatRoomMember.chat_room_id == ChatRoom.id,
+        ChatRoomMember.user_id == dataset["user_id"],
+    )
+    stmt = select(ChatRoom.id).where(is_member).order_by(ChatRoom.id)
+    assert "ix_chat_room_members_user_room" in explain(session, stmt)
+
+
+@pytest.mark.parametrize("column, party, index", [
+    (MentorBooking.mentor_id, "mentor_id", "ix_mentor_bookings_mentor_date"),
+    (MentorBooking.mentee_id, "mentee_id", "ix_mentor_bookings_mentee_date"),
+])
+def test_bookings_by_party_use_date_index(session, dataset, column, party, index):
+    stmt = (
+        select(MentorBooking.id)
+        .where(column == dataset[party])
+        .order_by(MentorBooking.booking_date)
+        .limit(20)
+    )
+    assert index in explain(session, stmt)
+
+
+def test_mentor_directory_uses_type_active_approved_index(session, dataset):
+    stmt = select(User.id).where(
+        User.user_type == UserTypeEnum.mentor,
+        User.is_active.is_(True),
+        User.is_approved.is_(True),
+    )
+    assert "ix_users_type_active_approved" in explain(session, stmt)
@@ -0,0 +1,197 @@
+"""
+Response compression middleware.
+
+Bodies of at least `minimum_size` bytes with an allowlisted content type are
+compressed with brotli or gzip, whichever the client prefers of the ones it
+accepts (brotli wins a tie, and is skipped if the package isn't installed).
+Streaming responses (exports) are compressed chunk by chunk and flushed after
+every chunk, so they keep streaming.
+
+Compressing the same payload over and over is wasted CPU, so the compressed
+bodies of cacheable responses (an ETag or a public Cache-Control) are kept in
+a small LRU keyed by a digest of the uncompressed body: identical payloads,
+such as the onboarding taxonomies, are compressed once per process.
+"""
+import hashlib
+import zlib
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+
+# In order of preference
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+# Never compressed: no body, partial content, or the body is already encoded
+SKIP_STATUSES = {204, 206, 304}
+
+
+def pick_encoding(accept_encoding: str) -> Optional[str]:
+    """The preferred encoding the client accepts (q > 0), if any"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name] = quality
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        content_types: Iterable[str] = ("application/json",),
+        cache_max_entries: int = 256,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.content_types = frozenset(ct.strip().lower() for ct in content_types if ct.strip())
+        self.cache_max_entries = cache_max_entries
+        # (encoding, body digest) -> compressed body
+        self._cache: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = pick_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingSender(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def eligible(self, message: Message) -> bool:
+        if message["status"] in SKIP_STATUSES:
+            return False
+        headers = Headers(raw=message["headers"])
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        return content_type in self.content_types
+
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip_compress(body, self.gzip_level)
+
+    def compress_cached(self, encoding: str, body: bytes) -> bytes:
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        compressed = self._cache.get(key)
+        if compressed is not None:
+            self._cache.move_to_end(key)
+            return compressed
+        compressed = self._cache[key] = self.compress(encoding, body)
+        while len(self._cache) > self.cache_max_entries:
+            self._cache.popitem(last=False)
+        return compressed
+
+    def stream_compressor(self, encoding: str):
+        if encoding == "br":
+            return _BrotliStream(self.brotli_quality)
+        return _GzipStream(self.gzip_level)
+
+
+def gzip_compress(body: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(body) + compressor.flush()
+
+
+class _GzipStream:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _CompressingSender:
+    """Wraps `send` for one response; holds the start message until the first body chunk"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self._start: Optional[Message] = None
+        self._stream = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self._start = message
+            return
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._stream is not None:
+            data = self._stream.chunk(body) if more_body else self._stream.chunk(body) + self._stream.finish()
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+            return
+
+        start, self._start = self._start, None
+        headers = MutableHeaders(raw=start["headers"])
+        if not self.middleware.eligible(start) or (not more_body and len(body) < self.middleware.minimum_size):
+            self._passthrough = True
+            await self._send(start)
+            await self._send(message)
+            return
+
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if more_body:
+            self._stream = self.middleware.stream_compressor(self.encoding)
+            del headers["Content-Length"]
+            await self._send(start)
+            await self._send({"type": "http.response.body", "body": self._stream.chunk(body), "more_body": True})
+            return
+
+        cacheable = "etag" in headers or "public" in headers.get("cache-control", "")
+        if cacheable:
+            compressed = self.middleware.compress_cached(self.encoding, body)
+        else:
+            compressed = self.middleware.compress(self.encoding, body)
+        headers["Content-Length"] = str(len(compressed))
+        await self._send(start)
+        await self._send({"type": "http.response.body", "body": compressed})
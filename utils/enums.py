@@ -35,3 +35,27 @@ class AnnualTargetStatusEnum(str, Enum):
     in_progress = "in_progress"
     completed = "completed"
     overdue = "overdue"
+
+
+class ExportKindEnum(str, Enum):
+    users = "users"
+    bookings = "bookings"
+    posts = "posts"
+    annual_targets = "annual_targets"
+
+
+class ExportFormatEnum(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class SortOrderEnum(str, Enum):
+    asc = "asc"
+    desc = "desc"
+
+
+class SearchScopeEnum(str, Enum):
+    all = "all"
+    posts = "posts"
+    comments = "comments"
+    messages = "messages"
@@ -0,0 +1,64 @@
+"""
+Conditional GET helpers.
+
+Routes compute a cheap version tuple for a resource (typically its
+`last_modified` plus any counters that feed into the response), turn it into a
+weak ETag and short-circuit with 304 Not Modified when the client already has
+that version, before running the full query and serialization.
+"""
+import hashlib
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+
+# Cache-Control hints. Authenticated resources must not be stored by shared
+# caches, and clients always revalidate with If-None-Match.
+CACHE_PRIVATE_REVALIDATE = "private, no-cache"
+CACHE_PRIVATE_SHORT = "private, max-age=30, must-revalidate"
+# Reference data that is the same for everyone (onboarding taxonomies)
+CACHE_PUBLIC_REFERENCE = "public, max-age=300"
+
+
+def compute_etag(*parts: Any) -> str:
+    """Weak ETag from the given version parts"""
+    raw = "|".join(
+        part.isoformat() if isinstance(part, datetime) else str(part)
+        for part in parts
+    )
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()[:20]}"'
+
+
+def _strip_weak(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = _strip_weak(etag)
+    return any(_strip_weak(candidate) == wanted for candidate in if_none_match.split(","))
+
+
+def check_not_modified(
+    request: Request,
+    response: Response,
+    *parts: Any,
+    cache_control: str = CACHE_PRIVATE_REVALIDATE,
+) -> Optional[Response]:
+    """
+    Set ETag and Cache-Control on the outgoing response. Returns a ready
+    304 response when the client's If-None-Match matches, else None and the
+    route carries on building the full body.
+    """
+    etag = compute_etag(*parts)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
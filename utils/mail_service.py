@@ -1,4 +1,5 @@
 import ssl
+import asyncio
 import smtplib
 import logging
 from datetime import datetime
@@ -19,6 +20,27 @@ def read_html_file(file_path) -> str:
         return file.read()
 
 
+def _deliver_email(email_receiver: str, message: str) -> None:
+    """Blocking SMTP send; call from a worker thread"""
+    context = ssl.create_default_context()
+
+    # Use SMTP_SSL (port 465 by default) instead of STARTTLS (port 587)
+    # Port 465 with SSL works more reliably in Docker environments
+    smtp = smtplib.SMTP_SSL(settings.EMAIL_SERVER, int(settings.EMAIL_PORT), context=context, timeout=30)
+
+    # Identify ourselves to the server
+    smtp.ehlo()
+
+    # Login with credentials
+    smtp.login(settings.EMAIL_SENDER, settings.EMAIL_PASSWORD)
+
+    # Send the email
+    smtp.sendmail(settings.EMAIL_SENDER, email_receiver, message)
+
+    # Close connection
+    smtp.quit()
+
+
 async def send_email(subject: str, recipient_email: str, html_content: str) -> JSONResponse:
     """
     Generic email sending function using Gmail SMTP with SSL (port 465).
@@ -33,24 +55,9 @@ async def send_email(subject: str, recipient_email: str, html_content: str) -> J
     html_part = MIMEText(html_content, 'html')
     em.attach(html_part)
 
-    context = ssl.create_default_context()
-
     try:
-        # Use SMTP_SSL (port 465 by default) instead of STARTTLS (port 587)
-        # Port 465 with SSL works more reliably in Docker environments
-        smtp = smtplib.SMTP_SSL(settings.EMAIL_SERVER, int(settings.EMAIL_PORT), context=context, timeout=30)
-
-        # Identify ourselves to the server
-        smtp.ehlo()
-
-        # Login with credentials
-        smtp.login(settings.EMAIL_SENDER, settings.EMAIL_PASSWORD)
-
-        # Send the email
-        smtp.sendmail(settings.EMAIL_SENDER, email_receiver, em.as_string())
-
-        # Close connection
-        smtp.quit()
+        # smtplib is blocking; run the SMTP exchange off the event loop
+        await asyncio.to_thread(_deliver_email, email_receiver, em.as_string())
 
         logger.info(f"Email sent successfully to {email_receiver}")
         return JSONResponse(status_code=200, content={"message": "Email sent successfully"})
@@ -167,3 +174,14 @@ async def send_welcome_email(email: str, username: str) -> JSONResponse:
         """
     email_subject = "Welcome to Kocha!"
     return await send_email(email_subject, email, html_content)
+
+
+async def send_booking_reminder(email: str, username: str, other_name: str, booking_date: datetime) -> JSONResponse:
+    """Remind a mentor or mentee of an upcoming session"""
+    when = booking_date.strftime("%A %d %B %Y, %H:%M %Z")
+    html_content = f"""
+    Hi {username},
+    This is a reminder of your upcoming mentoring session with {other_name} on {when}.
+    """
+    email_subject = "Upcoming Session Reminder - Kocha"
+    return await send_email(email_subject, email, html_content)
@@ -20,6 +20,7 @@ from db.database import get_db, async_get_db
 from db.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='/api/v1/users/login')
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl='/api/v1/users/login', auto_error=False)
 
 
 credential_exception = HTTPException(
@@ -103,6 +104,19 @@ def get_current_user(
     return user
 
 
+# Public endpoints that personalize the response when a token is present;
+# a missing, invalid or expired token is treated as an anonymous viewer
+def get_optional_current_user(
+        token: Optional[str] = Depends(optional_oauth2_scheme),
+        db: Session = Depends(get_db)) -> Optional[User]:
+    if not token:
+        return None
+    try:
+        return get_current_user(token, db) or None
+    except (JWTError, HTTPException):
+        return None
+
+
 async def get_current_user_from_request(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(async_get_db),
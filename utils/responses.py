@@ -0,0 +1,35 @@
+"""
+Response helpers.
+
+Returning a model from a route makes FastAPI validate it against the
+`response_model` again, run it through `jsonable_encoder` and only then
+encode it. Routes that already hold trusted, fully built models (e.g. from
+`model_construct`) can hand them to `serialized_response` instead, which
+dumps them straight to JSON bytes with a TypeAdapter built once at import.
+The route keeps its `response_model` for the OpenAPI schema.
+"""
+from typing import Any, Mapping, Optional
+
+from fastapi import Response, status
+from pydantic import TypeAdapter
+
+
+def serialized_response(
+    adapter: TypeAdapter,
+    value: Any,
+    status_code: int = status.HTTP_200_OK,
+    include: Optional[Any] = None,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """
+    JSON response of `value` serialized by `adapter`, without revalidation.
+    `include` limits the output fields, as in `model_dump`. Pass the route's
+    injected `response.headers` as `headers` to keep headers set on it
+    (ETag, Cache-Control).
+    """
+    return Response(
+        content=adapter.dump_json(value, include=include),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
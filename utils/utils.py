@@ -1,17 +1,21 @@
 """
 Helper functions for cursor-based pagination.
 """
-from typing import Any, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
 from base64 import urlsafe_b64encode, urlsafe_b64decode
 from fastapi import HTTPException
-from sqlalchemy import select, func
+from sqlalchemy import false, select, func
+from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models.posts import Post
 from db.models.comments import Comment
 from db.models.reactions import Reaction
 from db.models.chat import ChatRoomMember
+from db.models.groups import Group
+from api.api_models.groups import GroupOut
+from services.cache import cached
 
 
 def _encode_cursor(ts: datetime, id_: int) -> str:
@@ -71,6 +75,36 @@ subq_comment_reaction_count = (
 )
 
 
+def reaction_summary(
+    db: Session, target: Any, ids: Iterable[int], viewer_id: Optional[int] = None
+) -> Tuple[Dict[int, Dict[str, int]], Dict[int, List[str]]]:
+    """
+    Per-type reaction counts and the viewer's own reaction types for a page
+    of posts or comments, in one grouped query. `target` is Reaction.post_id
+    or Reaction.comment_id.
+    Returns ({id: {type: count}}, {id: [viewer types]}).
+    """
+    ids = list(ids)
+    breakdowns: Dict[int, Dict[str, int]] = {id_: {} for id_ in ids}
+    viewer_types: Dict[int, List[str]] = {id_: [] for id_ in ids}
+    if not ids:
+        return breakdowns, viewer_types
+    viewer_reacted = (
+        func.bool_or(Reaction.user_id == viewer_id) if viewer_id is not None else false()
+    )
+    rows = db.execute(
+        select(target, Reaction.type, func.count(Reaction.id), viewer_reacted)
+        .where(target.in_(ids))
+        .group_by(target, Reaction.type)
+        .order_by(target, Reaction.type)
+    ).all()
+    for id_, reaction_type, count, reacted in rows:
+        breakdowns[id_][reaction_type] = count
+        if reacted:
+            viewer_types[id_].append(reaction_type)
+    return breakdowns, viewer_types
+
+
 async def _validate_room_membership(
     db: AsyncSession, user_id: int, room_id: int
 ) -> bool:
@@ -84,11 +118,8 @@ async def _validate_room_membership(
     return membership is not None
 
 
-def generate_room_name(sender_email: str, recipient_email: str) -> str:
-    """
-    Generate a hash-based room name for direct chats
-    """
-    emails = sorted([sender_email, recipient_email])
-    combined = "|".join(emails).encode()
-    print(f"Generated room name for {emails}: {combined}")
-    return urlsafe_b64encode(combined).decode()
+@cached("group:{group_id}", tags=["group:{group_id}"])
+def group_summary(db: Session, group_id: int) -> Optional[dict]:
+    """GroupOut payload of a group (None if it doesn't exist), shared across requests"""
+    group = db.get(Group, group_id)
+    return GroupOut.model_validate(group).model_dump(mode="json") if group else None